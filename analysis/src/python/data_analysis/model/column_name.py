@@ -74,6 +74,7 @@ class SubmissionColumns(str, Enum):
     CLIENT = 'client'
     STEP_ID = 'step_id'
     CODE = 'code'
+    CODE_HASH = 'code_hash'
     LANG = 'lang'
     TIME = 'time'
     CODE_STYLE = 'code_style'
@@ -103,6 +104,7 @@ class SubmissionColumnsStats(str, Enum):
 class IssuesColumns(str, Enum):
     CLASS = 'class'
     TYPE = 'type'
+    COUNT = 'count'
 
 
 @unique
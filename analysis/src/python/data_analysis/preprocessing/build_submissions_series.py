@@ -1,13 +1,21 @@
 import argparse
 import logging
+import os
 import sys
+import tempfile
 from enum import Enum
+from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 from analysis.src.python.data_analysis.model.column_name import SubmissionColumns
 from analysis.src.python.data_analysis.utils.df_utils import append_df, write_df
 from analysis.src.python.data_analysis.utils.parsing_utils import str_to_datetime
+from analysis.src.python.evaluation.common.file_util import remove_directory
+
+# Number of rows which are read from the submissions file at once in out-of-core mode
+READ_CHUNK_SIZE = 100000
 
 
 def check_same_code(submission_0: pd.Series, submission_1: pd.Series) -> bool:
@@ -54,18 +62,20 @@ def filter_submissions_series(submissions_series: pd.DataFrame, diff_ratio: floa
                          f'step={submission[SubmissionColumns.STEP_ID]} '
                          f'attempt={i + 1}: '
                          f'same submissions')
-            submission[SubmissionColumns.STATUS] = SubmissionsCheckStatus.SAME.value
-        elif check_different_code(submission, submission, diff_ratio):
+            submissions_series.at[i, SubmissionColumns.STATUS] = SubmissionsCheckStatus.SAME.value
+        elif check_different_code(prev_submission, submission, diff_ratio):
             logging.info(f'Drop submission: '
                          f'user={submission[SubmissionColumns.USER_ID]} '
                          f'step={submission[SubmissionColumns.STEP_ID]} '
                          f'attempt={i + 1}: '
                          f'different submissions')
-            submission[SubmissionColumns.STATUS] = SubmissionsCheckStatus.DIFFERENT.value
+            submissions_series.at[i, SubmissionColumns.STATUS] = SubmissionsCheckStatus.DIFFERENT.value
+        prev_submission = submission
 
     logging.info(f'Final group shape {submissions_series.shape}')
 
-    submissions_series = submissions_series[submissions_series[SubmissionColumns.STATUS] == SubmissionColumns.OK]
+    submissions_series = submissions_series[
+        submissions_series[SubmissionColumns.STATUS] == SubmissionsCheckStatus.OK.value]
     submissions_series = submissions_series.drop([SubmissionColumns.STATUS], axis=1)
     group_size = submissions_series.shape[0]
     submissions_series[SubmissionColumns.ATTEMPT.value] = list(range(1, group_size + 1))
@@ -74,6 +84,16 @@ def filter_submissions_series(submissions_series: pd.DataFrame, diff_ratio: floa
     return submissions_series
 
 
+def _drop_submissions_without_code(df_submissions: pd.DataFrame) -> pd.DataFrame:
+    return df_submissions[df_submissions[SubmissionColumns.CODE].apply(lambda x: isinstance(x, str))]
+
+
+def _filter_submissions_groups(df_submissions: pd.DataFrame, diff_ratio: float) -> pd.DataFrame:
+    df_filtered_submission_series = df_submissions.groupby([SubmissionColumns.GROUP], as_index=False) \
+        .apply(lambda g: filter_submissions_series(g, diff_ratio))
+    return df_filtered_submission_series.reset_index(drop=True)
+
+
 def build_submission_series(submissions_path: str, output_path: str, diff_ration: float, chunk_size: int = 50000):
     """ Group given submissions to series (by one user on one step) and filter same or noise submissions.
         For each submission add it's series number, attempt in group (in sorted by time order)
@@ -81,7 +101,7 @@ def build_submission_series(submissions_path: str, output_path: str, diff_ration
     """
 
     df_submissions = pd.read_csv(submissions_path)
-    df_submissions = df_submissions[df_submissions[SubmissionColumns.CODE].apply(lambda x: isinstance(x, str))]
+    df_submissions = _drop_submissions_without_code(df_submissions)
 
     df_submissions[SubmissionColumns.GROUP] = df_submissions \
         .groupby([SubmissionColumns.USER_ID, SubmissionColumns.STEP_ID]).ngroup()
@@ -93,17 +113,10 @@ def build_submission_series(submissions_path: str, output_path: str, diff_ration
         groups_range = [i, i + chunk_size - 1]
         logging.info(f'Processing groups: [{groups_range[0]}, {groups_range[1]}]')
 
-        df_grouped_submission_series = df_submissions[df_submissions[SubmissionColumns.GROUP].isin(groups_range)] \
-            .groupby([SubmissionColumns.GROUP], as_index=False)
-        logging.info('Finish grouping')
-
-        df_filtered_submission_series = df_grouped_submission_series \
-            .apply(lambda g: filter_submissions_series(g, diff_ration))
+        df_chunk = df_submissions[df_submissions[SubmissionColumns.GROUP].between(*groups_range)]
+        df_filtered_submission = _filter_submissions_groups(df_chunk, diff_ration)
         logging.info('Finish filtering')
 
-        df_filtered_submission = df_filtered_submission_series.reset_index(drop=True)
-        logging.info('Finish aggregation')
-
         if i == 0:
             write_df(df_filtered_submission, output_path)
         else:
@@ -111,6 +124,75 @@ def build_submission_series(submissions_path: str, output_path: str, diff_ration
         logging.info('Finish saving results')
 
 
+def _get_user_id_borders(submissions_path: str, partitions: int, chunk_size: int) -> np.ndarray:
+    """ Get user ids which split submissions into `partitions` parts of the similar size.
+        Only user ids are read, so they fit in memory even if the whole dataset does not. """
+
+    user_ids = np.concatenate([
+        chunk[SubmissionColumns.USER_ID].values
+        for chunk in pd.read_csv(submissions_path, usecols=[SubmissionColumns.USER_ID], chunksize=chunk_size)
+    ])
+    quantiles = np.linspace(0, 1, partitions + 1)[1:-1]
+    return np.unique(np.quantile(user_ids, quantiles, interpolation='lower'))
+
+
+def _spill_submissions(submissions_path: str, spill_dir: str, user_id_borders: np.ndarray, chunk_size: int):
+    """ Split submissions into spill files by user id ranges, so all submissions of one series are in one file. """
+
+    for chunk in pd.read_csv(submissions_path, chunksize=chunk_size):
+        chunk = _drop_submissions_without_code(chunk)
+        partition_indices = np.searchsorted(user_id_borders, chunk[SubmissionColumns.USER_ID].values, side='right')
+        for partition_index, df_partition in chunk.groupby(partition_indices):
+            partition_path = os.path.join(spill_dir, f'partition_{partition_index}.csv')
+            if os.path.exists(partition_path):
+                append_df(df_partition, partition_path)
+            else:
+                write_df(df_partition, partition_path)
+
+
+def build_submission_series_out_of_core(submissions_path: str, output_path: str, diff_ratio: float,
+                                        partitions: int = 64, spill_dir: Optional[str] = None,
+                                        chunk_size: int = READ_CHUNK_SIZE):
+    """ Same as `build_submission_series`, but submissions are never loaded into memory at once.
+        Submissions are split into `partitions` spill files by user id ranges. Then spill files are processed
+        one by one in user id order: submissions are sorted by (user_id, step_id, time) and grouped to series.
+        Series numbers are the same as `build_submission_series` gives.
+    """
+
+    spill_dir = tempfile.mkdtemp(prefix='submissions_series_', dir=spill_dir)
+    try:
+        logging.info('Computing user id ranges')
+        user_id_borders = _get_user_id_borders(submissions_path, partitions, chunk_size)
+
+        logging.info(f'Splitting submissions into {len(user_id_borders) + 1} spill files in {spill_dir}')
+        _spill_submissions(submissions_path, spill_dir, user_id_borders, chunk_size)
+
+        groups_number = 0
+        is_first_chunk = True
+        for partition_index in range(len(user_id_borders) + 1):
+            partition_path = os.path.join(spill_dir, f'partition_{partition_index}.csv')
+            if not os.path.exists(partition_path):
+                continue
+
+            logging.info(f'Processing spill file {partition_index}')
+            df_partition = pd.read_csv(partition_path)
+            df_partition = df_partition.sort_values(
+                [SubmissionColumns.USER_ID, SubmissionColumns.STEP_ID, SubmissionColumns.TIME], kind='stable')
+            df_partition[SubmissionColumns.GROUP] = df_partition \
+                .groupby([SubmissionColumns.USER_ID, SubmissionColumns.STEP_ID]).ngroup() + groups_number
+            groups_number = df_partition[SubmissionColumns.GROUP].max() + 1
+
+            df_filtered_submission = _filter_submissions_groups(df_partition, diff_ratio)
+            if is_first_chunk:
+                write_df(df_filtered_submission, output_path)
+                is_first_chunk = False
+            else:
+                append_df(df_filtered_submission, output_path)
+            logging.info('Finish saving results')
+    finally:
+        remove_directory(spill_dir)
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
 
@@ -120,6 +202,17 @@ if __name__ == '__main__':
                         help='Path to .csv file with filtered submissions with series info.')
     parser.add_argument('--diff-ratio', '-r', type=float, default=30.0,
                         help='Ration to remove submissions which has lines change more then in `diff_ratio` times.')
+    parser.add_argument('--out-of-core', action='store_true',
+                        help='Process submissions by parts, so the dataset does not have to fit in memory.')
+    parser.add_argument('--partitions', type=int, default=64,
+                        help='Number of spill files to split submissions into in out-of-core mode.')
+    parser.add_argument('--spill-dir', type=str, default=None,
+                        help='Directory to keep spill files in out-of-core mode. '
+                             'If not specified, the system temporary directory is used.')
 
     args = parser.parse_args(sys.argv[1:])
-    build_submission_series(args.submissions_path, args.submissions_series_path, args.diff_ratio)
+    if args.out_of_core:
+        build_submission_series_out_of_core(args.submissions_path, args.submissions_series_path, args.diff_ratio,
+                                            args.partitions, args.spill_dir)
+    else:
+        build_submission_series(args.submissions_path, args.submissions_series_path, args.diff_ratio)
@@ -1,31 +1,56 @@
 import argparse
 import json
 import logging
+import os
 import sys
+from typing import Optional
 
 import pandas as pd
 
 from analysis.src.python.data_analysis.model.column_name import SubmissionColumns
-from analysis.src.python.data_analysis.utils.df_utils import merge_dfs, parallel_apply, read_df, rename_columns, \
-    write_df
+from analysis.src.python.data_analysis.utils.df_utils import get_hash, merge_dfs, parallel_apply, read_df, \
+    rename_columns, write_df
 from analysis.src.python.data_analysis.utils.parsing_utils import parse_qodana_issues
 
 
-def merge_submissions_with_issues(df_submissions: pd.Dataframe, df_issues: pd.Dataframe, issue_columns: str):
-    """ Merges submissions with issues. """
+def get_issues_by_code_hash(df_issues: pd.DataFrame, issue_column: str) -> pd.DataFrame:
+    """ Keep only issues and the hash of the code they were found in. Issues of the same code are kept once.
+    If issues are already keyed by the code hash (were saved by this script), they are used as is. """
 
-    df_issues = df_issues[[SubmissionColumns.ID, SubmissionColumns.RAW_ISSUES, SubmissionColumns.CODE]]
-    df_submissions = merge_dfs(df_submissions, df_issues, SubmissionColumns.CODE, SubmissionColumns.CODE, how='left')
-    df_submissions[issue_columns] = df_submissions[issue_columns].fillna(value=json.dumps([]))
+    if SubmissionColumns.CODE_HASH not in df_issues.columns:
+        df_issues[SubmissionColumns.CODE_HASH] = get_hash(df_issues[SubmissionColumns.CODE])
+    df_issues = df_issues[[SubmissionColumns.CODE_HASH, issue_column]]
+    return df_issues.drop_duplicates(SubmissionColumns.CODE_HASH).reset_index(drop=True)
+
+
+def merge_submissions_with_issues(df_submissions: pd.DataFrame, df_issues: pd.DataFrame, issue_column: str):
+    """ Merges submissions with issues keyed by the code hash, so long code strings are not compared. """
+
+    df_submissions = merge_dfs(df_submissions, df_issues, SubmissionColumns.CODE_HASH, SubmissionColumns.CODE_HASH,
+                               how='left')
+    df_submissions[issue_column] = df_submissions[issue_column].fillna(value=json.dumps([]))
     return df_submissions
 
 
+def _save_issues_by_code_hash(df_issues: pd.DataFrame, issues_by_hash_dir: Optional[str], file_name: str):
+    if issues_by_hash_dir is None:
+        return
+
+    os.makedirs(issues_by_hash_dir, exist_ok=True)
+    issues_path = os.path.join(issues_by_hash_dir, file_name)
+    logging.info(f'Saving issues by code hash to: {issues_path}')
+    write_df(df_issues, issues_path)
+
+
 def build_submissions_dataframe(submissions_path: str,
                                 submissions_to_users_path: str,
                                 raw_issues_path: str,
                                 qodana_issues_path: str,
-                                submissions_with_issues_path: str):
-    """ Merges submissions dataset with users information and issues. """
+                                submissions_with_issues_path: str,
+                                issues_by_hash_dir: Optional[str] = None):
+    """ Merges submissions dataset with users information and issues.
+    Issues are merged by the hash of the code, which is computed once for every dataset.
+    Issues by code hash are saved to `issues_by_hash_dir`, so they can be reused for other datasets. """
 
     logging.info(f'Reading submissions from: {submissions_path}')
     df_submissions = read_df(submissions_path)
@@ -40,10 +65,16 @@ def build_submissions_dataframe(submissions_path: str,
         df_submissions = merge_dfs(df_submissions, df_submissions_to_users, SubmissionColumns.ID, SubmissionColumns.ID)
         logging.info(f'Finish merging submissions with submissions to users [shape: {df_submissions.shape}]')
 
+    logging.info('Computing code hashes')
+    df_submissions[SubmissionColumns.CODE_HASH] = get_hash(df_submissions[SubmissionColumns.CODE])
+
     logging.info(f'Reading raw issues from: {raw_issues_path}')
     df_raw_issues = read_df(raw_issues_path)
     logging.info(f'Finish readings raw issues dataframe [shape: {df_raw_issues.shape}]')
 
+    df_raw_issues = get_issues_by_code_hash(df_raw_issues, SubmissionColumns.RAW_ISSUES)
+    _save_issues_by_code_hash(df_raw_issues, issues_by_hash_dir, os.path.basename(raw_issues_path))
+
     logging.info('Merging submissions with raw issues')
     df_submissions = merge_submissions_with_issues(df_submissions, df_raw_issues, SubmissionColumns.RAW_ISSUES)
     logging.info(f'Finish merging submissions with raw issues [shape: {df_submissions.shape}]')
@@ -52,14 +83,21 @@ def build_submissions_dataframe(submissions_path: str,
     df_qodana_issues = read_df(qodana_issues_path)
     logging.info(f'Finish readings qodana issues dataframe [shape: {df_qodana_issues.shape}]')
 
-    logging.info('Preprocessing qodana issues')
-    df_qodana_issues = rename_columns(df_qodana_issues, columns={'inspections': SubmissionColumns.QODANA_ISSUES})
-    df_qodana_issues = parallel_apply(df_qodana_issues, SubmissionColumns.QODANA_ISSUES, parse_qodana_issues)
+    if SubmissionColumns.CODE_HASH not in df_qodana_issues.columns:
+        logging.info('Preprocessing qodana issues')
+        df_qodana_issues = rename_columns(df_qodana_issues, columns={'inspections': SubmissionColumns.QODANA_ISSUES})
+        # Issues of the same code are parsed only once
+        df_qodana_issues = get_issues_by_code_hash(df_qodana_issues, SubmissionColumns.QODANA_ISSUES)
+        df_qodana_issues = parallel_apply(df_qodana_issues, SubmissionColumns.QODANA_ISSUES, parse_qodana_issues)
+    else:
+        df_qodana_issues = get_issues_by_code_hash(df_qodana_issues, SubmissionColumns.QODANA_ISSUES)
+    _save_issues_by_code_hash(df_qodana_issues, issues_by_hash_dir, os.path.basename(qodana_issues_path))
 
     logging.info('Merging submissions with qodana issues')
     df_submissions = merge_submissions_with_issues(df_submissions, df_qodana_issues, SubmissionColumns.QODANA_ISSUES)
     logging.info(f'Finish merging submissions with qodana issues [shape: {df_submissions.shape}]')
 
+    df_submissions = df_submissions.drop(columns=[SubmissionColumns.CODE_HASH])
     write_df(df_submissions, submissions_with_issues_path)
 
 
@@ -74,6 +112,9 @@ if __name__ == '__main__':
     parser.add_argument('--users-to-submissions-path', type=str, default=None,
                         help='Path to file with user/submission relation '
                              '(if data is not presented in submissions dataset or was anonymize).')
+    parser.add_argument('--issues-by-hash-dir', type=str, default=None,
+                        help='Path to directory where to save issues by code hash. Saved files can be passed '
+                             'instead of issues files to merge issues with other datasets.')
 
     args = parser.parse_args(sys.argv[1:])
 
@@ -81,4 +122,5 @@ if __name__ == '__main__':
                                 args.users_to_submissions_path,
                                 args.raw_issues_path,
                                 args.qodana_issues_path,
-                                args.submissions_with_issues_path)
+                                args.submissions_with_issues_path,
+                                args.issues_by_hash_dir)
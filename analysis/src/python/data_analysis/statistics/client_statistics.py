@@ -2,6 +2,7 @@ import argparse
 import json
 import logging
 import sys
+from typing import Optional
 
 import pandas as pd
 
@@ -23,16 +24,14 @@ def calculate_submissions_series_client_series(series: pd.DataFrame) -> pd.Serie
 
 def get_submissions_client_series(submissions_path: str,
                                   client_series_statistics_path: str,
-                                  chunk_size: int):
+                                  chunk_size: int,
+                                  workers: Optional[int] = None):
     """ For each submissions series build client series (the sequence of clients). """
 
     df_submissions = pd.read_csv(submissions_path)
 
-    min_group, max_group = df_submissions[SubmissionColumns.GROUP].min(), df_submissions[SubmissionColumns.GROUP].max()
-    logging.info(f'Groups range: [{min_group}, {max_group}]')
-
     get_statistics_by_group(df_submissions, client_series_statistics_path, chunk_size,
-                            calculate_submissions_series_client_series)
+                            calculate_submissions_series_client_series, workers)
 
 
 if __name__ == '__main__':
@@ -47,6 +46,9 @@ if __name__ == '__main__':
                         help='Path to .csv file with submissions client series statistics')
     parser.add_argument('--chunk-size', '-c', default=5000, type=int,
                         help='Number of groups which will be processed simultaneously')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes. If not specified, the number of CPUs is used.')
 
     args = parser.parse_args(sys.argv[1:])
-    get_submissions_client_series(args.submissions_path, args.client_series_statistics_path, args.chunk_size)
+    get_submissions_client_series(args.submissions_path, args.client_series_statistics_path, args.chunk_size,
+                                  args.workers)
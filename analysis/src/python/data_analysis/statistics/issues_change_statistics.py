@@ -1,51 +1,52 @@
 import argparse
 import logging
 import sys
-from typing import List
+from functools import partial
+from typing import List, Optional
 
+import numpy as np
 import pandas as pd
 
 from analysis.src.python.data_analysis.model.column_name import IssuesColumns, SubmissionColumns
-from analysis.src.python.data_analysis.utils.df_utils import merge_dfs
+from analysis.src.python.data_analysis.utils.df_utils import merge_dfs, read_df
+from analysis.src.python.data_analysis.utils.issues_matrix_utils import read_issues_statistics
 from analysis.src.python.data_analysis.utils.statistics_utils import get_statistics_by_group
 
 
 def calculate_issues_change_statistics(df_issues_statistics: pd.DataFrame,
-                                       issues_classes: List[str]):
-    """ Calculate issues count diff between previous and current attempt in one submissions series. """
+                                       issues_classes: List[str]) -> pd.DataFrame:
+    """ Calculate issues count diff between previous and current attempt in all given submissions series.
+    The diff of the first attempt in series is the issues count itself. """
 
-    df_issues_statistics = df_issues_statistics.sort_values([SubmissionColumns.ATTEMPT])
+    df_issues_statistics = df_issues_statistics.sort_values([SubmissionColumns.GROUP, SubmissionColumns.ATTEMPT],
+                                                            kind='mergesort')
 
-    issues_change_statistics = {
-        SubmissionColumns.ID: df_issues_statistics[SubmissionColumns.ID].values,
-    }
+    groups = df_issues_statistics[SubmissionColumns.GROUP].values
+    is_first_attempt = np.ones(len(groups), dtype=bool)
+    is_first_attempt[1:] = groups[1:] != groups[:-1]
 
-    for issue_class in issues_classes:
-        issues_change_statistics[issue_class] = []
+    issues_counts = df_issues_statistics[issues_classes].values
+    issues_change = issues_counts.copy()
+    issues_change[1:] -= np.where(is_first_attempt[1:, np.newaxis], 0, issues_counts[:-1])
 
-    previous_submission_issues_statistics = None
-    for _, submission_issues_statistics in df_issues_statistics.iterrows():
-        for issue_class in issues_classes:
-            if previous_submission_issues_statistics is None:
-                diff = submission_issues_statistics[issue_class]
-            else:
-                diff = submission_issues_statistics[issue_class] - previous_submission_issues_statistics[issue_class]
-
-            issues_change_statistics[issue_class].append(diff)
-        previous_submission_issues_statistics = submission_issues_statistics
-    return pd.DataFrame.from_dict(issues_change_statistics)
+    df_issues_change_statistics = pd.DataFrame(issues_change, columns=issues_classes)
+    df_issues_change_statistics.insert(0, SubmissionColumns.ID.value, df_issues_statistics[SubmissionColumns.ID].values)
+    return df_issues_change_statistics
 
 
 def get_submissions_issues_change_statistics(submissions_path: str,
                                              issues_statistics_path: str,
                                              issues_change_statistics_path: str,
                                              issues_path: str,
-                                             chunk_size=20000):
+                                             chunk_size: int = 20000,
+                                             workers: Optional[int] = None):
     """ Calculate issues count diff between previous and current attempt in all submissions series. """
 
-    df_submissions = pd.read_csv(submissions_path)
-    df_issues_statistics = pd.read_csv(issues_statistics_path)
+    df_submissions = read_df(submissions_path,
+                             columns=[SubmissionColumns.ID, SubmissionColumns.GROUP, SubmissionColumns.ATTEMPT])
     df_issues = pd.read_csv(issues_path)[IssuesColumns.CLASS].values
+    df_issues_statistics = read_issues_statistics(issues_statistics_path, df_submissions[SubmissionColumns.ID].values,
+                                                  df_issues)
 
     df_submissions = merge_dfs(
         df_submissions[[SubmissionColumns.ID, SubmissionColumns.GROUP, SubmissionColumns.ATTEMPT]],
@@ -54,9 +55,10 @@ def get_submissions_issues_change_statistics(submissions_path: str,
         SubmissionColumns.ID,
     )
 
+    # Diffs are vectorised over all series of a partition, so the function is not applied to each group
     get_statistics_by_group(df_submissions, issues_change_statistics_path, chunk_size,
-                            lambda submission_series: submission_series.apply(calculate_issues_change_statistics,
-                                                                              issues_classes=df_issues))
+                            partial(calculate_issues_change_statistics, issues_classes=df_issues),
+                            workers, per_group=False)
 
 
 if __name__ == '__main__':
@@ -68,16 +70,19 @@ if __name__ == '__main__':
     parser.add_argument('submissions_path', type=str,
                         help='Path to .csv file with preprocessed submissions with issues')
     parser.add_argument('issues_statistics_path', type=str,
-                        help='Path to .csv file with submissions issues count statistics')
+                        help='Path to file with submissions issues count statistics (dense or in long format)')
     parser.add_argument('issues_path', type=str, help='Path to .csv file with issues list (classes and types)')
     parser.add_argument('issues_change_statistics_path', type=str,
                         help='Path to .csv file with submissions issues statistics')
-    parser.add_argument('--chunk-size', '-c', default=5000, type=int,
+    parser.add_argument('--chunk-size', '-c', default=20000, type=int,
                         help='Number of groups which will be processed simultaneously')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes. If not specified, the number of CPUs is used.')
 
     args = parser.parse_args(sys.argv[1:])
     get_submissions_issues_change_statistics(args.submissions_path,
                                              args.issues_statistics_path,
                                              args.issues_change_statistics_path,
                                              args.issues_path,
-                                             args.chunk_size)
+                                             args.chunk_size,
+                                             args.workers)
@@ -7,7 +7,9 @@ from typing import List
 import pandas as pd
 
 from analysis.src.python.data_analysis.model.column_name import IssuesColumns, SubmissionColumns
-from analysis.src.python.data_analysis.utils.df_utils import read_df
+from analysis.src.python.data_analysis.utils.df_utils import read_df, write_df
+from analysis.src.python.data_analysis.utils.issues_matrix_utils import get_issues_count_matrix, \
+    issues_count_matrix_to_long_df
 from analysis.src.python.data_analysis.utils.statistics_utils import save_chunk
 
 
@@ -24,33 +26,56 @@ def calculate_chunk_issues_statistics(df_submissions: pd.DataFrame,
     for issue_class in issues_classes:
         issues_statistics[issue_class] = [0] * df_submissions.shape[0]
 
-    for i, submission_with_issues in df_submissions.iterrows():
-        for issue in ast.literal_eval(submission_with_issues[issue_column_name]):
+    # Chunks keep indices of the whole dataframe, so positions are used instead
+    for i, submission_issues in enumerate(df_submissions[issue_column_name].values):
+        for issue in ast.literal_eval(submission_issues):
             issues_statistics[issue[issue_class_key]][i] += 1
 
     return pd.DataFrame.from_dict(issues_statistics)
 
 
+def calculate_chunk_sparse_issues_statistics(df_submissions: pd.DataFrame,
+                                             issues_classes: List[str],
+                                             issue_column_name: str,
+                                             issue_class_key: str) -> pd.DataFrame:
+    """ Calculate number of each issue class in all submissions chunk in long format (only non zero counts). """
+
+    matrix = get_issues_count_matrix(df_submissions[issue_column_name], issues_classes, issue_class_key)
+    return issues_count_matrix_to_long_df(df_submissions[SubmissionColumns.ID].values, matrix, issues_classes)
+
+
 def get_issues_statistics(
         submissions_with_issues_path: str,
         issues_path: str,
         issue_column_name: str,
         issue_class_key: str,
         issues_statistics_path: str,
-        chunk_size: int):
-    """ Calculate number of each issue class in all submissions. """
+        chunk_size: int,
+        sparse: bool = False):
+    """ Calculate number of each issue class in all submissions.
+    If `sparse` is set, statistics are saved in long format with (`id`, `class`, `count`) row per non zero count. """
 
-    df_issues = read_df(issues_path)[IssuesColumns.CLASS].values
+    df_issues = read_df(issues_path, columns=[IssuesColumns.CLASS])[IssuesColumns.CLASS].values
     logging.info(f"Processing dataframe chunk_size={chunk_size}")
 
-    k = 0
-    for df_submissions_with_issues in pd.read_csv(submissions_with_issues_path, chunksize=chunk_size):
+    sparse_chunks = []
+    for k, df_submissions_with_issues in enumerate(pd.read_csv(submissions_with_issues_path, chunksize=chunk_size,
+                                                               usecols=[SubmissionColumns.ID, issue_column_name])):
         logging.info(f"Processing chunk: {k}")
+        if sparse:
+            sparse_chunks.append(calculate_chunk_sparse_issues_statistics(df_submissions_with_issues, df_issues,
+                                                                          issue_column_name, issue_class_key))
+            continue
+
         df_issues_statistics = calculate_chunk_issues_statistics(df_submissions_with_issues, df_issues,
                                                                  issue_column_name, issue_class_key)
 
         save_chunk(df_issues_statistics, issues_statistics_path, k)
 
+    # Statistics in long format are small enough to be saved at once in any supported format
+    if sparse:
+        write_df(pd.concat(sparse_chunks, ignore_index=True), issues_statistics_path)
+
 
 if __name__ == '__main__':
     log = logging.getLogger()
@@ -67,6 +92,9 @@ if __name__ == '__main__':
                         help='Path to .csv file with submissions issues statistics')
     parser.add_argument('--chunk-size', '-c', default=50000, type=int,
                         help='Number of groups which will be processed simultaneously')
+    parser.add_argument('--sparse', action='store_true',
+                        help='Save only non zero issue counts in long format (id, class, count). '
+                             'Use .parquet or .feather extension of issues_statistics_path for compact output')
 
     args = parser.parse_args(sys.argv[1:])
 
@@ -81,4 +109,5 @@ if __name__ == '__main__':
                           issues_type,
                           issue_class_key,
                           args.issues_statistics_path,
-                          args.chunk_size)
+                          args.chunk_size,
+                          args.sparse)
@@ -4,8 +4,11 @@ import os
 import sys
 from typing import Optional
 
+import pandas as pd
+
 from analysis.src.python.data_analysis.model.column_name import IssuesColumns, SubmissionColumns
-from analysis.src.python.data_analysis.utils.df_utils import merge_dfs, read_df
+from analysis.src.python.data_analysis.utils.df_utils import read_df
+from analysis.src.python.data_analysis.utils.issues_matrix_utils import read_issues_count_matrix
 from analysis.src.python.evaluation.common.file_util import AnalysisExtension, create_directory
 
 
@@ -16,7 +19,10 @@ def get_issues_steps_statistics(submissions_path: str,
                                 attempt_number: Optional[int]):
     """ Calculate issue count for each step. """
 
-    df_submissions = read_df(submissions_path)
+    columns = [SubmissionColumns.ID, SubmissionColumns.STEP_ID]
+    if attempt_number is not None:
+        columns.append(SubmissionColumns.ATTEMPT)
+    df_submissions = read_df(submissions_path, columns=columns)
 
     # Select submission's attempt
     if attempt_number is not None:
@@ -25,22 +31,20 @@ def get_issues_steps_statistics(submissions_path: str,
         else:
             df_submissions = df_submissions[df_submissions[SubmissionColumns.ATTEMPT] == attempt_number]
 
-    df_issues = read_df(issues_path)
-
-    df_issues_statistics = read_df(issue_statistics_path)
+    issues_classes = read_df(issues_path, columns=[IssuesColumns.CLASS])[IssuesColumns.CLASS].values
 
-    df_issues_statistics = merge_dfs(
-        df_submissions[[SubmissionColumns.ID, SubmissionColumns.STEP_ID]],
-        df_issues_statistics,
-        SubmissionColumns.ID,
-        SubmissionColumns.ID,
-    )
+    # Columns of sparse matrix are sliced without building dense issue class columns
+    matrix = read_issues_count_matrix(issue_statistics_path, df_submissions[SubmissionColumns.ID].values,
+                                      issues_classes).tocsc()
+    matrix.eliminate_zeros()
+    step_ids = df_submissions[SubmissionColumns.STEP_ID].values
 
     create_directory(issues_steps_statistics_directory_path)
-    for issue_class in df_issues[IssuesColumns.CLASS].values:
-        df_issues_statistics[[issue_class, SubmissionColumns.STEP_ID]][df_issues_statistics[issue_class] > 0][
-            [SubmissionColumns.STEP_ID]].value_counts().to_csv(os.path.join(issues_steps_statistics_directory_path,
-                                                                            f'{issue_class}{AnalysisExtension.CSV}'))
+    for i, issue_class in enumerate(issues_classes):
+        submissions_with_issue = matrix.indices[matrix.indptr[i]:matrix.indptr[i + 1]]
+        df_steps = pd.DataFrame({SubmissionColumns.STEP_ID.value: step_ids[submissions_with_issue]})
+        df_steps.value_counts().to_csv(os.path.join(issues_steps_statistics_directory_path,
+                                                    f'{issue_class}{AnalysisExtension.CSV}'))
 
 
 if __name__ == '__main__':
@@ -52,7 +56,7 @@ if __name__ == '__main__':
     parser.add_argument('submissions_path', type=str,
                         help='Path to .csv file with preprocessed submissions with issues')
     parser.add_argument('issues_statistics_path', type=str,
-                        help='Path to .csv file with submissions issues count statistics')
+                        help='Path to file with submissions issues count statistics (dense or in long format)')
     parser.add_argument('issues_steps_statistics_directory_path', type=str,
                         help='Path to directory where to save issues steps statistics for each issue class')
     parser.add_argument('issues_path', type=str, help='Path to .csv file with issues list (classes and types)')
@@ -1,8 +1,12 @@
-from typing import Callable, Dict, List
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 from pandarallel import pandarallel
 
+from analysis.src.python.evaluation.common.file_util import AnalysisExtension
+
 
 def _apply_to_row(row: pd.Series, column: str, func: Callable) -> pd.Series:
     """ Apply `func` to data in `column` of dataframe's `raw`. """
@@ -45,16 +49,37 @@ def merge_dfs(df_left: pd.DataFrame, df_right: pd.DataFrame, left_on: str, right
     return df_merged
 
 
-def read_df(path: str) -> pd.DataFrame:
-    """ Read dataframe from given .csv file. """
+def get_hash(series: pd.Series) -> pd.Series:
+    """ Get 64-bit hashes of `series` values. Hashes are stable between runs and datasets,
+    so they can be stored and used as merge keys instead of long values. """
 
-    return pd.read_csv(path)
+    hashes = pd.util.hash_pandas_object(series, index=False).values
+    # Signed integers are read back from .csv with the same type
+    return pd.Series(hashes.view(np.int64), index=series.index, name=series.name)
 
 
-def write_df(df: pd.DataFrame, path: str):
-    """ Write dataframe to given .csv file. """
+def read_df(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """ Read dataframe from given .parquet or .feather file, any other file (e.g. .csv or .csv.gz) is read as csv.
+    Only `columns` are read if they are given. """
+
+    ext = Path(path).suffix
+    if ext == AnalysisExtension.PARQUET.value:
+        return pd.read_parquet(path, columns=columns)
+    if ext == AnalysisExtension.FEATHER.value:
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
 
-    df.to_csv(path, index=False)
+
+def write_df(df: pd.DataFrame, path: str):
+    """ Write dataframe to given .parquet or .feather file, any other file (e.g. .csv or .csv.gz) is written as csv. """
+
+    ext = Path(path).suffix
+    if ext == AnalysisExtension.PARQUET.value:
+        df.to_parquet(path, index=False)
+    elif ext == AnalysisExtension.FEATHER.value:
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_csv(path, index=False)
 
 
 def append_df(df: pd.DataFrame, path: str):
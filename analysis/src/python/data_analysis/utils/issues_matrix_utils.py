@@ -0,0 +1,76 @@
+import json
+from typing import List
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from analysis.src.python.data_analysis.model.column_name import IssuesColumns, SubmissionColumns
+from analysis.src.python.data_analysis.utils.df_utils import read_df
+
+
+def get_issues_count_matrix(issues: pd.Series, issues_classes: List[str], issue_class_key: str) -> sparse.csr_matrix:
+    """ Build sparse (submission x issue class) matrix with number of each issue class in every submission.
+    Issues are given as json lists. Issues of classes, which are not in `issues_classes`, are skipped. """
+
+    class_index = {issue_class: i for i, issue_class in enumerate(issues_classes)}
+
+    rows, cols = [], []
+    for row, submission_issues in enumerate(issues.values):
+        for issue in json.loads(submission_issues):
+            col = class_index.get(issue[issue_class_key])
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+
+    data = np.ones(len(rows), dtype=np.int64)
+    # Duplicated (row, col) entries are summed up, so the same issue class is counted
+    return sparse.coo_matrix((data, (rows, cols)), shape=(issues.shape[0], len(issues_classes))).tocsr()
+
+
+def issues_count_matrix_to_long_df(ids: np.ndarray, matrix: sparse.spmatrix, issues_classes: List[str]) \
+        -> pd.DataFrame:
+    """ Convert issues count matrix to long format with one (`id`, `class`, `count`) row per non zero count. """
+
+    matrix = matrix.tocoo()
+    return pd.DataFrame({
+        SubmissionColumns.ID.value: np.asarray(ids)[matrix.row],
+        IssuesColumns.CLASS.value: np.asarray(issues_classes)[matrix.col],
+        IssuesColumns.COUNT.value: matrix.data,
+    })
+
+
+def is_issues_count_long_df(df: pd.DataFrame) -> bool:
+    """ Check if issues statistics are saved in long format. """
+
+    return set(df.columns) == {SubmissionColumns.ID.value, IssuesColumns.CLASS.value, IssuesColumns.COUNT.value}
+
+
+def read_issues_count_matrix(issues_statistics_path: str, ids: np.ndarray, issues_classes: List[str]) \
+        -> sparse.csr_matrix:
+    """ Read issues statistics as sparse matrix which rows are given submissions `ids` and columns are
+    `issues_classes`. Statistics can be saved in long format or with one column per issue class.
+    Submissions which are not presented in statistics have zero counts. """
+
+    df_statistics = read_df(issues_statistics_path)
+    shape = (len(ids), len(issues_classes))
+
+    if not is_issues_count_long_df(df_statistics):
+        counts = df_statistics.set_index(SubmissionColumns.ID.value) \
+            .reindex(index=ids, columns=issues_classes, fill_value=0).to_numpy()
+        return sparse.csr_matrix(counts, shape=shape)
+
+    rows = pd.Index(ids).get_indexer(df_statistics[SubmissionColumns.ID.value])
+    cols = pd.Index(issues_classes).get_indexer(df_statistics[IssuesColumns.CLASS.value])
+    known = (rows != -1) & (cols != -1)
+    counts = df_statistics[IssuesColumns.COUNT.value].values[known]
+    return sparse.coo_matrix((counts, (rows[known], cols[known])), shape=shape).tocsr()
+
+
+def read_issues_statistics(issues_statistics_path: str, ids: np.ndarray, issues_classes: List[str]) -> pd.DataFrame:
+    """ Read issues statistics of given submissions `ids` as dataframe with one column per issue class. """
+
+    matrix = read_issues_count_matrix(issues_statistics_path, ids, issues_classes)
+    df_statistics = pd.DataFrame(matrix.toarray(), columns=issues_classes)
+    df_statistics.insert(0, SubmissionColumns.ID.value, ids)
+    return df_statistics
@@ -1,10 +1,11 @@
 import logging
-from typing import Callable
+from typing import Callable, Optional
 
 import pandas as pd
 
 from analysis.src.python.data_analysis.model.column_name import SubmissionColumns
 from analysis.src.python.data_analysis.utils.df_utils import append_df, write_df
+from analysis.src.python.evaluation.common.parallel_util import run_in_parallel_ordered
 
 
 def save_chunk(df: pd.DataFrame, df_path: str, chunk_index: int):
@@ -14,24 +15,30 @@ def save_chunk(df: pd.DataFrame, df_path: str, chunk_index: int):
         append_df(df, df_path)
 
 
-def get_statistics_by_group(df: pd.DataFrame, df_statistics_path: str, chunk_size: int, func: Callable):
-    """ Process given dataframe dividing into chunks by group of range `chunk_size`. """
+def _apply_to_partition(df_partition: pd.DataFrame, func: Callable, per_group: bool) -> pd.DataFrame:
+    if not per_group:
+        return func(df_partition)
+    return df_partition.groupby([SubmissionColumns.GROUP], as_index=False).apply(func)
 
-    min_group, max_group = df[SubmissionColumns.GROUP.value].min(), df[SubmissionColumns.GROUP.value].max()
 
-    logging.info(f'Groups range: [{min_group}, {max_group}]')
+def get_statistics_by_group(df: pd.DataFrame, df_statistics_path: str, chunk_size: int, func: Callable,
+                            workers: Optional[int] = None, per_group: bool = True):
+    """ Process given dataframe divided into partitions by group of range `chunk_size` in `workers` processes.
+    `func` is applied to each group of the partition or to the whole partition if `per_group` is False,
+    so it must be picklable (defined at module level). Results are saved in group order as soon as they are ready. """
 
-    for i in range(min_group, max_group + 1, chunk_size):
-        min_group_index, max_group_index = i, i + chunk_size - 1
-        logging.info(f'Processing {i}-th chunk with groups: [{min_group_index}, {max_group_index})')
+    min_group, max_group = df[SubmissionColumns.GROUP.value].min(), df[SubmissionColumns.GROUP.value].max()
 
-        logging.info('Selecting dataframe chunk')
-        df_chunk = df[df[SubmissionColumns.GROUP].between(min_group_index, max_group_index, inclusive=True)]
+    logging.info(f'Groups range: [{min_group}, {max_group}]')
 
-        df_grouped_chunk = df_chunk.groupby([SubmissionColumns.GROUP], as_index=False)
+    # Rows are split into partitions once instead of filtering the whole dataframe for each partition
+    partition_ids = (df[SubmissionColumns.GROUP.value] - min_group) // chunk_size
+    partitions = df.groupby(partition_ids, sort=True)
+    logging.info(f'Number of partitions: {partitions.ngroups}')
 
-        logging.info('Applying function')
-        df_chunk_statistics = df_grouped_chunk.apply(func)
+    tasks = ((i, (df_partition, func, per_group)) for i, (_, df_partition) in enumerate(partitions))
 
-        logging.info('Saving chunk result')
-        save_chunk(df_chunk_statistics, df_statistics_path, i)
+    # Results are received in partition order, and only a few partitions per worker are processed ahead
+    for i, df_partition_statistics in run_in_parallel_ordered(_apply_to_partition, tasks, workers):
+        logging.info(f'Saving {i}-th partition result')
+        save_chunk(df_partition_statistics, df_statistics_path, i)
@@ -1,10 +1,17 @@
 import datetime
 import logging
-from dataclasses import asdict
-from typing import Dict, List, Optional, Type, TypeVar
+import math
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, replace
+from email.utils import parsedate_to_datetime
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Type, TypeVar
 
 import requests
 from dacite import Config, from_dict
+from requests.adapters import HTTPAdapter
 
 from analysis.src.python.data_collection.api.platform_auth import OauthServer
 from analysis.src.python.data_collection.api.platform_objects import BaseRequestParams, Object, ObjectResponse
@@ -13,16 +20,71 @@ from analysis.src.python.data_collection.utils.json_utils import kebab_to_snake_
 
 T = TypeVar('T', bound=Object)
 
+# Number of requests which are sent to the platform at the same time by default
+DEFAULT_CONCURRENCY = 8
+
+# Ids are passed in the url, and too long urls are rejected by servers
+MAX_IDS_PER_REQUEST = 100
+
+# Time in seconds to wait for the platform response
+REQUEST_TIMEOUT = 60
+
+# Requests which failed with these statuses (rate limit exceeded or server errors) can succeed if they are repeated
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 5
+# Delay in seconds before the first retry. It is doubled after each retry
+BACKOFF_FACTOR = 1
+
+
+class FetchError(Exception):
+    """ Request to the platform failed, so the collected data would be incomplete. """
+    pass
+
+
+def get_retry_delay(response: Optional[requests.Response], attempt: int) -> float:
+    """ Get delay before the next attempt. If the platform specifies it in the `Retry-After` header
+    (in seconds or as a date), it is used, otherwise the delay grows exponentially. """
+
+    backoff = BACKOFF_FACTOR * 2 ** attempt
+    retry_after = None if response is None else response.headers.get('Retry-After')
+    if retry_after is None:
+        return backoff
+
+    try:
+        return max(float(retry_after), 0)
+    except ValueError:
+        pass
+
+    try:
+        retry_date = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return backoff
+    return max((retry_date - datetime.datetime.now(datetime.timezone.utc)).total_seconds(), 0)
+
 
 class PlatformClient:
     """ Base class for Hyperskill and Stepik clients which wraps data exchange process according to open APIs. """
 
-    def __init__(self, host: str, client_id: str, client_secret: str, port: int):
+    def __init__(self, host: str, client_id: str, client_secret: str, port: int,
+                 concurrency: int = DEFAULT_CONCURRENCY):
         self.host = host
         self.client_id = client_id
         self.client_secret = client_secret
         self.port = port
+        self.concurrency = concurrency
         self.token = self._get_authentication_code_token()
+        self.session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """ Creates session which keeps connections to the platform open, so they are reused by requests. """
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if self.token is not None:
+            session.headers['Authorization'] = 'Bearer {token}'.format(token=self.token)
+        return session
 
     def _get_authentication_code_token(self):
         """ Runs authorization process using authentication-code grant type and
@@ -47,6 +109,75 @@ class PlatformClient:
         logging.info(f'Got token: {token}')
         return token
 
+    def _fetch_page(self,
+                    obj_class: str,
+                    obj_response_type: Type[ObjectResponse[T]],
+                    params: BaseRequestParams,
+                    page: int,
+                    obj_id: Optional[int] = None) -> Optional[ObjectResponse[T]]:
+        """ Fetch one page of objects. Params are copied, so pages can be fetched concurrently. """
+
+        page_params = replace(params, page=page)
+        logging.info(f'Getting {obj_class} page={page} params={page_params}')
+        return self._fetch(obj_class, page_params, obj_response_type, obj_id)
+
+    def _get_object_pages(self,
+                          obj_class: str,
+                          obj_response_type: Type[ObjectResponse[T]],
+                          params: BaseRequestParams,
+                          obj_id: Optional[int] = None,
+                          count: Optional[int] = None,
+                          start_page: int = 1) -> Iterator[List[T]]:
+        """ Get pages of objects (steps, topics, ect.) from platform by given `obj_class`, `params` and `obj_id`.
+        Pages are yielded as soon as they are fetched, so they can be saved without keeping all objects in memory.
+        Pages are fetched concurrently: while the platform reports that there is a next page,
+        up to `concurrency` following pages are requested in advance.
+        To resume interrupted collection, pages before `start_page` are skipped and `count` objects
+        are collected starting from it. """
+
+        # Only pages which can be needed are requested in advance
+        last_page = math.inf if count is None else start_page - 1 + math.ceil(count / params.page_size)
+        prefetch = 1 if obj_id is not None else min(self.concurrency, last_page - start_page + 1)
+
+        objects_number = 0
+        with ThreadPoolExecutor(max_workers=max(prefetch, 1)) as executor:
+            def submit(page_to_fetch: int) -> Future:
+                return executor.submit(self._fetch_page, obj_class, obj_response_type, params, page_to_fetch, obj_id)
+
+            pages = {page: submit(page) for page in range(start_page, start_page + prefetch)}
+            page = start_page
+            try:
+                while count is None or objects_number < count:
+                    # Pages may contain fewer objects than expected, so the page may be not requested yet
+                    future = pages.pop(page, None) or submit(page)
+                    try:
+                        response = future.result()
+                    except FetchError as e:
+                        # Data is not truncated silently, since the following pages are not fetched
+                        logging.error(f'Unable to get {obj_class} page={page} params={params}: {e}')
+                        raise
+
+                    if response is None:
+                        break
+
+                    objects = response.get_objects()
+                    if count is not None:
+                        objects = objects[:count - objects_number]
+                    objects_number += len(objects)
+                    yield objects
+
+                    if not response.meta.has_next:
+                        break
+                    page += 1
+
+                    next_page = page + prefetch - 1
+                    if next_page <= last_page:
+                        pages[next_page] = submit(next_page)
+            finally:
+                # Pages after the last one are not needed
+                for future in pages.values():
+                    future.cancel()
+
     def _get_objects(self,
                      obj_class: str,
                      obj_response_type: Type[ObjectResponse[T]],
@@ -55,28 +186,45 @@ class PlatformClient:
                      count: Optional[int] = None) -> List[T]:
         """ Get objects (steps, topics, ect.) from platform by given `obj_class`, `params` and `obj_id`."""
 
-        objects = []
-        page = 1
-        while count is None or len(objects) < count:
-            logging.info(f'Getting {obj_class} page={page} params={params}')
-            try:
-                params.page = page
-                response = self._fetch(obj_class, params, obj_response_type, obj_id)
-                if response is None:
-                    break
-                objects += response.get_objects()
+        return list(chain.from_iterable(self._get_object_pages(obj_class, obj_response_type, params, obj_id, count)))
 
-                if count is not None and len(objects) >= count:
-                    return objects[:count]
+    def _get_object_pages_by_ids(self,
+                                 obj_class: str,
+                                 obj_ids: List[int],
+                                 obj_response_type: Type[ObjectResponse[T]],
+                                 params: BaseRequestParams,
+                                 count: Optional[int] = None,
+                                 start_page: int = 1) -> Iterator[List[T]]:
+        """ Get pages of objects (steps, topics, ect.) from platform by given `obj_class`, `params` and `obj_ids`.
+        Ids are requested in batches no larger than `page_size`, so each batch fits in one page, and up to
+        `concurrency` batches are fetched at the same time. Batches before `start_page` are skipped. """
 
-                if response.meta.has_next:
-                    page += 1
-                else:
-                    break
-            except Exception as e:
-                logging.error(f'Unable to get {obj_class} page={page} params={params}: {e}')
+        batch_size = min(params.page_size, MAX_IDS_PER_REQUEST)
+        obj_ids = obj_ids[(start_page - 1) * batch_size:]
+        if count is not None:
+            obj_ids = obj_ids[:count]
 
-        return objects
+        ids_batches = (obj_ids[i:i + batch_size] for i in range(0, len(obj_ids), batch_size))
+
+        def fetch_batch(ids_batch: List[int]) -> List[T]:
+            response = self._fetch_page(obj_class, obj_response_type, replace(params, ids=ids_batch), page=1)
+            return [] if response is None else response.get_objects()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            def submit(number: int) -> None:
+                batches.extend(executor.submit(fetch_batch, ids_batch) for ids_batch in islice(ids_batches, number))
+
+            # Batches are submitted lazily, so fetched pages do not pile up if they are saved slower
+            batches = deque()
+            submit(self.concurrency)
+            try:
+                while batches:
+                    objects = batches.popleft().result()
+                    submit(1)
+                    yield objects
+            finally:
+                for future in batches:
+                    future.cancel()
 
     def _get_objects_by_ids(self,
                             obj_class: str,
@@ -86,13 +234,21 @@ class PlatformClient:
                             count: Optional[int] = None) -> List[T]:
         """ Get objects (steps, topics, ect.) from platform by given `obj_class`, `params` and `obj_ids`."""
 
-        objects = []
-        for obj_id in obj_ids:
-            objects += self._get_objects(obj_class, obj_response_type, params, obj_id)
-            if count is not None and len(objects) >= count:
-                return objects[:count]
+        return list(chain.from_iterable(
+            self._get_object_pages_by_ids(obj_class, obj_ids, obj_response_type, params, count),
+        ))
 
-        return objects
+    @staticmethod
+    def _limit_pages(pages: Iterable[List[T]], count: Optional[int] = None) -> Iterator[List[T]]:
+        """ Yield pages until `count` objects are yielded. """
+
+        objects_number = 0
+        for objects in pages:
+            if count is not None and objects_number + len(objects) >= count:
+                yield objects[:count - objects_number]
+                return
+            objects_number += len(objects)
+            yield objects
 
     @staticmethod
     def _prepare_params(params: BaseRequestParams) -> Dict[str, str]:
@@ -108,30 +264,54 @@ class PlatformClient:
             dict_params[key] = value
         return dict_params
 
+    def _request(self, api_url: str, params: Dict[str, str]) -> Optional[requests.Response]:
+        """ Sends request to the platform. Requests failed because of rate limit, server or connection errors are
+        repeated up to `MAX_RETRIES` times. Returns None if the platform has not found requested objects. """
+
+        response, error = None, None
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt > 0:
+                delay = get_retry_delay(response, attempt - 1)
+                logging.warning(f'Failed to fetch {api_url}: {error}. Retry in {delay} seconds')
+                time.sleep(delay)
+
+            try:
+                response = self.session.get(api_url, params=params, timeout=REQUEST_TIMEOUT)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+                continue
+
+            if response.status_code == 200:
+                return response
+            if response.status_code == 404:
+                logging.info(f'No objects at {api_url} params={params}')
+                return None
+
+            error = f'status {response.status_code}'
+            if response.status_code not in TRANSIENT_STATUSES:
+                break
+
+        raise FetchError(f'Failed to fetch {api_url} params={params}: {error}')
+
     def _fetch(self,
                obj_class: str,
                params: BaseRequestParams,
                obj_response_type: Type[ObjectResponse[T]],
                obj_id: Optional[int] = None) -> Optional[ObjectResponse[T]]:
         """ Builds, executed and processes request to educational platform.
-        Response is parsed to `obj_response_type`."""
+        Response is parsed to `obj_response_type`. Returns None if there are no requested objects
+        and raises `FetchError` if the request failed. """
 
         dict_params = self._prepare_params(params)
         api_url = '{host}/api/{obj_class}s'.format(host=self.host, obj_class=obj_class)
 
         if obj_id is not None:
             api_url = '{url}/{obj_id}'.format(url=api_url, obj_id=obj_id)
-        if self.token is not None:
-            raw_response = requests.get(api_url, headers={'Authorization': 'Bearer {token}'.format(token=self.token)},
-                                        params=dict_params, timeout=None)
-        else:
-            raw_response = requests.get(api_url, params=dict_params, timeout=None)
 
-        if raw_response is None or raw_response.status_code != 200:
-            logging.warning(f"Failed to fetch {api_url}: {raw_response}")
+        raw_response = self._request(api_url, dict_params)
+        if raw_response is None:
             return None
-        else:
-            response_json = raw_response.json()
+        response_json = raw_response.json()
 
         preprocessed_response = kebab_to_snake_case(response_json)
         return from_dict(data_class=obj_response_type,
@@ -1,12 +1,13 @@
 import os
-from typing import Callable, Dict, List, Optional
+from itertools import chain, islice
+from typing import Callable, Dict, Iterator, List, Optional
 
-from analysis.src.python.data_collection.api.platform_client import PlatformClient
+from analysis.src.python.data_collection.api.platform_client import DEFAULT_CONCURRENCY, PlatformClient
 from analysis.src.python.data_collection.api.platform_objects import BaseRequestParams, Object
 from analysis.src.python.data_collection.hyperskill.api.projects import Project, ProjectsResponse
 from analysis.src.python.data_collection.hyperskill.api.search_results import \
     SearchResult, SearchResultsRequestParams, SearchResultsResponse
-from analysis.src.python.data_collection.hyperskill.api.steps import StepsRequestParams, StepsResponse
+from analysis.src.python.data_collection.hyperskill.api.steps import Step, StepsRequestParams, StepsResponse
 from analysis.src.python.data_collection.hyperskill.api.submissions import Submission, SubmissionRequestParams, \
     SubmissionResponse
 from analysis.src.python.data_collection.hyperskill.api.topics import Topic, TopicsResponse
@@ -22,13 +23,13 @@ class HyperskillClient(PlatformClient):
     for data exchange.
     """
 
-    def __init__(self, port: int = 8000):
+    def __init__(self, port: int = 8000, concurrency: int = DEFAULT_CONCURRENCY):
         client_id = os.environ.get(HyperskillPlatform.CLIENT_ID)
         client_secret = os.environ.get(HyperskillPlatform.CLIENT_SECRET)
-        super().__init__(HyperskillPlatform.BASE_URL, client_id, client_secret, port)
+        super().__init__(HyperskillPlatform.BASE_URL, client_id, client_secret, port, concurrency)
 
-        self._get_objects_by_class: Dict[
-            ObjectClass, Callable[[Optional[List[int]], Optional[int]], List[Object]]] = {
+        self._get_object_pages_by_class: Dict[
+            ObjectClass, Callable[[Optional[List[int]], Optional[int], int], Iterator[List[Object]]]] = {
             ObjectClass.TOPIC: self.get_topics,
             ObjectClass.TRACK: self.get_tracks,
             ObjectClass.PROJECT: self.get_projects,
@@ -37,67 +38,81 @@ class HyperskillClient(PlatformClient):
             ObjectClass.SUBMISSION: self.get_submissions,
         }
 
-    def get_objects(self, obj: str, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Object]:
+    def get_objects(self, obj: str, ids: Optional[List[int]] = None,
+                    count: Optional[int] = None, start_page: int = 1) -> Iterator[List[Object]]:
+        """ Returns pages of objects. Pages are fetched lazily, so they can be saved one by one.
+        Pages before `start_page` are skipped. """
         if obj not in ObjectClass.values():
-            return self.get_search_result(obj, count)
+            return self.get_search_result(obj, count, start_page)
         else:
-            return self._get_objects_by_class[ObjectClass(obj)](ids, count)
+            return self._get_object_pages_by_class[ObjectClass(obj)](ids, count, start_page)
 
-    def get_search_result(self, query: str, count: Optional[int] = None) -> List[SearchResult]:
+    def get_search_result(self, query: str, count: Optional[int] = None,
+                          start_page: int = 1) -> Iterator[List[SearchResult]]:
         """ Returns objects which are best matched the query."""
-        return self._get_objects(ObjectClass.SEARCH_RESULT, SearchResultsResponse,
-                                 SearchResultsRequestParams(query=query), count=count)
+        return self._get_object_pages(ObjectClass.SEARCH_RESULT, SearchResultsResponse,
+                                      SearchResultsRequestParams(query=query), count=count, start_page=start_page)
 
     def get_steps(self, ids: Optional[List[int]] = None,
                   count: Optional[int] = None,
-                  topic_ids: Optional[List[int]] = None):
+                  start_page: int = 1,
+                  topic_ids: Optional[List[int]] = None) -> Iterator[List[Step]]:
         """ Returns steps data. If topic_ids are defined method returns steps only related to listed topics, otherwise
          return all steps. """
         if topic_ids is None:
-            return self._get_objects(ObjectClass.STEP, StepsResponse, StepsRequestParams(ids=ids), count=count)
-        else:
-            steps = []
-            for topic_id in topic_ids:
-                steps += self._get_objects(ObjectClass.STEP, StepsResponse,
-                                           StepsRequestParams(topic=topic_id), count=count)
-                if count is not None and len(steps) >= count:
-                    return steps[:count]
-        return steps
+            return self._get_object_pages(ObjectClass.STEP, StepsResponse, StepsRequestParams(ids=ids),
+                                          count=count, start_page=start_page)
+
+        # Skipped pages are not limited by count, otherwise pages of the topic can be split differently
+        topic_count = count if start_page == 1 else None
+        pages = chain.from_iterable(
+            self._get_object_pages(ObjectClass.STEP, StepsResponse, StepsRequestParams(topic=topic_id),
+                                   count=topic_count)
+            for topic_id in topic_ids
+        )
+        return self._limit_pages(islice(pages, start_page - 1, None), count)
 
-    def get_topics(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Topic]:
+    def get_topics(self, ids: Optional[List[int]] = None, count: Optional[int] = None,
+                   start_page: int = 1) -> Iterator[List[Topic]]:
         """ Returns topics data. """
-        return self._get_objects(ObjectClass.TOPIC, TopicsResponse,
-                                 BaseRequestParams(ids=ids), count=count)
+        return self._get_object_pages(ObjectClass.TOPIC, TopicsResponse,
+                                      BaseRequestParams(ids=ids), count=count, start_page=start_page)
 
-    def get_projects(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Project]:
+    def get_projects(self, ids: Optional[List[int]] = None, count: Optional[int] = None,
+                     start_page: int = 1) -> Iterator[List[Project]]:
         """ Returns projects data. """
-        return self._get_objects(ObjectClass.PROJECT, ProjectsResponse,
-                                 BaseRequestParams(ids=ids), count=count)
+        return self._get_object_pages(ObjectClass.PROJECT, ProjectsResponse,
+                                      BaseRequestParams(ids=ids), count=count, start_page=start_page)
 
-    def get_tracks(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Track]:
+    def get_tracks(self, ids: Optional[List[int]] = None, count: Optional[int] = None,
+                   start_page: int = 1) -> Iterator[List[Track]]:
         """ Returns tracks data. """
-        return self._get_objects(ObjectClass.TRACK, TracksResponse,
-                                 BaseRequestParams(ids=ids), count=count)
+        return self._get_object_pages(ObjectClass.TRACK, TracksResponse,
+                                      BaseRequestParams(ids=ids), count=count, start_page=start_page)
 
-    def get_users(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[User]:
+    def get_users(self, ids: Optional[List[int]] = None, count: Optional[int] = None,
+                  start_page: int = 1) -> Iterator[List[User]]:
         """ Returns users data. Only about users which have shared their profile data. """
-        return self._get_objects(ObjectClass.USER, UserResponse,
-                                 BaseRequestParams(ids=ids), count=count)
+        return self._get_object_pages(ObjectClass.USER, UserResponse,
+                                      BaseRequestParams(ids=ids), count=count, start_page=start_page)
 
     def get_submissions(self, ids: Optional[List[int]] = None,
                         count: Optional[int] = None,
+                        start_page: int = 1,
                         step_ids: Optional[List[int]] = None,
-                        user_ids: Optional[List[int]] = None) -> List[Submission]:
+                        user_ids: Optional[List[int]] = None) -> Iterator[List[Submission]]:
         """ Returns submissions data. Only for steps, which have been passed by application owner and only submissions
         which were shared by user. """
         if user_ids is None:
-            return self._get_objects(ObjectClass.SUBMISSION, SubmissionResponse,
-                                     SubmissionRequestParams(ids=ids, step=step_ids), count=count)
+            return self._get_object_pages(ObjectClass.SUBMISSION, SubmissionResponse,
+                                          SubmissionRequestParams(ids=ids, step=step_ids), count=count,
+                                          start_page=start_page)
 
-        submissions = []
-        for user_id in user_ids:
-            submissions += self._get_objects(ObjectClass.SUBMISSION, SubmissionResponse,
-                                             SubmissionRequestParams(ids=ids, step=step_ids, user=user_id), count=count)
-            if count is not None and len(submissions) >= count:
-                return submissions[:count]
-        return submissions
+        # Skipped pages are not limited by count, otherwise pages of the user can be split differently
+        user_count = count if start_page == 1 else None
+        pages = chain.from_iterable(
+            self._get_object_pages(ObjectClass.SUBMISSION, SubmissionResponse,
+                                   SubmissionRequestParams(ids=ids, step=step_ids, user=user_id), count=user_count)
+            for user_id in user_ids
+        )
+        return self._limit_pages(islice(pages, start_page - 1, None), count)
@@ -1,14 +1,18 @@
 import argparse
 import logging
+import os
 import sys
-from typing import List
+from typing import List, Optional
 
 import pandas as pd
 
+from analysis.src.python.data_collection.api.platform_client import DEFAULT_CONCURRENCY, PlatformClient
 from analysis.src.python.data_collection.api.platform_objects import Platform
 from analysis.src.python.data_collection.hyperskill.hyperskill_client import HyperskillClient
 from analysis.src.python.data_collection.stepik.stepik_client import StepikClient
 from analysis.src.python.data_collection.utils.csv_utils import save_objects_to_csv
+from analysis.src.python.data_collection.utils.sync_state import get_max_time, get_sync_state_key, \
+    get_sync_state_path, read_sync_state, SyncState, take_new_objects, write_sync_state
 
 platform_client = {
     Platform.HYPERSKILL: HyperskillClient,
@@ -30,6 +34,13 @@ def configure_parser() -> argparse.ArgumentParser:
     parser.add_argument('--output', '-out', type=str, default='results',
                         help='path to directory where to save the results')
     parser.add_argument('--port', '-p', type=int, default=8000, help='port to run authorization server at')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help='number of requests which are sent to platform at the same time')
+    sync_group = parser.add_mutually_exclusive_group()
+    sync_group.add_argument('--resume', action='store_true',
+                            help='continue interrupted collection from the last saved page')
+    sync_group.add_argument('--incremental', action='store_true',
+                            help='collect only submissions which are newer than submissions collected before')
     return parser
 
 
@@ -41,15 +52,85 @@ def get_object_ids_from_file(csv_file_path: str, column_name: str) -> List[int]:
     return list(pd.read_csv(csv_file_path)[column_name].unique().values)
 
 
+def _truncate_file(file_path: str, size: int):
+    if os.path.exists(file_path):
+        with open(file_path, 'r+b') as f:
+            f.truncate(size)
+
+
+def collect_objects(client: PlatformClient, platform: Platform, obj: str, ids: Optional[List[int]],
+                    count: Optional[int], output_path: str, resume: bool = False, incremental: bool = False):
+    """
+    Collect objects from platform and save them to csv. Sync state is saved after each page, so interrupted
+    collection can be resumed. After collection is completed, the state keeps the latest time of collected objects,
+    so the next incremental collection requests only newer objects and appends them to the csv.
+    """
+    # Ids are limited in advance, so the rest of ids to collect does not depend on the number of found objects
+    if ids is not None and count is not None:
+        ids, count = ids[:count], None
+
+    csv_path = os.path.join(output_path, f'{obj}s.csv')
+    key = get_sync_state_key(platform.value, obj, ids, count)
+    state_path = get_sync_state_path(output_path, key)
+    state = read_sync_state(state_path) if resume or incremental else None
+
+    if state is not None:
+        # Rows which were written after the state was saved are not complete
+        _truncate_file(csv_path, state.csv_size)
+
+    if incremental and state is not None and state.completed and state.max_time is not None:
+        logging.info(f'Collecting {obj}s newer than {state.max_time}')
+        previous_max_time = state.max_time
+
+        def update_state(objects: list):
+            state.objects_number += len(objects)
+            state.max_time = get_max_time(objects, state.max_time)
+
+        object_pages = take_new_objects(client.get_objects(obj, ids, count), previous_max_time)
+        save_objects_to_csv(output_path, object_pages, obj, append=True, on_page_saved=update_state)
+        # New objects can be on any page, so the state is saved only when all pages are checked
+        state.csv_size = os.path.getsize(csv_path) if os.path.exists(csv_path) else 0
+        write_sync_state(state_path, state)
+        return
+
+    if resume and state is not None and state.completed:
+        logging.info(f'Collection of {obj}s is already completed')
+        return
+
+    resumed = resume and state is not None
+    if resumed:
+        logging.info(f'Resuming collection of {obj}s from page {state.page + 1}')
+        remaining_count = None if count is None else count - state.objects_number
+        object_pages = client.get_objects(obj, ids, remaining_count, start_page=state.page + 1)
+    else:
+        if incremental:
+            logging.info(f'There is no completed collection of {obj}s, so all {obj}s are collected')
+        state = SyncState(key)
+        object_pages = client.get_objects(obj, ids, count)
+
+    def save_state(objects: list):
+        state.page += 1
+        state.objects_number += len(objects)
+        state.max_time = get_max_time(objects, state.max_time)
+        state.csv_size = os.path.getsize(csv_path) if os.path.exists(csv_path) else 0
+        write_sync_state(state_path, state)
+
+    save_objects_to_csv(output_path, object_pages, obj, append=resumed, on_page_saved=save_state)
+    state.completed = True
+    write_sync_state(state_path, state)
+
+
 logging.basicConfig(level=logging.DEBUG)
 
 if __name__ == '__main__':
 
     parser = configure_parser()
     args = parser.parse_args(sys.argv[1:])
+    if args.incremental and args.object != 'submission':
+        parser.error('Only submissions can be collected incrementally')
 
     platform = Platform(args.platform)
-    client = platform_client[platform]()
+    client = platform_client[platform](args.port, args.concurrency)
 
     if args.ids is not None:
         ids = args.ids
@@ -58,5 +139,4 @@ if __name__ == '__main__':
     else:
         ids = None
 
-    objects = client.get_objects(args.object, ids, args.count)
-    save_objects_to_csv(args.output, objects, args.object)
+    collect_objects(client, platform, args.object, ids, args.count, args.output, args.resume, args.incremental)
@@ -1,7 +1,8 @@
 import os
-from typing import Callable, Dict, List, Optional, Type, TypeVar
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type, TypeVar
 
-from analysis.src.python.data_collection.api.platform_client import PlatformClient
+from analysis.src.python.data_collection.api.platform_client import DEFAULT_CONCURRENCY, PlatformClient
 from analysis.src.python.data_collection.api.platform_objects import BaseRequestParams, Object, ObjectResponse
 from analysis.src.python.data_collection.stepik.api.courses import Course, CoursesResponse
 from analysis.src.python.data_collection.stepik.api.lessons import Lesson, LessonsResponse
@@ -17,13 +18,13 @@ T = TypeVar('T', bound=Object)
 
 class StepikClient(PlatformClient):
 
-    def __init__(self, port: int = 8000):
+    def __init__(self, port: int = 8000, concurrency: int = DEFAULT_CONCURRENCY):
         client_id = os.environ.get('STEPIK_CLIENT_ID')
         client_secret = os.environ.get('STEPIK_CLIENT_SECRET')
-        super().__init__(StepikPlatform.BASE_URL, client_id, client_secret, port)
+        super().__init__(StepikPlatform.BASE_URL, client_id, client_secret, port, concurrency)
 
-        self._get_objects_by_class: Dict[
-            ObjectClass, Callable[[Optional[List[int]], Optional[int]], List[Object]]] = {
+        self._get_object_pages_by_class: Dict[
+            ObjectClass, Callable[[Optional[List[int]], Optional[int], int], Iterator[List[Object]]]] = {
             ObjectClass.COURSE: self.get_courses,
             ObjectClass.LESSON: self.get_lessons,
             ObjectClass.STEP: self.get_steps,
@@ -31,36 +32,62 @@ class StepikClient(PlatformClient):
             ObjectClass.SUBMISSION: self.get_submissions,
         }
 
-    def get_objects(self, obj: str, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Object]:
+    def get_objects(self, obj: str, ids: Optional[List[int]] = None,
+                    count: Optional[int] = None, start_page: int = 1) -> Iterator[List[Object]]:
+        """ Returns pages of objects. Pages are fetched lazily, so they can be saved one by one.
+        Pages before `start_page` are skipped. """
         if obj not in ObjectClass.values():
-            return self.get_search_result(obj, count)
+            return self.get_search_result(obj, count, start_page)
         else:
-            return self._get_objects_by_class[ObjectClass(obj)](ids, count)
+            return self._get_object_pages_by_class[ObjectClass(obj)](ids, count, start_page)
 
-    def get_search_result(self, query: str, count: Optional[int] = None) -> List[SearchResult]:
-        return self._get_objects(ObjectClass.SEARCH_RESULT, SearchResultsResponse,
-                                 SearchResultsRequestParams(query=query), count=count)
+    def get_search_result(self, query: str, count: Optional[int] = None,
+                          start_page: int = 1) -> Iterator[List[SearchResult]]:
+        return self._get_object_pages(ObjectClass.SEARCH_RESULT, SearchResultsResponse,
+                                      SearchResultsRequestParams(query=query), count=count, start_page=start_page)
 
-    def get_courses(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Course]:
-        return self._get_objects_default(ids, count, ObjectClass.COURSE, CoursesResponse)
+    def get_courses(self, ids: Optional[List[int]] = None, count: Optional[int] = None,
+                    start_page: int = 1) -> Iterator[List[Course]]:
+        return self._get_objects_default(ids, count, start_page, ObjectClass.COURSE, CoursesResponse)
 
-    def get_lessons(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Lesson]:
-        return self._get_objects_default(ids, count, ObjectClass.LESSON, LessonsResponse)
+    def get_lessons(self, ids: Optional[List[int]] = None, count: Optional[int] = None,
+                    start_page: int = 1) -> Iterator[List[Lesson]]:
+        return self._get_objects_default(ids, count, start_page, ObjectClass.LESSON, LessonsResponse)
 
-    def get_steps(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Step]:
-        return self._get_objects_default(ids, count, ObjectClass.STEP, StepsResponse)
+    def get_steps(self, ids: Optional[List[int]] = None, count: Optional[int] = None,
+                  start_page: int = 1) -> Iterator[List[Step]]:
+        return self._get_objects_default(ids, count, start_page, ObjectClass.STEP, StepsResponse)
 
-    def get_users(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[User]:
-        return self._get_objects_default(ids, count, ObjectClass.USER, UsersResponse)
+    def get_users(self, ids: Optional[List[int]] = None, count: Optional[int] = None,
+                  start_page: int = 1) -> Iterator[List[User]]:
+        return self._get_objects_default(ids, count, start_page, ObjectClass.USER, UsersResponse)
 
-    def get_submissions(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Submission]:
-        return self._get_objects_default(ids, count, ObjectClass.SUBMISSION, SubmissionsResponse)
+    def get_submissions(self, ids: Optional[List[int]] = None, count: Optional[int] = None,
+                        start_page: int = 1) -> Iterator[List[Submission]]:
+        return self._get_objects_default(ids, count, start_page, ObjectClass.SUBMISSION, SubmissionsResponse)
+
+    @staticmethod
+    def _prepare_params(params: BaseRequestParams) -> Dict[str, Any]:
+        """ Prepare request params. Remove None params. Stepik API expects list values to be passed as
+        repeated params with `[]` suffix, for example `ids[]=1&ids[]=2`. """
+
+        dict_params = {}
+        for key, value in asdict(params).items():
+            if value is None:
+                continue
+            if isinstance(value, list):
+                key = f'{key}[]'
+            dict_params[key] = value
+        return dict_params
 
     def _get_objects_default(self,
                              ids: Optional[List[int]],
                              count: Optional[int],
+                             start_page: int,
                              obj_class: ObjectClass,
-                             obj_response_type: Type[ObjectResponse[T]]) -> List[T]:
+                             obj_response_type: Type[ObjectResponse[T]]) -> Iterator[List[T]]:
         params = BaseRequestParams()
-        return self._get_objects_by_ids(obj_class, ids, obj_response_type, params, count=count) if ids is not None \
-            else self._get_objects(obj_class, obj_response_type, params, count=count)
+        if ids is not None:
+            return self._get_object_pages_by_ids(obj_class, ids, obj_response_type, params,
+                                                 count=count, start_page=start_page)
+        return self._get_object_pages(obj_class, obj_response_type, params, count=count, start_page=start_page)
@@ -2,39 +2,77 @@ import csv
 import logging
 import os
 from dataclasses import asdict
-from typing import List, TypeVar
+from typing import Callable, Iterable, List, Optional, TypeVar
 
 from analysis.src.python.data_collection.api.platform_objects import Object
 
+# Size of the buffer in which rows are collected before they are written to the file (in bytes)
+WRITE_BUFFER_SIZE = 1024 * 1024
+
 
 class CsvWriter:
+    """ Writer keeps the file open until it is closed, so rows are written through one buffered handle. """
 
-    def __init__(self, result_dir: str, csv_file: str, field_names: List[str]):
+    def __init__(self, result_dir: str, csv_file: str, field_names: List[str], append: bool = False):
         os.makedirs(result_dir, exist_ok=True)
         self.csv_path = os.path.join(result_dir, csv_file)
         self.fieldnames = field_names
 
-        with open(self.csv_path, 'w+', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=field_names)
-            writer.writeheader()
+        # Header is already written to the file, which is continued
+        append = append and os.path.exists(self.csv_path) and os.path.getsize(self.csv_path) > 0
+
+        self.file = open(self.csv_path, 'a' if append else 'w', newline='', encoding='utf8',
+                         buffering=WRITE_BUFFER_SIZE)
+        self.writer = csv.DictWriter(self.file, fieldnames=field_names)
+        if not append:
+            self.writer.writeheader()
 
     def write_csv(self, data: dict):
-        with open(self.csv_path, 'a+', newline='', encoding='utf8') as f:
-            writer = csv.DictWriter(f, fieldnames=self.fieldnames)
-            writer.writerow({k: data[k] for k in self.fieldnames})
+        self.writer.writerow({k: data[k] for k in self.fieldnames})
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self) -> 'CsvWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
 
 T = TypeVar('T', bound=Object)
 
 
-def save_objects_to_csv(output_path: str, objects: List[T], obj_class: str):
-    if len(objects) == 0:
-        return
+def save_objects_to_csv(output_path: str, object_pages: Iterable[List[T]], obj_class: str,
+                        append: bool = False,
+                        on_page_saved: Optional[Callable[[List[T]], None]] = None) -> int:
+    """ Save pages of objects one by one, so only one page is kept in memory. Returns the number of saved objects.
+    If `append` is set, objects are added to the existing file. `on_page_saved` is called with every page
+    (including empty ones) after the page is flushed to the file. """
+    csv_writer = None
+    objects_number = 0
+    try:
+        for objects in object_pages:
+            if len(objects) > 0:
+                if csv_writer is None:
+                    logging.info(f'Writing objects of type {type(objects[0])} to csv: {output_path}/{obj_class}s.csv')
+                    field_names = list(type(objects[0]).__annotations__.keys())
+                    csv_writer = CsvWriter(output_path, f'{obj_class}s.csv', field_names, append)
+
+                for obj in objects:
+                    csv_writer.write_csv(asdict(obj))
+                objects_number += len(objects)
+                logging.info(f'Written {objects_number} objects')
 
-    if not os.path.exists(output_path):
-        os.makedirs(output_path)
+            if on_page_saved is not None:
+                if csv_writer is not None:
+                    csv_writer.flush()
+                on_page_saved(objects)
+    finally:
+        if csv_writer is not None:
+            csv_writer.close()
 
-    logging.info(f'Writing {len(objects)} of type {type(objects[0])} to csv: {output_path}/{obj_class}s.csv')
-    csv_writer = CsvWriter(output_path, f'{obj_class}s.csv', list(type(objects[0]).__annotations__.keys()))
-    for obj in objects:
-        csv_writer.write_csv(asdict(obj))
+    return objects_number
@@ -0,0 +1,88 @@
+import datetime
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Iterable, Iterator, List, Optional, TypeVar
+
+from analysis.src.python.data_collection.api.platform_objects import Object
+
+"""
+This file contains the sync state of the data collection, which is saved next to the collected objects.
+The state allows to resume interrupted collection from the last saved page and to collect only objects,
+which appeared on the platform after the last collection.
+"""
+
+SYNC_STATE_DIR = '.sync_state'
+
+# Objects attributes with the time of object creation or update, which are used to find new objects
+TIME_ATTRIBUTES = ['time', 'updated_at']
+
+T = TypeVar('T', bound=Object)
+
+
+@dataclass
+class SyncState:
+    """ `page` is the last saved page, `csv_size` is the size of the csv file after the page was saved
+    and `max_time` is the latest time of collected objects in iso format. """
+    key: dict
+    page: int = 0
+    objects_number: int = 0
+    csv_size: int = 0
+    max_time: Optional[str] = None
+    completed: bool = False
+
+
+def get_sync_state_key(platform: str, obj: str, ids: Optional[List[int]], count: Optional[int]) -> dict:
+    return {'platform': platform, 'object': obj, 'ids': ids, 'count': count}
+
+
+def get_sync_state_path(output_path: str, key: dict) -> str:
+    """ Collections with different params have separate states, so state file name contains the hash of params. """
+    key_hash = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+    return os.path.join(output_path, SYNC_STATE_DIR, f'{key["platform"]}_{key_hash}.json')
+
+
+def read_sync_state(state_path: str) -> Optional[SyncState]:
+    if not os.path.exists(state_path):
+        return None
+
+    with open(state_path) as f:
+        return SyncState(**json.load(f))
+
+
+def write_sync_state(state_path: str, state: SyncState):
+    """ State is written to the temporary file first, so it is not corrupted if collection is interrupted. """
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    tmp_path = f'{state_path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(asdict(state), f, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+def get_object_time(obj: Object) -> Optional[datetime.datetime]:
+    for attribute in TIME_ATTRIBUTES:
+        value = getattr(obj, attribute, None)
+        if isinstance(value, datetime.datetime):
+            return value
+    return None
+
+
+def get_max_time(objects: Iterable[Object], max_time: Optional[str] = None) -> Optional[str]:
+    times = [time for time in map(get_object_time, objects) if time is not None]
+    if max_time is not None:
+        times.append(datetime.datetime.fromisoformat(max_time))
+    return max(times).isoformat() if times else None
+
+
+def take_new_objects(object_pages: Iterable[List[T]], since: str) -> Iterator[List[T]]:
+    """ Yield objects which are newer than `since`. The order of objects returned by platforms is not guaranteed,
+    so all pages are filtered instead of stopping at the first object which is not newer. """
+    since_time = datetime.datetime.fromisoformat(since)
+    for objects in object_pages:
+        new_objects = []
+        for obj in objects:
+            time = get_object_time(obj)
+            if time is not None and time > since_time:
+                new_objects.append(obj)
+        yield new_objects
@@ -2,21 +2,43 @@ import argparse
 import logging
 import os
 import re
+import shutil
+import subprocess
 import time
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
+from enum import Enum, unique
 from pathlib import Path
-from typing import List, Tuple
+from typing import BinaryIO, Dict, List, Optional, Tuple
 
 import pandas as pd
 
 from analysis.src.python.evaluation.batching.batch_config import BatchConfig
-from analysis.src.python.evaluation.common.csv_util import append_dataframe_to_csv, write_dataframe_to_csv
-from analysis.src.python.evaluation.common.file_util import AnalysisExtension, create_directory, get_name_from_path
-from analysis.src.python.evaluation.common.parallel_util import run_and_wait
+from analysis.src.python.evaluation.common.args_util import EvaluationRunToolArgument
+from analysis.src.python.evaluation.common.csv_util import get_csv_row_offsets, write_dataframe_to_csv
+from analysis.src.python.evaluation.common.file_util import AnalysisExtension, create_directory, get_name_from_path, \
+    remove_directory
 
 logger = logging.getLogger(__name__)
 
 
+# Size of the buffer used to copy batch results (in bytes)
+COPY_BUFFER_SIZE = 16 * 1024 * 1024
+
+# How often the scheduler checks whether running batches are finished (in seconds)
+POLL_INTERVAL = 1
+
+# The file which is created in the batch output directory when the batch is finished successfully
+DONE_MARKER = '.done'
+
+
+@unique
+class BatchStatus(Enum):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+
 def configure_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument("input_path", help="Path to the csv file with data to process",
                         type=lambda value: Path(value).absolute())
@@ -25,7 +47,138 @@ def configure_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument("config_path", help="Path to the script config to run under batching",
                         type=lambda value: Path(value).absolute())
     parser.add_argument("--batch-size", help="Batch size for data", nargs='?', default=1000, type=int)
-    parser.add_argument("--start-from", help="Index of batch to start processing from", nargs='?', default=0, type=int)
+    parser.add_argument("--jobs", help="Number of batches that are processed concurrently", default=1, type=int)
+    parser.add_argument("--retries", help="Number of times a failed batch is restarted", default=1, type=int)
+    parser.add_argument("--index-batches",
+                        help="Pass the script byte offsets of the batch rows in the input file "
+                             "instead of writing a copy of each batch. The script must support --byte-range",
+                        action='store_true')
+
+
+def is_batch_processed(batch_output_path: str) -> bool:
+    # Killed or crashed batches may leave partial output, so only the marker means that the batch is finished
+    return os.path.exists(os.path.join(batch_output_path, DONE_MARKER))
+
+
+def mark_batch_processed(batch_output_path: str) -> None:
+    Path(batch_output_path, DONE_MARKER).touch()
+
+
+def get_batch_command(config: BatchConfig, input_file_path: str, output_path: str,
+                      byte_range: Optional[Tuple[int, int]] = None) -> List[str]:
+    # create run script with python3
+    command = ['python3', config.script_path, input_file_path]
+    # add script args and flags
+    command += config.script_args + config.script_flags
+    # add rows of the batch if the input file is not split
+    if byte_range is not None:
+        start, end = byte_range
+        command += [f'{EvaluationRunToolArgument.BYTE_RANGE.value.long_name}={start}:{end}']
+    # add script output flag
+    command += [f'-o={output_path}']
+    return command
+
+
+def _clear_directory(directory: str) -> None:
+    remove_directory(directory)
+    create_directory(directory)
+
+
+def _log_progress(statuses: Dict[int, BatchStatus], finished: int, start_time: float) -> None:
+    counts = Counter(statuses.values())
+    summary = ', '.join(f'{counts[status]} {status.value}' for status in BatchStatus)
+
+    elapsed_time = time.time() - start_time
+    throughput = finished / elapsed_time * 60
+    left = counts[BatchStatus.PENDING] + counts[BatchStatus.RUNNING]
+    eta = left / throughput * 60 if throughput > 0 else float('inf')
+
+    logger.info(f'Batches: {summary}. Throughput: {throughput:.2f} batches/min. ETA: {eta:.0f} s.')
+
+
+def run_batches(batch_paths: List[Tuple[int, str, str, str]], config: BatchConfig,
+                jobs: int = 1, retries: int = 1,
+                byte_ranges: Optional[Dict[int, Tuple[int, int]]] = None) -> Dict[int, BatchStatus]:
+    """
+    Run the script on batches, so that up to jobs batches are processed concurrently, and return status of each batch.
+    Batches that were finished successfully before are skipped, output of other batches is removed before they start.
+    A failed batch is restarted up to retries times.
+    If byte ranges are specified, they are passed to the script together with the input file of the batch.
+    """
+    byte_ranges = byte_ranges or {}
+    statuses = {}
+    attempts = Counter()
+    pending = deque()
+    batches = {}
+
+    for batch in batch_paths:
+        index, _, _, output_path = batch
+        batches[index] = batch
+        if is_batch_processed(output_path):
+            logger.info(f'Skip batch {index}: it is already processed')
+            statuses[index] = BatchStatus.DONE
+        else:
+            _clear_directory(output_path)
+            statuses[index] = BatchStatus.PENDING
+            pending.append(index)
+
+    running = {}
+    finished = 0
+    start_time = time.time()
+
+    try:
+        while pending or running:
+            while pending and len(running) < jobs:
+                index = pending.popleft()
+                _, input_file_path, logs_path, output_path = batches[index]
+
+                command = get_batch_command(config, input_file_path, output_path, byte_ranges.get(index))
+                logger.info(f"Command to execute batch {index}: {command}")
+
+                # Logs of all attempts are kept in one file
+                logs_file = open(os.path.join(logs_path, f"log{AnalysisExtension.TXT.value}"),
+                                 'w' if attempts[index] == 0 else 'a')
+                process = subprocess.Popen(command, stdout=logs_file, stderr=logs_file, cwd=config.project_path)
+
+                logger.info(f'Start batch {index} processing')
+                running[index] = (process, logs_file, time.time())
+                statuses[index] = BatchStatus.RUNNING
+                attempts[index] += 1
+
+            time.sleep(POLL_INTERVAL)
+
+            for index, (process, logs_file, batch_start_time) in list(running.items()):
+                if process.poll() is None:
+                    continue
+
+                logs_file.close()
+                del running[index]
+                batch_time = time.time() - batch_start_time
+
+                if process.returncode == 0:
+                    logger.info(f'Finish batch {index} processing in {batch_time}')
+                    mark_batch_processed(batches[index][3])
+                    statuses[index] = BatchStatus.DONE
+                    finished += 1
+                else:
+                    logger.warning(f'Batch {index} failed with code {process.returncode} in {batch_time}')
+                    _clear_directory(batches[index][3])
+                    if attempts[index] <= retries:
+                        statuses[index] = BatchStatus.PENDING
+                        pending.append(index)
+                    else:
+                        statuses[index] = BatchStatus.FAILED
+                        finished += 1
+
+                _log_progress(statuses, finished, start_time)
+    finally:
+        for index, (process, logs_file, _) in running.items():
+            process.kill()
+            process.wait()
+            logs_file.close()
+            _clear_directory(batches[index][3])
+
+    return statuses
 
 
 def run_batching():
@@ -33,29 +186,23 @@ def run_batching():
     configure_arguments(parser)
 
     args = parser.parse_args()
-    batch_paths = split_to_batches(args.input_path, args.output_path, args.batch_size)
-    config = BatchConfig.from_yaml(args.config_path)
 
-    for index, input_file_path, logs_path, output_path in batch_paths[args.start_from:]:
-        logs_file_path = os.path.join(logs_path, f"log{AnalysisExtension.TXT.value}")
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s')
 
-        with open(logs_file_path, 'w+') as logs_file:
-            # create run script with python3
-            command = ['python3', config.script_path, input_file_path]
-            # add script args and flags
-            command += config.script_args + config.script_flags
-            # add script output flag
-            command += [f'-o={output_path}']
+    if args.index_batches:
+        batch_paths, byte_ranges = index_batches(args.input_path, args.output_path, args.batch_size)
+    else:
+        batch_paths, byte_ranges = split_to_batches(args.input_path, args.output_path, args.batch_size), None
+    config = BatchConfig.from_yaml(args.config_path)
 
-            logging.info(f"Command to execute batch {index}: {command}")
+    statuses = run_batches(batch_paths, config, args.jobs, args.retries, byte_ranges)
 
-            logging.info(f'Start batch {index} processing')
-            start_time = time.time()
-            run_and_wait(command, stdout=logs_file, stderr=logs_file, cwd=config.project_path)
-            end_time = time.time()
-            logging.info(f'Finish batch {index} processing in {end_time - start_time}')
+    failed_batches = [index for index, status in statuses.items() if status == BatchStatus.FAILED]
+    if failed_batches:
+        logger.error(f'Batches {failed_batches} failed, their results are not merged')
 
-    merge_batch_results(batch_paths, args.output)
+    done_batch_paths = [batch for batch in batch_paths if statuses[batch[0]] == BatchStatus.DONE]
+    merge_batch_results(done_batch_paths, args.output_path)
 
 
 def create_sub_directory(base_path: str, directory_name: str) -> str:
@@ -90,22 +237,109 @@ def split_to_batches(dataset_path: str, output_dir_path: str, batch_size: int) -
     return batch_paths
 
 
+def index_batches(dataset_path: str, output_dir_path: str,
+                  batch_size: int) -> Tuple[List[Tuple[int, str, str, str]], Dict[int, Tuple[int, int]]]:
+    """
+    Split the dataset into batches by byte offsets of their rows, so batches are not written to disk.
+    Return the batch paths, where the input file of each batch is the dataset itself, and byte ranges of the batches.
+    """
+    logs_path = create_sub_directory(output_dir_path, 'logs')
+    output_path = create_sub_directory(output_dir_path, 'output')
+
+    offsets = get_csv_row_offsets(dataset_path, batch_size)
+
+    batch_paths = []
+    byte_ranges = {}
+    for index, byte_range in enumerate(zip(offsets, offsets[1:])):
+        batch_name = f'batch_{index}'
+
+        logging.info(f"Indexing batch {index}")
+        batch_logs_path = create_sub_directory(logs_path, batch_name)
+        batch_output_path = create_sub_directory(output_path, batch_name)
+
+        batch_paths.append((index, str(dataset_path), batch_logs_path, batch_output_path))
+        byte_ranges[index] = byte_range
+
+    return batch_paths, byte_ranges
+
+
+def _ends_with_newline(file: BinaryIO) -> bool:
+    position = file.tell()
+    file.seek(-1, os.SEEK_END)
+    last_byte = file.read(1)
+    file.seek(position)
+    return last_byte == b'\n'
+
+
+def merge_csv_files(input_files: List[str], output_file: str) -> None:
+    """
+    Concatenate csv-files as bytes, so rows are not parsed. All files must have the same header,
+    which is written only once.
+    """
+    header = None
+    with open(output_file, 'wb') as output:
+        for input_file in input_files:
+            with open(input_file, 'rb') as file:
+                file_header = file.readline()
+                if not file_header:
+                    continue
+
+                if header is None:
+                    header = file_header.rstrip(b'\r\n')
+                    output.write(header + b'\n')
+                elif file_header.rstrip(b'\r\n') != header:
+                    raise ValueError(f'The header of {input_file} differs from the header of the previous files')
+
+                to_add_newline = not _ends_with_newline(file)
+                shutil.copyfileobj(file, output, COPY_BUFFER_SIZE)
+                if to_add_newline and file.tell() > len(file_header):
+                    output.write(b'\n')
+
+
+def merge_parquet_files(input_files: List[str], output_file: str) -> None:
+    """
+    Concatenate parquet-files by row groups, so the data is not converted to pandas.
+    All files must have the same columns. Column types are unified, so a column that has only nulls
+    in one file and values in another one is merged.
+    """
+    # pyarrow is needed only for parquet results, so it is imported only if they are merged
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet_files = [pq.ParquetFile(input_file) for input_file in input_files]
+    if not parquet_files:
+        return
+
+    for input_file, parquet_file in zip(input_files, parquet_files):
+        if parquet_file.schema_arrow.names != parquet_files[0].schema_arrow.names:
+            raise ValueError(f'The columns of {input_file} differ from the columns of the previous files')
+
+    schema = pa.unify_schemas([parquet_file.schema_arrow for parquet_file in parquet_files])
+    with pq.ParquetWriter(output_file, schema) as writer:
+        for parquet_file in parquet_files:
+            for row_group in range(parquet_file.num_row_groups):
+                writer.write_table(parquet_file.read_row_group(row_group).cast(schema))
+
+
+MERGE_FUNCTIONS = {
+    AnalysisExtension.CSV: merge_csv_files,
+    AnalysisExtension.PARQUET: merge_parquet_files,
+}
+
+
 def merge_batch_results(batch_paths: List[Tuple[int, str, str, str]], output: str):
     output_files_by_name = defaultdict(list)
 
     for _, _, _, output_path in batch_paths:
         output_files = os.listdir(output_path)
         for output_file in output_files:
-            if AnalysisExtension.get_extension_from_file(output_file) == AnalysisExtension.CSV:
+            if AnalysisExtension.get_extension_from_file(output_file) in MERGE_FUNCTIONS:
                 output_file_id = re.sub(r'\.*batch_[0-9]+\.*', '', get_name_from_path(output_file))
                 output_files_by_name[output_file_id].append(os.path.join(output_path, output_file))
     for output_file_name, output_files in output_files_by_name.items():
-        for i, output_file in enumerate(output_files):
-            output_df = pd.read_csv(output_file)
-            if i == 0:
-                write_dataframe_to_csv(os.path.join(output, output_file_name), output_df)
-            else:
-                append_dataframe_to_csv(os.path.join(output, output_file_name), output_df)
+        logger.info(f'Merging {len(output_files)} files into {output_file_name}')
+        merge = MERGE_FUNCTIONS[AnalysisExtension.get_extension_from_file(output_files[0])]
+        merge(output_files, os.path.join(output, output_file_name))
 
 
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
+import argparse
 import re
 from enum import Enum, unique
 from pathlib import Path
@@ -37,6 +38,11 @@ class EvaluationRunToolArgument(Enum):
 
     DUPLICATES = ArgumentsInfo(None, '--remove-duplicates', 'Remove duplicates around inspections')
 
+    BYTE_RANGE = ArgumentsInfo(None, '--byte-range',
+                               'Byte offsets "start:end" of the rows of the CSV-file with solutions to be processed. '
+                               'The rest of the file is not read. Offsets are computed by batch_processing.py '
+                               'with --index-batches.')
+
 
 script_structure_rule = ('Please, make sure your XLSX-file matches following script standards: \n'
                          '1. Your XLSX-file or CSV-file should have 2 obligatory columns named:'
@@ -58,6 +64,19 @@ def parse_set_arg(str_arg: str, separator: str = ',') -> Set[str]:
     return set(str_arg.split(separator))
 
 
+# Parse byte range in format "start:end"
+def parse_byte_range(str_arg: str) -> Tuple[int, int]:
+    try:
+        start, end = map(int, str_arg.split(':'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Byte range must be in format "start:end", but got "{str_arg}"')
+
+    if not 0 <= start <= end:
+        raise argparse.ArgumentTypeError(f'Byte range start must be non-negative and not greater than end: {str_arg}')
+
+    return start, end
+
+
 def get_in_and_out_list(root: Path,
                         in_ext: Union[Extension, AnalysisExtension] = AnalysisExtension.CSV,
                         out_ext: Union[Extension, AnalysisExtension]
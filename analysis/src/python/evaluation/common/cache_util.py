@@ -0,0 +1,59 @@
+import hashlib
+import os
+import sqlite3
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+CACHE_FILE_NAME = 'results_cache.sqlite'
+
+# SQLite limits the number of parameters in one query, so keys are requested in chunks
+KEYS_CHUNK_SIZE = 500
+
+UNKNOWN_VERSION = 'unknown'
+
+
+def get_package_version(package: str) -> str:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return UNKNOWN_VERSION
+
+
+def get_cache_key(*parts: Optional[str]) -> str:
+    """
+    Build SHA-256 key by all parts that affect the cached result. None parts are distinguished from empty strings.
+    """
+    key = hashlib.sha256()
+    for part in parts:
+        key.update(b'\x00' if part is None else b'\x01' + str(part).encode('utf-8', errors='surrogatepass'))
+        key.update(b'\x1f')
+    return key.hexdigest()
+
+
+class ResultsCache:
+    """ On-disk cache that stores string results by content keys (see get_cache_key). """
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.connection = sqlite3.connect(str(Path(cache_dir) / CACHE_FILE_NAME))
+        self.connection.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT NOT NULL)')
+        self.connection.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(keys)
+        results = {}
+        for i in range(0, len(keys), KEYS_CHUNK_SIZE):
+            chunk = keys[i:i + KEYS_CHUNK_SIZE]
+            rows = self.connection.execute(
+                f'SELECT key, result FROM results WHERE key IN ({",".join("?" * len(chunk))})', chunk,
+            )
+            results.update(rows)
+        return results
+
+    def put_many(self, results: Dict[str, str]) -> None:
+        self.connection.executemany('INSERT OR REPLACE INTO results (key, result) VALUES (?, ?)', results.items())
+        self.connection.commit()
+
+    def close(self) -> None:
+        self.connection.close()
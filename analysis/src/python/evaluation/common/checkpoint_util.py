@@ -0,0 +1,85 @@
+import logging
+import os
+from pathlib import Path
+from typing import Callable, List, Set
+
+import pandas as pd
+
+from analysis.src.python.evaluation.common.csv_util import ColumnName
+from analysis.src.python.evaluation.common.file_util import AnalysisExtension, extension_file_condition, \
+    get_name_from_path, remove_directory
+
+CHECKPOINT_PREFIX = 'checkpoint_'
+
+logger = logging.getLogger(__name__)
+
+
+def get_checkpoints_dir(output_path: Path) -> Path:
+    """ Directory with checkpoints is created next to the output file. """
+    return output_path.parent / f'{get_name_from_path(output_path, with_extension=False)}_checkpoints'
+
+
+def get_checkpoint_paths(checkpoints_dir: Path) -> List[Path]:
+    if not checkpoints_dir.is_dir():
+        return []
+
+    is_csv = extension_file_condition(AnalysisExtension.CSV)
+    checkpoint_names = [name for name in os.listdir(checkpoints_dir)
+                        if name.startswith(CHECKPOINT_PREFIX) and is_csv(name)]
+    # Sort checkpoints by their index, so results keep the processing order
+    checkpoint_names.sort(key=lambda name: int(get_name_from_path(name, with_extension=False)[len(CHECKPOINT_PREFIX):]))
+    return [checkpoints_dir / name for name in checkpoint_names]
+
+
+def get_checkpointed_ids(checkpoints_dir: Path) -> Set:
+    ids = set()
+    for checkpoint_path in get_checkpoint_paths(checkpoints_dir):
+        ids.update(pd.read_csv(checkpoint_path, usecols=[ColumnName.ID.value])[ColumnName.ID.value])
+    return ids
+
+
+def _write_checkpoint(checkpoints_dir: Path, index: int, df: pd.DataFrame) -> None:
+    checkpoint_path = checkpoints_dir / f'{CHECKPOINT_PREFIX}{index}{AnalysisExtension.CSV.value}'
+    tmp_checkpoint_path = checkpoints_dir / f'{CHECKPOINT_PREFIX}{index}.tmp'
+    df.to_csv(tmp_checkpoint_path, index=False)
+    # The checkpoint appears only when it is written completely, so a crash can not leave a broken checkpoint
+    os.replace(tmp_checkpoint_path, checkpoint_path)
+
+
+def read_checkpoints(checkpoints_dir: Path) -> pd.DataFrame:
+    checkpoints = [pd.read_csv(checkpoint_path) for checkpoint_path in get_checkpoint_paths(checkpoints_dir)]
+    if not checkpoints:
+        return pd.DataFrame()
+    return pd.concat(checkpoints, ignore_index=True)
+
+
+def inspect_with_checkpoints(df: pd.DataFrame,
+                             inspect: Callable[[pd.DataFrame], pd.DataFrame],
+                             checkpoints_dir: Path,
+                             checkpoint_size: int,
+                             resume: bool = False) -> pd.DataFrame:
+    """
+    Inspect the dataframe by parts of `checkpoint_size` rows and save results of each part to a separate checkpoint.
+    If `resume` is True, rows whose ids are already in the checkpoints are not inspected again,
+    otherwise the previous checkpoints are removed. Returns results from all checkpoints.
+
+    Checkpoints bound the work lost on interruption, not memory usage: the whole `df` is kept in memory
+    and all checkpoints are concatenated at the end, so use streaming by chunks for datasets that do not fit in memory.
+    """
+    if resume:
+        checkpointed_ids = get_checkpointed_ids(checkpoints_dir)
+        df = df[~df[ColumnName.ID.value].isin(checkpointed_ids)]
+        logger.info(f'{len(checkpointed_ids)} rows have been already inspected, {len(df)} rows remain.')
+    else:
+        remove_directory(checkpoints_dir)
+
+    os.makedirs(checkpoints_dir, exist_ok=True)
+    next_index = len(get_checkpoint_paths(checkpoints_dir))
+
+    for start in range(0, len(df), checkpoint_size):
+        results = inspect(df.iloc[start:start + checkpoint_size].copy())
+        _write_checkpoint(checkpoints_dir, next_index, results)
+        next_index += 1
+        logger.info(f'{min(start + checkpoint_size, len(df))}/{len(df)} rows have been inspected.')
+
+    return read_checkpoints(checkpoints_dir)
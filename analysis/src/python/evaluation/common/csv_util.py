@@ -1,7 +1,8 @@
 from enum import Enum, unique
 from pathlib import Path
-from typing import Union
+from typing import List, Union
 
+import numpy as np
 import pandas as pd
 from hyperstyle.src.python.review.common.file_system import Encoding
 
@@ -40,3 +41,47 @@ class ColumnName(Enum):
     HISTORY = 'history'
     TIME = 'time'
     TRACEBACK = 'traceback'
+    STATUS = 'status'
+
+
+# Size of the blocks in which csv-files are scanned (in bytes)
+SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+
+QUOTE = ord('"')
+NEWLINE = ord('\n')
+
+
+def get_csv_row_offsets(csv_file_path: Union[str, Path], rows_per_slice: int) -> List[int]:
+    """
+    Split rows of the csv-file into slices of rows_per_slice rows and return byte offsets of the slice boundaries.
+    The first offset is the end of the header and the last one is the end of the file.
+    Line breaks inside quoted values (e.g. in code) do not end a row.
+    """
+    offsets = []
+    rows = 0
+    in_quotes = 0
+    position = 0
+
+    with open(csv_file_path, 'rb') as csv_file:
+        while True:
+            block = np.frombuffer(csv_file.read(SCAN_BLOCK_SIZE), dtype=np.uint8)
+            if block.size == 0:
+                break
+
+            # Parity of the number of quotes up to each byte. Escaped quotes ("") do not change it
+            quotes_parity = np.bitwise_xor.accumulate((block == QUOTE).view(np.uint8)) ^ in_quotes
+            row_ends = np.flatnonzero((block == NEWLINE) & (quotes_parity == 0)) + position + 1
+
+            # The header is the row number 0, so it also ends a slice
+            row_numbers = np.arange(rows, rows + row_ends.size)
+            offsets.extend(row_ends[row_numbers % rows_per_slice == 0].tolist())
+
+            rows += row_ends.size
+            in_quotes = quotes_parity[-1]
+            position += block.size
+
+    # The last row may not end with a line break, and the last slice may be incomplete
+    if not offsets or offsets[-1] != position:
+        offsets.append(position)
+
+    return offsets
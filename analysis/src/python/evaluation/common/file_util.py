@@ -2,17 +2,23 @@ import os
 import pickle
 import re
 import shutil
+import tempfile
 from enum import Enum, unique
 from pathlib import Path
 from typing import Any, List, Optional, Union
 
 from hyperstyle.src.python.review.common.file_system import Extension, ItemCondition
 
+# Directory in RAM (tmpfs) to store temporary files with inspected code fragments
+SHARED_MEMORY_DIR = Path('/dev/shm')
+
 
 @unique
 class AnalysisExtension(Enum):
     XLSX = '.xlsx'
     CSV = '.csv'
+    PARQUET = '.parquet'
+    FEATHER = '.feather'
     PICKLE = '.pickle'
     JSON = '.json'
     HTML = '.html'
@@ -37,6 +43,15 @@ class AnalysisExtension(Enum):
         except ValueError:
             return Extension(ext)
 
+    @classmethod
+    def get_dataset_extensions(cls) -> List[Union[Extension, 'AnalysisExtension']]:
+        return [
+            AnalysisExtension.XLSX,
+            AnalysisExtension.CSV,
+            AnalysisExtension.PARQUET,
+            AnalysisExtension.FEATHER,
+        ]
+
     @classmethod
     def get_image_extensions(cls) -> List[Union[Extension, 'AnalysisExtension']]:
         return [
@@ -150,3 +165,26 @@ def remove_slash(path: str) -> str:
 def remove_directory(directory: Union[str, Path]) -> None:
     if os.path.isdir(directory):
         shutil.rmtree(directory, ignore_errors=True)
+
+
+def get_default_scratch_dir() -> Path:
+    if os.path.isdir(SHARED_MEMORY_DIR) and os.access(SHARED_MEMORY_DIR, os.W_OK):
+        return SHARED_MEMORY_DIR
+    return Path(tempfile.gettempdir())
+
+
+# Create a new directory for temporary files of one run inside the scratch directory.
+# It must be removed with <remove_directory> at the end of the run
+def create_run_scratch_dir(scratch_dir: Optional[Union[str, Path]] = None) -> Path:
+    if scratch_dir is None:
+        scratch_dir = get_default_scratch_dir()
+    os.makedirs(scratch_dir, exist_ok=True)
+    return Path(tempfile.mkdtemp(prefix='analysis_', dir=scratch_dir))
+
+
+# Get a subdirectory of the run scratch directory for the current worker process.
+# The subdirectory is created on the first call and reused by all next calls in the same process
+def get_worker_scratch_dir(run_scratch_dir: Union[str, Path]) -> Path:
+    worker_scratch_dir = Path(run_scratch_dir) / f'worker_{os.getpid()}'
+    os.makedirs(worker_scratch_dir, exist_ok=True)
+    return worker_scratch_dir
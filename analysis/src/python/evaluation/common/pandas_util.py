@@ -1,12 +1,13 @@
+import io
 import json
 import logging
 from pathlib import Path
-from typing import Any, Iterable, List, Set, Union
+from typing import Any, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 import numpy as np
 import pandas as pd
 from hyperstyle.src.python.review.application_config import LanguageVersion
-from hyperstyle.src.python.review.common.file_system import Extension
+from hyperstyle.src.python.review.common.file_system import Encoding, Extension
 from hyperstyle.src.python.review.quality.penalty import PenaltyIssue
 from hyperstyle.src.python.review.reviewers.utils.print_review import convert_json_to_issues
 
@@ -71,12 +72,21 @@ def get_diffs(first: pd.DataFrame, second: pd.DataFrame) -> pd.DataFrame:
         index=changed.index)
 
 
-def get_solutions_df(ext: Union[Extension, AnalysisExtension], file_path: Union[str, Path]) -> pd.DataFrame:
+def get_solutions_df(ext: Union[Extension, AnalysisExtension], file_path: Union[str, Path],
+                     columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read the dataset from the file. If columns are specified, only these columns are read,
+    which is much faster for columnar formats (Parquet and Feather).
+    """
     try:
         if ext == AnalysisExtension.XLSX:
-            lang_code_dataframe = pd.read_excel(file_path)
+            lang_code_dataframe = pd.read_excel(file_path, usecols=columns)
+        elif ext == AnalysisExtension.PARQUET:
+            lang_code_dataframe = pd.read_parquet(file_path, columns=columns)
+        elif ext == AnalysisExtension.FEATHER:
+            lang_code_dataframe = pd.read_feather(file_path, columns=columns)
         else:
-            lang_code_dataframe = pd.read_csv(file_path)
+            lang_code_dataframe = pd.read_csv(file_path, usecols=columns)
     except FileNotFoundError as e:
         logger.error('XLSX-file or CSV-file with the specified name does not exists.')
         raise e
@@ -84,9 +94,9 @@ def get_solutions_df(ext: Union[Extension, AnalysisExtension], file_path: Union[
     return lang_code_dataframe
 
 
-def get_solutions_df_by_file_path(path: Path) -> pd.DataFrame:
-    ext = get_restricted_extension(path, [AnalysisExtension.XLSX, AnalysisExtension.CSV])
-    return get_solutions_df(ext, path)
+def get_solutions_df_by_file_path(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    ext = get_restricted_extension(path, AnalysisExtension.get_dataset_extensions())
+    return get_solutions_df(ext, path, columns)
 
 
 def write_df_to_file(df: pd.DataFrame, output_file_path: Path, extension: Union[AnalysisExtension, Extension]) -> None:
@@ -97,15 +107,55 @@ def write_df_to_file(df: pd.DataFrame, output_file_path: Path, extension: Union[
         write_dataframe_to_xlsx_sheet(output_file_path, df, 'inspection_results')
         # remove empty sheet that was initially created with the workbook
         remove_sheet(output_file_path, 'Sheet')
+    elif extension == AnalysisExtension.PARQUET:
+        df.to_parquet(output_file_path, index=False)
+    elif extension == AnalysisExtension.FEATHER:
+        # Feather does not store the index, so it must be the default one
+        df.reset_index(drop=True).to_feather(output_file_path)
 
 
-def read_df_from_file(input_file_path: Path) -> pd.DataFrame:
-    ext = get_restricted_extension(input_file_path, [AnalysisExtension.XLSX, AnalysisExtension.CSV])
-    if ext == AnalysisExtension.XLSX:
-        df = pd.read_excel(input_file_path)
-    else:
-        df = pd.read_csv(input_file_path)
-    return df
+def get_solutions_df_chunks(file_path: Union[str, Path], chunk_size: int,
+                            columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    # Only CSV-files can be read by chunks, so the whole dataset is never loaded into memory
+    get_restricted_extension(file_path, [AnalysisExtension.CSV])
+    try:
+        return pd.read_csv(file_path, chunksize=chunk_size, usecols=columns)
+    except FileNotFoundError as e:
+        logger.error('CSV-file with the specified name does not exists.')
+        raise e
+
+
+def get_solutions_df_slice(file_path: Union[str, Path], byte_range: Tuple[int, int],
+                           columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read only the rows between the byte offsets of the CSV-file, which were found by get_csv_row_offsets.
+    The rest of the file is not read.
+    """
+    get_restricted_extension(file_path, [AnalysisExtension.CSV])
+    start, end = byte_range
+    try:
+        with open(file_path, 'rb') as csv_file:
+            header = csv_file.readline()
+            csv_file.seek(start)
+            rows = csv_file.read(end - start)
+    except FileNotFoundError as e:
+        logger.error('CSV-file with the specified name does not exists.')
+        raise e
+
+    return pd.read_csv(io.BytesIO(header + rows), usecols=columns)
+
+
+def write_df_chunks_to_csv(chunks: Iterable[pd.DataFrame], output_file_path: Union[str, Path]) -> None:
+    get_restricted_extension(output_file_path, [AnalysisExtension.CSV])
+    # All chunks are written in UTF-8, since the file can not be read if chunks have different encodings
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(output_file_path, encoding=Encoding.UTF_ENCODING.value, index=False,
+                     mode='w' if i == 0 else 'a', header=i == 0)
+
+
+def read_df_from_file(input_file_path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    ext = get_restricted_extension(input_file_path, AnalysisExtension.get_dataset_extensions())
+    return get_solutions_df(ext, input_file_path, columns)
 
 
 def get_issues_from_json(str_json: str) -> List[PenaltyIssue]:
@@ -1,20 +1,189 @@
+import logging
+import os
+import signal
 import subprocess
-from typing import List
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from enum import Enum, unique
+from itertools import islice
+from typing import Any, Callable, Hashable, Iterable, Iterator, List, Optional, Tuple
 
+logger = logging.getLogger(__name__)
 
-def run_in_subprocess_with_working_dir(command: List[str], working_dir: str) -> str:
-    process = subprocess.run(
+# Number of tasks that are submitted to the pool in advance per worker
+TASKS_PER_WORKER = 2
+
+# Messages that processes print to stderr when they run out of memory
+OUT_OF_MEMORY_MESSAGES = [b'MemoryError', b'OutOfMemoryError', b'Could not reserve enough space']
+
+
+@unique
+class ProcessStatus(Enum):
+    OK = 'ok'
+    TIMED_OUT = 'timed_out'
+    OOM = 'oom'
+
+
+def get_memory_limiter(memory_limit: Optional[int]) -> Optional[Callable[[], None]]:
+    """
+    Return a function that limits the address space of a new process to memory_limit megabytes.
+    It should be passed as preexec_fn, so the limit is inherited by all processes started by the new one.
+    """
+    if memory_limit is None:
+        return None
+
+    def limit_memory() -> None:
+        # The module is available only on Unix, so it is imported only if the limit is used
+        import resource
+
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    return limit_memory
+
+
+def kill_process_group(process: subprocess.Popen) -> None:
+    # The process is started in a new session, so its group contains all the processes started by it (e.g. linters)
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def has_out_of_memory_message(stderr: bytes) -> bool:
+    return any(message in stderr for message in OUT_OF_MEMORY_MESSAGES)
+
+
+def is_out_of_memory(return_code: int, stderr: bytes) -> bool:
+    # The process is killed with SIGKILL by the OOM killer
+    return return_code == -signal.SIGKILL or has_out_of_memory_message(stderr)
+
+
+def run_in_subprocess_with_working_dir(command: List[str], working_dir: str,
+                                       timeout: Optional[float] = None,
+                                       memory_limit: Optional[int] = None) -> Tuple[str, ProcessStatus]:
+    """
+    Run the command and return its stdout and status. If the command runs longer than timeout seconds,
+    it is killed together with all its child processes. Memory limit is set in megabytes.
+    """
+    process = subprocess.Popen(
         command,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         cwd=working_dir,
+        start_new_session=True,
+        preexec_fn=get_memory_limiter(memory_limit),
     )
 
-    stdout = process.stdout.decode()
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_process_group(process)
+        process.communicate()
+        return '', ProcessStatus.TIMED_OUT
+    except BaseException:
+        kill_process_group(process)
+        raise
+
+    if memory_limit is not None and is_out_of_memory(process.returncode, stderr):
+        return '', ProcessStatus.OOM
 
-    return stdout
+    return stdout.decode(), ProcessStatus.OK
 
 
 def run_and_wait(command: List[str], stdout=None, stderr=None, cwd=None) -> None:
     process = subprocess.Popen(command, stdout=stdout, stderr=stderr, cwd=cwd)
     process.wait()
+
+
+class TaskTimeout(BaseException):
+    """
+    It is not inherited from Exception, so that `except Exception` blocks inside the task can not swallow it.
+    """
+    pass
+
+
+def _raise_task_timeout(signum, frame) -> None:
+    raise TaskTimeout()
+
+
+def _run_with_timeout(func: Callable, args: Tuple, timeout: Optional[float]) -> Any:
+    # The alarm interrupts the task inside the worker, so the worker is free for the next task
+    if timeout is None or not hasattr(signal, 'SIGALRM'):
+        return func(*args)
+
+    previous_handler = signal.signal(signal.SIGALRM, _raise_task_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def _get_result(task_id: Hashable, future: Future, timeout: Optional[float]) -> Any:
+    try:
+        return future.result()
+    except TaskTimeout:
+        logger.warning(f'{task_id}: the task was interrupted after {timeout} seconds.')
+        return None
+
+
+def run_in_parallel(func: Callable,
+                    tasks: Iterable[Tuple[Hashable, Tuple]],
+                    workers: Optional[int] = None,
+                    timeout: Optional[float] = None) -> Iterator[Tuple[Hashable, Any]]:
+    """
+    Run func on the arguments of each (task id, arguments) task in a pool of worker processes
+    and yield (task id, result) pairs as soon as tasks are finished, so the order of results may differ.
+
+    A free worker takes the next task, so a slow task does not hold up the others. Only a few tasks per worker
+    are submitted in advance, so tasks are consumed lazily. If a task takes more than timeout seconds,
+    it is interrupted and its result is None.
+    """
+    workers = workers or os.cpu_count()
+    tasks = iter(tasks)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit(number: int) -> None:
+            for task_id, args in islice(tasks, number):
+                pending[executor.submit(_run_with_timeout, func, args, timeout)] = task_id
+
+        pending = {}
+        submit(workers * TASKS_PER_WORKER)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                task_id = pending.pop(future)
+                yield task_id, _get_result(task_id, future, timeout)
+
+            submit(len(done))
+
+
+def run_in_parallel_ordered(func: Callable,
+                            tasks: Iterable[Tuple[Hashable, Tuple]],
+                            workers: Optional[int] = None,
+                            timeout: Optional[float] = None) -> Iterator[Tuple[Hashable, Any]]:
+    """
+    Same as run_in_parallel, but (task id, result) pairs are yielded in the order of tasks.
+
+    A new task is submitted only when the result of the oldest one is yielded, so at most a few tasks per worker
+    are running or wait to be yielded, and a slow task does not make finished results pile up in memory.
+    """
+    workers = workers or os.cpu_count()
+    tasks = iter(tasks)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit(number: int) -> None:
+            for task_id, args in islice(tasks, number):
+                pending.append((task_id, executor.submit(_run_with_timeout, func, args, timeout)))
+
+        pending = deque()
+        submit(workers * TASKS_PER_WORKER)
+
+        while pending:
+            task_id, future = pending.popleft()
+            yield task_id, _get_result(task_id, future, timeout)
+
+            submit(1)
@@ -0,0 +1,149 @@
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import select
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple, Union
+
+from analysis import ANALYSIS_MAIN_FOLDER
+from analysis.src.python.evaluation.common.parallel_util import get_memory_limiter, kill_process_group
+
+ARGS = 'args'
+OUTPUT = 'output'
+ERRORS = 'errors'
+
+TOOL_MODULE_NAME = 'resident_tool'
+
+# The worker is started in the tool root, so the root of this repository is added to its module search path
+REPOSITORY_ROOT = ANALYSIS_MAIN_FOLDER.parent.parent
+
+
+def _get_worker_env() -> Dict[str, str]:
+    python_path = [str(REPOSITORY_ROOT)]
+    if os.environ.get('PYTHONPATH'):
+        python_path.append(os.environ['PYTHONPATH'])
+    return dict(os.environ, PYTHONPATH=os.pathsep.join(python_path))
+
+
+class ToolWorkerError(RuntimeError):
+    """
+    The worker exited without a response. Its exit code and stderr of the failed request are kept,
+    so the caller can tell an out of memory failure from other crashes.
+    """
+
+    def __init__(self, pid: int, return_code: Optional[int], stderr: bytes):
+        super().__init__(f'Tool worker {pid} exited with code {return_code}.')
+        self.return_code = return_code
+        self.stderr = stderr
+
+
+class ToolWorker:
+    """
+    Resident tool process which imports the tool only once and then inspects fragments sent through a pipe.
+    Each request is a JSON line with tool arguments, each response is a JSON line with the tool output
+    and everything the tool has written to stderr.
+    """
+
+    def __init__(self, tool_path: Union[str, Path], working_dir: Union[str, Path], memory_limit: Optional[int] = None):
+        # A file is used instead of a pipe, so the worker never blocks on a full pipe
+        self.stderr = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            [sys.executable, __file__, str(tool_path)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=self.stderr,
+            cwd=working_dir,
+            env=_get_worker_env(),
+            universal_newlines=True,
+            start_new_session=True,
+            preexec_fn=get_memory_limiter(memory_limit),
+        )
+
+    def inspect(self, tool_arguments: List[str], timeout: Optional[float] = None) -> Tuple[str, str]:
+        """
+        Return the tool output and stderr. The tool catches its own errors (e.g. MemoryError),
+        so the output is empty and the error is only written to stderr in this case.
+
+        If there is no response after timeout seconds, the worker is killed and subprocess.TimeoutExpired is raised.
+        If the worker exits without a response, ToolWorkerError is raised.
+        """
+        # Only stderr of the current request is kept
+        self.stderr.seek(0)
+        self.stderr.truncate()
+        try:
+            self.process.stdin.write(json.dumps({ARGS: list(map(str, tool_arguments))}) + '\n')
+            self.process.stdin.flush()
+
+            ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+            if not ready:
+                raise subprocess.TimeoutExpired(self.process.args, timeout)
+
+            response = self.process.stdout.readline()
+        except BaseException:
+            # The response to an interrupted request would be read by the next one, so the worker is stopped
+            kill_process_group(self.process)
+            self.process.wait()
+            raise
+
+        if not response:
+            self.process.wait()
+            self.stderr.seek(0)
+            raise ToolWorkerError(self.process.pid, self.process.returncode, self.stderr.read())
+
+        response = json.loads(response)
+        return response[OUTPUT], response[ERRORS]
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+        self.stderr.close()
+
+
+def _load_tool(tool_path: Path) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(TOOL_MODULE_NAME, tool_path)
+    tool = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(tool)
+    return tool
+
+
+def _run_tool(tool: ModuleType, tool_path: Path, tool_arguments: List[str]) -> Tuple[str, str]:
+    sys.argv = [str(tool_path)] + tool_arguments
+
+    output = io.StringIO()
+    errors = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+        try:
+            tool.main()
+        except SystemExit:
+            pass
+
+    return output.getvalue(), errors.getvalue()
+
+
+def run_worker(tool_path: Path) -> None:
+    # Keep the original stdout for responses only and send everything else written to it to stderr
+    responses = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    tool = _load_tool(tool_path)
+
+    for request in sys.stdin:
+        tool_arguments = json.loads(request)[ARGS]
+        output, errors = _run_tool(tool, tool_path, tool_arguments)
+        responses.write(json.dumps({OUTPUT: output, ERRORS: errors}) + '\n')
+        responses.flush()
+
+
+if __name__ == '__main__':
+    sys.path.append('')
+    run_worker(Path(sys.argv[1]).absolute())
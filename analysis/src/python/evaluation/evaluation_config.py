@@ -2,7 +2,7 @@ import logging.config
 import os
 from argparse import Namespace
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 from hyperstyle.src.python.common.tool_arguments import RunToolArgument
 from hyperstyle.src.python.review.application_config import LanguageVersion
@@ -23,9 +23,19 @@ class EvaluationConfig:
         self.with_history: bool = args.with_history
         self.output_folder_path: Union[str, Path] = args.output_folder_path
         self.extension: AnalysisExtension = get_restricted_extension(self.solutions_file_path,
-                                                                     [AnalysisExtension.XLSX, AnalysisExtension.CSV])
+                                                                     AnalysisExtension.get_dataset_extensions())
         self.__init_output_file_name(args.output_file_name)
         self.to_drop_nan: bool = args.to_drop_nan
+        self.resident_workers: bool = args.resident_workers
+        self.cache_dir: Optional[Path] = args.cache_dir
+        self.scratch_dir: Optional[Path] = args.scratch_dir
+        self.workers: Optional[int] = args.workers
+        self.task_timeout: Optional[float] = args.task_timeout
+        self.memory_limit: Optional[int] = args.memory_limit
+        self.checkpoint_size: Optional[int] = args.checkpoint_size
+        self.resume: bool = args.resume
+        self.stream_chunk_size: Optional[int] = args.stream_chunk_size
+        self.byte_range: Optional[Tuple[int, int]] = args.byte_range
 
     def __init_output_file_name(self, output_file_name: Optional[str]):
         if output_file_name is None:
@@ -39,17 +49,19 @@ class EvaluationConfig:
             cur_tool_path = os.path.relpath(self.tool_path, self.get_tool_root())
         else:
             cur_tool_path = self.tool_path
-        command = [LanguageVersion.PYTHON_3.value,
-                   cur_tool_path,
-                   inspected_file_path,
-                   RunToolArgument.FORMAT.value.short_name, self.format]
+        return [LanguageVersion.PYTHON_3.value, cur_tool_path] + self.build_tool_arguments(inspected_file_path, lang,
+                                                                                           history)
+
+    def build_tool_arguments(self, inspected_file_path: Union[str, Path], lang: str,
+                             history: Optional[str]) -> List[str]:
+        arguments = [inspected_file_path, RunToolArgument.FORMAT.value.short_name, self.format]
 
         if self.with_history and history is not None:
-            command.extend([RunToolArgument.HISTORY.value.long_name, history])
+            arguments.extend([RunToolArgument.HISTORY.value.long_name, history])
 
         if lang == LanguageVersion.JAVA_8.value or lang == LanguageVersion.JAVA_11.value:
-            command.extend([RunToolArgument.LANG_VERSION.value.long_name, lang])
-        return command
+            arguments.extend([RunToolArgument.LANG_VERSION.value.long_name, lang])
+        return arguments
 
     def get_tool_root(self) -> str:
         return self.tool_path.parent.parent.parent.parent
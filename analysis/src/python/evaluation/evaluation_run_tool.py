@@ -1,32 +1,44 @@
 import argparse
+import json
 import logging.config
 import os
-import re
+import subprocess
 import sys
 import time
 import traceback
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 sys.path.append('')
 
 import pandas as pd
-from pandarallel import pandarallel
 from analysis import HYPERSTYLE_RUNNER_PATH
-from analysis.src.python.evaluation.common.pandas_util import get_solutions_df, write_df_to_file
+from analysis.src.python.evaluation.common.pandas_util import get_solutions_df, get_solutions_df_chunks, \
+    get_solutions_df_slice, write_df_chunks_to_csv, write_df_to_file
 from analysis.src.python.evaluation.common.args_util import (
-    EvaluationArgument, EvaluationRunToolArgument, script_structure_rule,
+    EvaluationArgument, EvaluationRunToolArgument, parse_byte_range, script_structure_rule,
 )
-from analysis.src.python.evaluation.common.parallel_util import run_in_subprocess_with_working_dir
+from analysis.src.python.evaluation.common.parallel_util import has_out_of_memory_message, is_out_of_memory, \
+    ProcessStatus, run_in_parallel, run_in_subprocess_with_working_dir
+from analysis.src.python.evaluation.common.checkpoint_util import get_checkpoints_dir, inspect_with_checkpoints
+from analysis.src.python.evaluation.common.cache_util import get_cache_key, get_package_version, ResultsCache
 from analysis.src.python.evaluation.common.csv_util import ColumnName
-from analysis.src.python.evaluation.common.file_util import create_file
+from analysis.src.python.evaluation.common.file_util import create_file, create_run_scratch_dir, \
+    get_worker_scratch_dir, remove_directory
+from analysis.src.python.evaluation.common.tool_worker import ToolWorker, ToolWorkerError
 from analysis.src.python.evaluation.evaluation_config import EvaluationConfig
 from hyperstyle.src.python.common.tool_arguments import RunToolArgument
 from hyperstyle.src.python.review.application_config import LanguageVersion
 from hyperstyle.src.python.review.reviewers.perform_review import OutputFormat
+from hyperstyle.src.python.review.reviewers.utils.print_review import OutputJsonFields
 
 logger = logging.getLogger(__name__)
 
+INSPECTION_RESULT_COLUMNS = [ColumnName.TRACEBACK.value, ColumnName.GRADE.value, ColumnName.STATUS.value]
+
+# Resident tool process of the current parallel worker, it is started on the first inspected fragment
+_tool_worker: Optional[ToolWorker] = None
+
 
 def configure_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(EvaluationRunToolArgument.SOLUTIONS_FILE_PATH.value.long_name,
@@ -77,6 +89,77 @@ def configure_arguments(parser: argparse.ArgumentParser) -> None:
                         help='If True, empty code fragments will be deleted from df',
                         action='store_true')
 
+    parser.add_argument('--resident-workers',
+                        help='If True, each parallel worker keeps the tool running in a resident process '
+                             'and sends fragments to it through a pipe '
+                             'instead of starting the tool for every fragment.',
+                        action='store_true')
+
+    parser.add_argument('--cache-dir',
+                        help='Path to the directory with the cache of inspection results. '
+                             'If specified, fragments whose results are already in the cache will not be inspected '
+                             'again, and new results will be added to the cache.',
+                        default=None,
+                        type=lambda value: Path(value).absolute())
+
+    parser.add_argument('--scratch-dir',
+                        help='Path to the directory where temporary files with code fragments will be created. '
+                             'Default is a directory in RAM (/dev/shm) if it is available '
+                             'or the system temporary directory otherwise.',
+                        default=None,
+                        type=lambda value: Path(value).absolute())
+
+    parser.add_argument('--workers',
+                        help='Number of worker processes that inspect fragments. '
+                             'Default is the number of CPUs.',
+                        default=None,
+                        type=int)
+
+    parser.add_argument('--task-timeout',
+                        help='Time in seconds after which the inspection of a fragment is stopped. '
+                             'The tool is killed together with all the processes started by it (e.g. linters), '
+                             f'and the fragment gets an empty result and the "{ProcessStatus.TIMED_OUT.value}" '
+                             f'status in the "{ColumnName.STATUS.value}" column. By default, there is no time limit.',
+                        default=None,
+                        type=float)
+
+    parser.add_argument('--memory-limit',
+                        help='Limit of the address space in megabytes for each process of the inspection. '
+                             'If the tool runs out of memory, the fragment gets an empty result '
+                             f'and the "{ProcessStatus.OOM.value}" status in the "{ColumnName.STATUS.value}" column. '
+                             'By default, there is no memory limit.',
+                        default=None,
+                        type=int)
+
+    saving_mode = parser.add_mutually_exclusive_group()
+
+    saving_mode.add_argument('--checkpoint-size',
+                             help='Number of fragments whose results are saved to a checkpoint at once. '
+                                  'If specified, checkpoints are stored in a directory next to the output file '
+                                  'and removed after the output file is written.',
+                             default=None,
+                             type=int)
+
+    saving_mode.add_argument('--stream-chunk-size',
+                             help='Number of rows that are read from the CSV-file with solutions at once. '
+                                  'If specified, the dataset is inspected by chunks and results of each chunk '
+                                  'are appended to the output CSV-file, so the whole dataset is never loaded '
+                                  'into memory.',
+                             default=None,
+                             type=int)
+
+    parser.add_argument('--resume',
+                        help='If True, fragments whose ids are already in the checkpoints of the previous run '
+                             'will not be inspected again. Works only with --checkpoint-size, '
+                             'it can not be used together with --stream-chunk-size.',
+                        action='store_true')
+
+    parser.add_argument(EvaluationRunToolArgument.BYTE_RANGE.value.long_name,
+                        help=f'{EvaluationRunToolArgument.BYTE_RANGE.value.description} '
+                             'It can not be used together with --stream-chunk-size.',
+                        default=None,
+                        type=parse_byte_range)
+
 
 def get_language_version(lang_key: str) -> LanguageVersion:
     try:
@@ -87,49 +170,141 @@ def get_language_version(lang_key: str) -> LanguageVersion:
         raise KeyError(e)
 
 
+def __read_solutions_df(config: EvaluationConfig) -> pd.DataFrame:
+    if config.byte_range is None:
+        return get_solutions_df(config.extension, config.solutions_file_path)
+    return get_solutions_df_slice(config.solutions_file_path, config.byte_range)
+
+
+def __get_tool_worker(config: EvaluationConfig) -> ToolWorker:
+    global _tool_worker
+    if _tool_worker is None or not _tool_worker.is_alive():
+        if _tool_worker is not None:
+            _tool_worker.close()
+        _tool_worker = ToolWorker(config.tool_path, config.get_tool_root(), config.memory_limit)
+    return _tool_worker
+
+
 def __inspect_row(lang: str, code: str, fragment_id: int, history: Optional[str],
-                  config: EvaluationConfig) -> Optional[str]:
+                  config: EvaluationConfig, scratch_dir: Path) -> Tuple[Optional[str], Optional[str], str]:
     print(f'current id: {fragment_id}')
     # Tool does not work correctly with tmp files from <tempfile> module on macOS
     # thus we create a real file in the file system
     extension = get_language_version(lang).extension_by_language().value
-    tmp_file_path = config.solutions_file_path.parent.absolute() / f'inspected_code_{fragment_id}{extension}'
+    tmp_file_path = get_worker_scratch_dir(scratch_dir) / f'inspected_code_{fragment_id}{extension}'
     temp_file = next(create_file(tmp_file_path, code))
-    command = config.build_command(temp_file, lang, history, with_relative_path=True)
-    results = run_in_subprocess_with_working_dir(command, config.get_tool_root())
-    # results = run_in_subprocess(command)
+    if config.resident_workers:
+        status = ProcessStatus.OK
+        try:
+            results, errors = __get_tool_worker(config).inspect(
+                config.build_tool_arguments(temp_file, lang, history), config.task_timeout,
+            )
+            # The tool catches MemoryError itself, so the worker stays alive and only the output is empty
+            if not results and config.memory_limit is not None and has_out_of_memory_message(errors.encode()):
+                status = ProcessStatus.OOM
+        except subprocess.TimeoutExpired:
+            status = ProcessStatus.TIMED_OUT
+        except ToolWorkerError as e:
+            # The worker exits if it runs out of memory, other crashes are not hidden
+            if config.memory_limit is None or not is_out_of_memory(e.return_code, e.stderr):
+                raise
+            status = ProcessStatus.OOM
+    else:
+        command = config.build_command(temp_file, lang, history, with_relative_path=True)
+        results, status = run_in_subprocess_with_working_dir(command, config.get_tool_root(),
+                                                             config.task_timeout, config.memory_limit)
+        # results = run_in_subprocess(command)
     os.remove(temp_file)
-    return results
+
+    if status != ProcessStatus.OK:
+        logger.warning(f'{fragment_id}: the inspection has failed with the "{status.value}" status.')
+        return None, None, status.value
+    # The grade is extracted in the worker, so the output is sent back only if it is saved or cached
+    grade = __get_grade_from_traceback(results)
+    if not config.traceback and config.cache_dir is None:
+        results = None
+    return results, grade, status.value
 
 
 def __get_grade_from_traceback(traceback: Optional[str]) -> Optional[str]:
-    if traceback is None:
+    # Empty output means that the tool has failed
+    if not traceback:
         return None
-    assert traceback != ''
-    # this regular expression matches final tool grade: EXCELLENT, GOOD, MODERATE or BAD
-    return re.match(r'^.*{"code":\s"([A-Z]+)"', traceback).group(1)
+    # final tool grade: EXCELLENT, GOOD, MODERATE or BAD
+    return json.loads(traceback)[OutputJsonFields.QUALITY.value][OutputJsonFields.CODE.value]
+
+
+def __inspect_df(config: EvaluationConfig, lang_code_dataframe: pd.DataFrame) -> pd.DataFrame:
+    scratch_dir = create_run_scratch_dir(config.scratch_dir)
+    try:
+        tasks = ((index, (row[ColumnName.LANG.value],
+                          row[ColumnName.CODE.value],
+                          row[ColumnName.ID.value],
+                          row.get(ColumnName.HISTORY.value),
+                          config, scratch_dir)) for index, row in lang_code_dataframe.iterrows())
+        results = dict(run_in_parallel(__inspect_row, tasks, config.workers))
+        return pd.DataFrame([results[index] for index in lang_code_dataframe.index],
+                            index=lang_code_dataframe.index,
+                            columns=INSPECTION_RESULT_COLUMNS, dtype=object)
+    finally:
+        remove_directory(scratch_dir)
+
+
+def __get_cache_key(row: pd.Series, config: EvaluationConfig, tool_version: str) -> str:
+    history = row.get(ColumnName.HISTORY.value) if config.with_history else None
+    return get_cache_key(row[ColumnName.CODE.value], row[ColumnName.LANG.value], history, tool_version, config.format)
+
+
+def __inspect_df_with_cache(config: EvaluationConfig, lang_code_dataframe: pd.DataFrame) -> pd.DataFrame:
+    cache = ResultsCache(config.cache_dir)
+    tool_version = get_package_version('hyperstyle')
+    keys = lang_code_dataframe.apply(lambda row: __get_cache_key(row, config, tool_version), axis=1)
+
+    results = {
+        key: (traceback, __get_grade_from_traceback(traceback), ProcessStatus.OK.value)
+        for key, traceback in cache.get_many(keys.unique()).items()
+    }
+
+    # Fragments with the same key are inspected only once
+    to_inspect = lang_code_dataframe[~keys.isin(results.keys()) & ~keys.duplicated()]
+    if not to_inspect.empty:
+        new_results = dict(zip(keys[to_inspect.index], __inspect_df(config, to_inspect).itertuples(index=False)))
+        # Empty output means that the tool has failed, so it is not cached to be retried next time
+        cache.put_many({key: traceback for key, (traceback, _, status) in new_results.items()
+                        if traceback and status == ProcessStatus.OK.value})
+        results.update(new_results)
+    cache.close()
+
+    print(f'Cache hits: {len(lang_code_dataframe) - len(to_inspect)}, misses: {len(to_inspect)}')
+    return pd.DataFrame([tuple(results[key]) for key in keys], index=lang_code_dataframe.index,
+                        columns=INSPECTION_RESULT_COLUMNS, dtype=object)
 
 
-# TODO: calculate grade after it
 def inspect_solutions_df(config: EvaluationConfig, lang_code_dataframe: pd.DataFrame) -> pd.DataFrame:
     report = pd.DataFrame(columns=lang_code_dataframe.columns)
     report[ColumnName.TRACEBACK.value] = []
 
-    pandarallel.initialize()
     if config.traceback:
         report[ColumnName.TRACEBACK.value] = []
     try:
+        # Rows are accessed only inside workers, so missing columns are checked in advance
+        missing_columns = {ColumnName.LANG.value, ColumnName.CODE.value, ColumnName.ID.value} - set(
+            lang_code_dataframe.columns)
+        if missing_columns:
+            raise KeyError(f'Columns {sorted(missing_columns)} are missing.')
+
         if config.to_drop_nan:
             lang_code_dataframe = lang_code_dataframe.dropna()
-        lang_code_dataframe[ColumnName.TRACEBACK.value] = lang_code_dataframe.parallel_apply(
-            lambda row: __inspect_row(row[ColumnName.LANG.value],
-                                      row[ColumnName.CODE.value],
-                                      row[ColumnName.ID.value],
-                                      row.get(ColumnName.HISTORY.value),
-                                      config), axis=1)
+        if config.cache_dir is None:
+            inspection_results = __inspect_df(config, lang_code_dataframe)
+        else:
+            inspection_results = __inspect_df_with_cache(config, lang_code_dataframe)
 
-        lang_code_dataframe[ColumnName.GRADE.value] = lang_code_dataframe.parallel_apply(
-            lambda row: __get_grade_from_traceback(row[ColumnName.TRACEBACK.value]), axis=1)
+        lang_code_dataframe[ColumnName.TRACEBACK.value] = inspection_results[ColumnName.TRACEBACK.value].infer_objects()
+        lang_code_dataframe[ColumnName.GRADE.value] = inspection_results[ColumnName.GRADE.value].infer_objects()
+        # Statuses differ from "ok" only if limits are set
+        if config.task_timeout is not None or config.memory_limit is not None:
+            lang_code_dataframe[ColumnName.STATUS.value] = inspection_results[ColumnName.STATUS.value]
 
         if not config.traceback:
             del lang_code_dataframe[ColumnName.TRACEBACK.value]
@@ -153,10 +328,27 @@ def main() -> int:
     try:
         start = time.time()
         args = parser.parse_args()
+        if args.byte_range is not None and args.stream_chunk_size is not None:
+            parser.error('--byte-range can not be used together with --stream-chunk-size.')
+        if args.resume and args.stream_chunk_size is not None:
+            parser.error('--resume can not be used together with --stream-chunk-size.')
         config = EvaluationConfig(args)
-        lang_code_dataframe = get_solutions_df(config.extension, config.solutions_file_path)
-        results = inspect_solutions_df(config, lang_code_dataframe)
-        write_df_to_file(results, config.get_output_file_path(), config.extension)
+        output_file_path = config.get_output_file_path()
+        if config.stream_chunk_size is not None:
+            chunks = get_solutions_df_chunks(config.solutions_file_path, config.stream_chunk_size)
+            write_df_chunks_to_csv(map(lambda df: inspect_solutions_df(config, df), chunks), output_file_path)
+        elif config.checkpoint_size is None:
+            lang_code_dataframe = __read_solutions_df(config)
+            results = inspect_solutions_df(config, lang_code_dataframe)
+            write_df_to_file(results, output_file_path, config.extension)
+        else:
+            lang_code_dataframe = __read_solutions_df(config)
+            checkpoints_dir = get_checkpoints_dir(output_file_path)
+            results = inspect_with_checkpoints(lang_code_dataframe,
+                                               lambda df: inspect_solutions_df(config, df),
+                                               checkpoints_dir, config.checkpoint_size, config.resume)
+            write_df_to_file(results, output_file_path, config.extension)
+            remove_directory(checkpoints_dir)
         end = time.time()
         print(f'All time: {end - start}')
         return 0
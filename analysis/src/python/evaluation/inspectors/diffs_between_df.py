@@ -94,7 +94,7 @@ def main() -> None:
     args = parser.parse_args()
 
     old_solutions_file_path = args.solutions_file_path_old
-    output_ext = get_restricted_extension(old_solutions_file_path, [AnalysisExtension.XLSX, AnalysisExtension.CSV])
+    output_ext = get_restricted_extension(old_solutions_file_path, AnalysisExtension.get_dataset_extensions())
     old_solutions_df = get_solutions_df(output_ext, old_solutions_file_path)
 
     new_solutions_file_path = args.solutions_file_path_new
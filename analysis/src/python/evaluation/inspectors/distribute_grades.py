@@ -54,7 +54,7 @@ def main() -> None:
     args = parser.parse_args()
 
     all_solutions_file_path = args.solutions_file_path_all
-    output_ext = get_restricted_extension(all_solutions_file_path, [AnalysisExtension.XLSX, AnalysisExtension.CSV])
+    output_ext = get_restricted_extension(all_solutions_file_path, AnalysisExtension.get_dataset_extensions())
     all_solutions_df = get_solutions_df(output_ext, all_solutions_file_path)
     uniq_solutions_df = get_solutions_df_by_file_path(args.solutions_file_path_uniq)
 
@@ -47,7 +47,7 @@ def main() -> None:
     args = parser.parse_args()
 
     solutions_file_path = args.solutions_file_path
-    ext = get_restricted_extension(solutions_file_path, [AnalysisExtension.XLSX, AnalysisExtension.CSV])
+    ext = get_restricted_extension(solutions_file_path, AnalysisExtension.get_dataset_extensions())
     solutions_df = get_solutions_df(ext, solutions_file_path)
 
     filtered_df = filter_df_by_language(solutions_df, args.languages)
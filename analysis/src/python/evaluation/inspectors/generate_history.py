@@ -2,14 +2,15 @@ import argparse
 import json
 from collections import Counter
 from pathlib import Path
+from typing import Optional
 
 import pandas as pd
 from hyperstyle.src.python.review.common.language import Language
-from pandarallel import pandarallel
 from analysis.src.python.evaluation.common.pandas_util import get_issues_from_json, get_solutions_df_by_file_path, \
     write_df_to_file
 from analysis.src.python.evaluation.common.args_util import EvaluationArgument, EvaluationRunToolArgument
 from analysis.src.python.evaluation.common.csv_util import ColumnName
+from analysis.src.python.evaluation.common.parallel_util import run_in_parallel
 from analysis.src.python.evaluation.common.file_util import AnalysisExtension, get_name_from_path, get_parent_folder, \
     get_restricted_extension
 from analysis.src.python.evaluation.evaluation_run_tool import get_language_version
@@ -50,6 +51,12 @@ def configure_arguments(parser: argparse.ArgumentParser) -> None:
         action='store_true',
     )
 
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Number of worker processes. If not specified, the number of CPUs is used.',
+    )
+
 
 def _update_counter(extracted_issues: str, counter: Counter) -> None:
     issue_classes = []
@@ -82,25 +89,37 @@ def _add_history(row, solutions_df: pd.DataFrame) -> str:
     return json.dumps(history)
 
 
+def _add_history_to_group(group_df: pd.DataFrame) -> pd.Series:
+    # Only solutions of the same user in the same language affect the history, so groups are independent
+    group_df = group_df.copy()
+    group_df[EXTRACTED_ISSUES] = group_df[TRACEBACK].map(_extract_issues)
+    return group_df.apply(_add_history, axis=1, args=(group_df,))
+
+
 def _extract_issues(traceback: str) -> str:
     issues = get_issues_from_json(traceback)
     issue_classes = [issue.origin_class for issue in issues]
     return ','.join(issue_classes)
 
 
+def add_history(solutions_df: pd.DataFrame, workers: Optional[int] = None) -> pd.DataFrame:
+    groups = solutions_df[[USER, LANG, TIME, TRACEBACK]].groupby([USER, LANG], dropna=False)
+    tasks = ((key, (group_df,)) for key, group_df in groups)
+    histories = [history for _, history in run_in_parallel(_add_history_to_group, tasks, workers)]
+
+    solutions_df[HISTORY] = pd.concat(histories) if histories else pd.Series(dtype=object)
+    return solutions_df
+
+
 def main():
     parser = argparse.ArgumentParser()
     configure_arguments(parser)
     args = parser.parse_args()
 
-    pandarallel.initialize()
-
     solutions_file_path = args.solutions_file_path
-    solutions_df = get_solutions_df_by_file_path(solutions_file_path)
-    solutions_df[EXTRACTED_ISSUES] = solutions_df.parallel_apply(lambda row: _extract_issues(row[TRACEBACK]), axis=1)
-    solutions_df[HISTORY] = solutions_df.parallel_apply(_add_history, axis=1, args=(solutions_df,))
+    solutions_df = add_history(get_solutions_df_by_file_path(solutions_file_path), args.workers)
 
-    columns_to_drop = [EXTRACTED_ISSUES]
+    columns_to_drop = []
 
     if args.to_drop_grade:
         columns_to_drop.append(GRADE)
@@ -116,7 +135,7 @@ def main():
         dataset_name = get_name_from_path(solutions_file_path, with_extension=False)
         output_path = output_dir / f'{dataset_name}_with_history{AnalysisExtension.CSV.value}'
 
-    output_ext = get_restricted_extension(solutions_file_path, [AnalysisExtension.XLSX, AnalysisExtension.CSV])
+    output_ext = get_restricted_extension(solutions_file_path, AnalysisExtension.get_dataset_extensions())
     write_df_to_file(solutions_df, output_path, output_ext)
 
 
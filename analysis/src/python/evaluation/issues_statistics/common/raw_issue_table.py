@@ -0,0 +1,83 @@
+import json
+from json import JSONDecodeError
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+from hyperstyle.src.python.review.inspectors.issue import IssueData, IssueDifficulty
+from analysis.src.python.evaluation.common.csv_util import ColumnName
+from analysis.src.python.evaluation.common.file_util import AnalysisExtension, get_restricted_extension
+from analysis.src.python.evaluation.common.pandas_util import get_solutions_df, write_df_to_file
+from analysis.src.python.evaluation.issues_statistics.common.raw_issue_encoder_decoder import MEASURE
+
+ID = ColumnName.ID.value
+ORIGIN_CLASS = IssueData.ORIGIN_ClASS.value
+ISSUE_TYPE = IssueData.ISSUE_TYPE.value
+INSPECTOR_TYPE = IssueData.INSPECTOR_TYPE.value
+DIFFICULTY = IssueData.DIFFICULTY.value
+LINE_NUMBER = IssueData.LINE_NUMBER.value
+COLUMN_NUMBER = IssueData.COLUMN_NUMBER.value
+
+CATEGORICAL_COLUMNS = [ORIGIN_CLASS, ISSUE_TYPE, INSPECTOR_TYPE, DIFFICULTY]
+INTEGER_COLUMNS = [LINE_NUMBER, COLUMN_NUMBER]
+ISSUE_COLUMNS = CATEGORICAL_COLUMNS + INTEGER_COLUMNS + [MEASURE]
+
+RAW_ISSUE_TABLE_COLUMNS = [ID] + ISSUE_COLUMNS
+
+# Raw issues saved before the difficulty was encoded have no difficulty.
+# They get the same difficulty as RawIssueDecoder gives them, so both ways to load issues agree.
+DEFAULT_DIFFICULTY = IssueDifficulty.HARD
+
+
+def _set_dtypes(table: pd.DataFrame) -> pd.DataFrame:
+    for column in CATEGORICAL_COLUMNS:
+        if column in table.columns:
+            table[column] = table[column].astype('category')
+
+    for column in INTEGER_COLUMNS:
+        if column in table.columns:
+            table[column] = table[column].astype('int64')
+
+    # Only measurable issues have a measure
+    if MEASURE in table.columns:
+        table[MEASURE] = table[MEASURE].astype('Int64')
+
+    return table
+
+
+def get_raw_issues_table(solutions_df: pd.DataFrame, raw_issues_column: str) -> pd.DataFrame:
+    """
+    Convert the column with raw issues encoded by RawIssueEncoder into the table with one row per issue.
+    Issues are decoded into plain dicts, so issue objects are not created.
+    Solutions with missing or broken raw issues are skipped. Issues without difficulty get DEFAULT_DIFFICULTY.
+    """
+    ids = []
+    issues = []
+    for fragment_id, raw_issues in zip(solutions_df[ID].values, solutions_df[raw_issues_column].values):
+        try:
+            fragment_issues = json.loads(raw_issues)
+        except (JSONDecodeError, TypeError):
+            continue
+
+        ids.extend([fragment_id] * len(fragment_issues))
+        issues.extend(fragment_issues)
+
+    table = pd.DataFrame.from_records(issues, columns=ISSUE_COLUMNS)
+    table.insert(0, ID, pd.Series(ids, dtype=solutions_df[ID].dtype))
+
+    table[DIFFICULTY] = table[DIFFICULTY].fillna(DEFAULT_DIFFICULTY.value)
+
+    return _set_dtypes(table)
+
+
+def write_raw_issues_table(table: pd.DataFrame, output_path: Path) -> None:
+    extension = get_restricted_extension(output_path, AnalysisExtension.get_dataset_extensions())
+    write_df_to_file(table, output_path, extension)
+
+
+def read_raw_issues_table(input_path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read the table with raw issues. Column types are restored after reading from text formats.
+    """
+    extension = get_restricted_extension(input_path, AnalysisExtension.get_dataset_extensions())
+    return _set_dtypes(get_solutions_df(extension, input_path, columns))
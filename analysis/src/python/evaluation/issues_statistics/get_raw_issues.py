@@ -3,24 +3,29 @@ import json
 import logging
 import os
 import sys
+from collections import defaultdict
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 sys.path.append('')
 
 import numpy as np
 import pandas as pd
-from pandarallel import pandarallel
 from hyperstyle.src.python.common.tool_arguments import RunToolArgument
-from analysis.src.python.evaluation.common.pandas_util import get_solutions_df_by_file_path, write_df_to_file
+from analysis.src.python.evaluation.common.pandas_util import get_solutions_df_by_file_path, \
+    get_solutions_df_chunks, get_solutions_df_slice, write_df_chunks_to_csv, write_df_to_file
+from analysis.src.python.evaluation.common.checkpoint_util import get_checkpoints_dir, inspect_with_checkpoints
 from analysis.src.python.evaluation.common.csv_util import ColumnName
-from analysis.src.python.evaluation.common.file_util import AnalysisExtension, create_file, get_name_from_path, \
-    get_parent_folder
+from analysis.src.python.evaluation.common.parallel_util import run_in_parallel
+from analysis.src.python.evaluation.common.file_util import AnalysisExtension, create_file, \
+    create_run_scratch_dir, get_name_from_path, get_parent_folder, get_worker_scratch_dir, remove_directory
 from analysis.src.python.evaluation.issues_statistics.common.raw_issue_encoder_decoder import RawIssueEncoder
-from analysis.src.python.evaluation.common.args_util import EvaluationRunToolArgument
+from analysis.src.python.evaluation.issues_statistics.common.raw_issue_table import get_raw_issues_table, \
+    write_raw_issues_table
+from analysis.src.python.evaluation.common.args_util import EvaluationRunToolArgument, parse_byte_range
 from hyperstyle.src.python.review.application_config import LanguageVersion
-from hyperstyle.src.python.review.common.file_system import Extension
 from hyperstyle.src.python.review.common.language import Language
+from hyperstyle.src.python.review.inspectors.base_inspector import BaseInspector
 from hyperstyle.src.python.review.inspectors.issue import (
     BaseIssue,
     IssueType,
@@ -34,7 +39,7 @@ CODE = ColumnName.CODE.value
 ID = ColumnName.ID.value
 RAW_ISSUES = 'raw_issues'
 
-ALLOWED_EXTENSION = {AnalysisExtension.XLSX, AnalysisExtension.CSV}
+ALLOWED_EXTENSION = set(AnalysisExtension.get_dataset_extensions())
 
 ERROR_CODES = [
     'E999',  # flake8
@@ -42,6 +47,12 @@ ERROR_CODES = [
     'E0001',  # pylint
 ]
 
+# Issues that depend on other files, so they are skipped when several fragments are inspected together
+CROSS_FILE_ORIGIN_CLASSES = [
+    'R0801',  # pylint: duplicate code
+    'R0401',  # pylint: cyclic import
+]
+
 logger = logging.getLogger(__name__)
 
 
@@ -83,6 +94,75 @@ def configure_arguments(parser: argparse.ArgumentParser) -> None:
              'If not specified, the dataset will be saved next to the original one.',
     )
 
+    parser.add_argument(
+        '--issues-table',
+        type=lambda value: Path(value).absolute(),
+        help='Path where the table with one row per raw issue will be saved in addition to the dataset. '
+             'It can not be used together with --stream-chunk-size.',
+    )
+
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=1,
+        help='Number of fragments that are inspected by one run of each inspector. '
+             'Fragments of a chunk are written into one directory and the issues found are split back by file path. '
+             'By default, each fragment is inspected separately.',
+    )
+
+    parser.add_argument(
+        '--scratch-dir',
+        type=lambda value: Path(value).absolute(),
+        help='Path to the directory where temporary files with code fragments will be created. '
+             'If not specified, a directory in RAM (/dev/shm) is used if it is available '
+             'or the system temporary directory otherwise.',
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Number of worker processes that inspect fragments. If not specified, the number of CPUs is used.',
+    )
+
+    parser.add_argument(
+        '--task-timeout',
+        type=float,
+        help='Time in seconds after which the inspection of a fragment (or a chunk of fragments) is interrupted. '
+             'Interrupted fragments get empty raw issues. By default, there is no time limit.',
+    )
+
+    saving_mode = parser.add_mutually_exclusive_group()
+
+    saving_mode.add_argument(
+        '--checkpoint-size',
+        type=int,
+        help='Number of fragments whose raw issues are saved to a checkpoint at once. '
+             'If specified, checkpoints are stored in a directory next to the output file '
+             'and removed after the output file is written.',
+    )
+
+    saving_mode.add_argument(
+        '--stream-chunk-size',
+        type=int,
+        help='Number of rows that are read from the CSV-file with solutions at once. '
+             'If specified, the dataset is inspected by chunks and raw issues of each chunk are appended '
+             'to the output CSV-file, so the whole dataset is never loaded into memory.',
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Fragments whose ids are already in the checkpoints of the previous run will not be inspected again. '
+             'Works only with --checkpoint-size, it can not be used together with --stream-chunk-size.',
+    )
+
+    parser.add_argument(
+        EvaluationRunToolArgument.BYTE_RANGE.value.long_name,
+        type=parse_byte_range,
+        help=f'{EvaluationRunToolArgument.BYTE_RANGE.value.description} '
+             'It can not be used together with --stream-chunk-size.',
+    )
+
     parser.add_argument(
         '-l', '--log-output',
         type=lambda value: Path(value).absolute(),
@@ -117,54 +197,76 @@ def _check_issues_for_errors(issues: List[BaseIssue]) -> bool:
     return any(error_code in origin_classes for error_code in ERROR_CODES)
 
 
-def _inspect_row(
-        row: pd.Series,
-        solutions_file_path: Path,
-        allow_duplicates: bool,
-        allow_zero_measure_issues: bool,
-        allow_info_issues: bool,
-        to_safe_path: bool,
-) -> Optional[str]:
-    print(f'{row[ID]}: processing started')
-
+def _get_language_version(row: pd.Series) -> Optional[LanguageVersion]:
     if pd.isnull(row[LANG]):
         logger.warning(f'{row[ID]}: no lang.')
-        return np.nan
+        return None
 
     if pd.isnull(row[CODE]):
         logger.warning(f'{row[ID]}: no code.')
-        return np.nan
+        return None
 
     # If we were unable to identify the language version, we return None
     language_version = LanguageVersion.from_value(row[LANG])
     if language_version is None:
         logger.warning(f'{row[ID]}: it was not possible to determine the language version from "{row[LANG]}"')
-        return np.nan
+        return None
 
     # If we were unable to identify the language, we return None
     language = Language.from_language_version(language_version)
     if language == Language.UNKNOWN:
         logger.warning(f'{row[ID]}: it was not possible to determine the language from "{language_version}"')
-        return np.nan
+        return None
 
     # If there are no inspectors for the language, then return None
-    inspectors = LANGUAGE_TO_INSPECTORS.get(language, [])
-    if not inspectors:
+    if not LANGUAGE_TO_INSPECTORS.get(language, []):
         logger.warning(f'{row[ID]}: no inspectors were found for the {language}.')
-        return np.nan
+        return None
+
+    return language_version
 
-    tmp_file_extension = language_version.extension_by_language().value
-    tmp_file_path = solutions_file_path.parent.absolute() / f'fragment_{row[ID]}{tmp_file_extension}'
-    temp_file = next(create_file(tmp_file_path, row[CODE]))
 
-    inspectors_config = {
+def _get_inspectors_config(language_version: LanguageVersion) -> Dict[str, Any]:
+    return {
         'language_version': language_version,
         'n_cpu': 1,
     }
 
+
+def _dump_issues(
+        issues: List[BaseIssue],
+        allow_duplicates: bool,
+        allow_zero_measure_issues: bool,
+        allow_info_issues: bool,
+        to_safe_path: bool,
+) -> str:
+    issues = _filter_issues(issues, allow_duplicates, allow_zero_measure_issues, allow_info_issues)
+    return json.dumps(issues, cls=RawIssueEncoder, to_safe_path=to_safe_path)
+
+
+def _inspect_row(
+        row: pd.Series,
+        scratch_dir: Path,
+        allow_duplicates: bool,
+        allow_zero_measure_issues: bool,
+        allow_info_issues: bool,
+        to_safe_path: bool,
+) -> Optional[str]:
+    print(f'{row[ID]}: processing started')
+
+    language_version = _get_language_version(row)
+    if language_version is None:
+        return np.nan
+
+    tmp_file_extension = language_version.extension_by_language().value
+    tmp_file_path = get_worker_scratch_dir(scratch_dir) / f'fragment_{row[ID]}{tmp_file_extension}'
+    temp_file = next(create_file(tmp_file_path, row[CODE]))
+
+    inspectors_config = _get_inspectors_config(language_version)
+
     raw_issues = []
 
-    for inspector in inspectors:
+    for inspector in LANGUAGE_TO_INSPECTORS[Language.from_language_version(language_version)]:
         try:
             issues = inspector.inspect(temp_file, inspectors_config)
 
@@ -179,15 +281,128 @@ def _inspect_row(
 
     os.remove(temp_file)
 
-    raw_issues = _filter_issues(raw_issues, allow_duplicates, allow_zero_measure_issues, allow_info_issues)
-
-    json_issues = json.dumps(raw_issues, cls=RawIssueEncoder, to_safe_path=to_safe_path)
+    json_issues = _dump_issues(raw_issues, allow_duplicates, allow_zero_measure_issues, allow_info_issues, to_safe_path)
 
     print(f'{row[ID]}: processing finished.')
 
     return json_issues
 
 
+def _get_issue_path(issue: BaseIssue, fragments_dir: Path) -> Path:
+    issue_path = Path(issue.file_path)
+    if not issue_path.is_absolute():
+        issue_path = fragments_dir / issue_path
+    return issue_path.resolve()
+
+
+def _inspect_fragments_separately(
+        inspector: BaseInspector,
+        fragment_paths: Dict[Any, Path],
+        fragment_ids: pd.Series,
+        inspectors_config: Dict[str, Any],
+) -> List[BaseIssue]:
+    issues = []
+    for index, fragment_path in fragment_paths.items():
+        try:
+            issues.extend(inspector.inspect(fragment_path, inspectors_config))
+        except Exception:
+            logger.warning(f'{fragment_ids[index]}: inspector {inspector.inspector_type.value} failed.')
+    return issues
+
+
+def _split_issues_by_fragments(
+        issues: List[BaseIssue],
+        fragments_dir: Path,
+        index_by_path: Dict[Path, Any],
+) -> Dict[Any, List[BaseIssue]]:
+    issues_by_index = defaultdict(list)
+    for issue in issues:
+        if issue.origin_class in CROSS_FILE_ORIGIN_CLASSES:
+            continue
+
+        index = index_by_path.get(_get_issue_path(issue, fragments_dir))
+        if index is not None:
+            issues_by_index[index].append(issue)
+    return issues_by_index
+
+
+def _inspect_fragments(
+        fragments_dir: Path,
+        fragment_paths: Dict[Any, Path],
+        fragment_ids: pd.Series,
+        language_version: LanguageVersion,
+) -> Dict[Any, List[BaseIssue]]:
+    """
+    Run each inspector once on the directory with all fragments and split found issues by fragments.
+    If an inspector fails on the directory, it is run on each fragment separately.
+    """
+    language = Language.from_language_version(language_version)
+    if language == Language.PYTHON:
+        # Pylint inspects a directory only if it is a package
+        next(create_file(fragments_dir / '__init__.py', ''))
+
+    inspectors_config = _get_inspectors_config(language_version)
+    index_by_path = {path.resolve(): index for index, path in fragment_paths.items()}
+    raw_issues = {index: [] for index in fragment_paths.keys()}
+
+    for inspector in LANGUAGE_TO_INSPECTORS[language]:
+        try:
+            issues = inspector.inspect(fragments_dir, inspectors_config)
+        except Exception:
+            logger.warning(f'Inspector {inspector.inspector_type.value} failed on the chunk of fragments, '
+                           f'fragments will be inspected separately.')
+            issues = _inspect_fragments_separately(inspector, fragment_paths, fragment_ids, inspectors_config)
+
+        for index, fragment_issues in _split_issues_by_fragments(issues, fragments_dir, index_by_path).items():
+            if _check_issues_for_errors(fragment_issues):
+                logger.warning(f'{fragment_ids[index]}: inspector {inspector.inspector_type.value} failed.')
+                continue
+
+            raw_issues[index].extend(fragment_issues)
+
+    return raw_issues
+
+
+def _inspect_chunk(
+        chunk: pd.DataFrame,
+        scratch_dir: Path,
+        allow_duplicates: bool,
+        allow_zero_measure_issues: bool,
+        allow_info_issues: bool,
+        to_safe_path: bool,
+) -> pd.Series:
+    chunk_dir = get_worker_scratch_dir(scratch_dir) / 'chunk'
+
+    # Fragments are grouped by language version, since it is a part of the inspectors config
+    fragment_paths_by_language_version = defaultdict(dict)
+    for index, row in chunk.iterrows():
+        print(f'{row[ID]}: processing started')
+
+        language_version = _get_language_version(row)
+        if language_version is None:
+            continue
+
+        tmp_file_extension = language_version.extension_by_language().value
+        tmp_file_path = chunk_dir / language_version.value / f'fragment_{row[ID]}{tmp_file_extension}'
+        fragment_paths_by_language_version[language_version][index] = next(create_file(tmp_file_path, row[CODE]))
+
+    raw_issues = {}
+
+    for language_version, fragment_paths in fragment_paths_by_language_version.items():
+        fragments_dir = chunk_dir / language_version.value
+        issues_by_index = _inspect_fragments(fragments_dir, fragment_paths, chunk[ID], language_version)
+
+        for index, issues in issues_by_index.items():
+            raw_issues[index] = _dump_issues(
+                issues, allow_duplicates, allow_zero_measure_issues, allow_info_issues, to_safe_path,
+            )
+            print(f'{chunk.at[index, ID]}: processing finished.')
+
+    remove_directory(chunk_dir)
+
+    return pd.Series([raw_issues.get(index, np.nan) for index in chunk.index], index=chunk.index)
+
+
 def _is_correct_output_path(output_path: Path) -> bool:
     try:
         output_extension = AnalysisExtension.get_extension_from_file(str(output_path))
@@ -209,29 +424,71 @@ def _get_output_path(solutions_file_path: Path, output_path: Optional[Path]) ->
     return output_dir / f'{dataset_name}_with_raw_issues{extension.value}'
 
 
+def _inspect_solutions_by_rows(
+        solutions_df: pd.DataFrame, workers: Optional[int], timeout: Optional[float], *args,
+) -> pd.Series:
+    tasks = ((index, (row, *args)) for index, row in solutions_df.iterrows())
+    raw_issues = dict(run_in_parallel(_inspect_row, tasks, workers, timeout))
+    return pd.Series(
+        [raw_issues[index] for index in solutions_df.index], index=solutions_df.index, dtype=object,
+    ).infer_objects()
+
+
+def _inspect_solutions_by_chunks(
+        solutions_df: pd.DataFrame, chunk_size: int, workers: Optional[int], timeout: Optional[float], *args,
+) -> pd.Series:
+    tasks = ((i, (solutions_df.iloc[i:i + chunk_size], *args)) for i in range(0, len(solutions_df), chunk_size))
+    results = [result for _, result in run_in_parallel(_inspect_chunk, tasks, workers, timeout) if result is not None]
+    if not results:
+        return pd.Series(np.nan, index=solutions_df.index)
+
+    # Fragments of interrupted chunks get empty raw issues
+    return pd.concat(results).reindex(solutions_df.index)
+
+
 def inspect_solutions(
         solutions_df: pd.DataFrame,
-        solutions_file_path: Path,
         allow_duplicates: bool,
         allow_zero_measure_issues: bool,
         allow_info_issues: bool,
         to_save_path: bool,
+        scratch_dir: Optional[Path] = None,
+        chunk_size: int = 1,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
 ) -> pd.DataFrame:
-    pandarallel.initialize()
-
-    solutions_df[RAW_ISSUES] = solutions_df.parallel_apply(
-        _inspect_row,
-        args=(solutions_file_path, allow_duplicates, allow_zero_measure_issues, allow_info_issues, to_save_path),
-        axis=1,
-    )
+    run_scratch_dir = create_run_scratch_dir(scratch_dir)
+    args = (run_scratch_dir, allow_duplicates, allow_zero_measure_issues, allow_info_issues, to_save_path)
+    try:
+        if chunk_size > 1:
+            solutions_df[RAW_ISSUES] = _inspect_solutions_by_chunks(solutions_df, chunk_size, workers, timeout, *args)
+        else:
+            solutions_df[RAW_ISSUES] = _inspect_solutions_by_rows(solutions_df, workers, timeout, *args)
+    finally:
+        remove_directory(run_scratch_dir)
 
     return solutions_df
 
 
+def _check_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if args.issues_table is not None and args.stream_chunk_size is not None:
+        parser.error('--issues-table can not be used together with --stream-chunk-size.')
+
+    if args.byte_range is not None and args.stream_chunk_size is not None:
+        parser.error('--byte-range can not be used together with --stream-chunk-size.')
+
+    if args.resume and args.stream_chunk_size is not None:
+        parser.error('--resume can not be used together with --stream-chunk-size.')
+
+    if args.resume and args.checkpoint_size is None:
+        parser.error('--resume works only with --checkpoint-size.')
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     configure_arguments(parser)
     args = parser.parse_args()
+    _check_arguments(parser, args)
 
     if args.log_output is not None:
         args.log_output.parent.mkdir(parents=True, exist_ok=True)
@@ -240,27 +497,54 @@ def main() -> None:
         filename=args.log_output, filemode='w', level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s',
     )
 
-    solutions = get_solutions_df_by_file_path(args.solutions_file_path)
+    output_path = _get_output_path(args.solutions_file_path, args.output)
 
     logger.info('Dataset inspection started.')
 
-    solutions_with_raw_issues = inspect_solutions(
-        solutions,
-        args.solutions_file_path,
-        args.allow_duplicates,
-        args.allow_zero_measure_issues,
-        args.allow_info_issues,
-        args.to_save_path,
-    )
+    def inspect(df: pd.DataFrame) -> pd.DataFrame:
+        return inspect_solutions(
+            df,
+            args.allow_duplicates,
+            args.allow_zero_measure_issues,
+            args.allow_info_issues,
+            args.to_save_path,
+            args.scratch_dir,
+            args.chunk_size,
+            args.workers,
+            args.task_timeout,
+        )
 
-    logger.info('Dataset inspection finished.')
+    if args.stream_chunk_size is not None:
+        chunks = get_solutions_df_chunks(args.solutions_file_path, args.stream_chunk_size)
+        write_df_chunks_to_csv(map(inspect, chunks), output_path)
+        logger.info(f'Dataset inspection finished. The dataframe is saved to a file: {output_path}.')
+        return
+
+    if args.byte_range is None:
+        solutions = get_solutions_df_by_file_path(args.solutions_file_path)
+    else:
+        solutions = get_solutions_df_slice(args.solutions_file_path, args.byte_range)
+
+    checkpoints_dir = get_checkpoints_dir(output_path)
+    if args.checkpoint_size is None:
+        solutions_with_raw_issues = inspect(solutions)
+    else:
+        solutions_with_raw_issues = inspect_with_checkpoints(
+            solutions, inspect, checkpoints_dir, args.checkpoint_size, args.resume,
+        )
 
-    output_path = _get_output_path(args.solutions_file_path, args.output)
-    output_extension = Extension.get_extension_from_file(str(output_path))
+    logger.info('Dataset inspection finished.')
 
     logger.info(f'Saving the dataframe to a file: {output_path}.')
 
+    output_extension = AnalysisExtension.get_extension_from_file(str(output_path))
     write_df_to_file(solutions_with_raw_issues, output_path, output_extension)
+    if args.checkpoint_size is not None:
+        remove_directory(checkpoints_dir)
+
+    if args.issues_table is not None:
+        logger.info(f'Saving the table with raw issues to a file: {args.issues_table}.')
+        write_raw_issues_table(get_raw_issues_table(solutions_with_raw_issues, RAW_ISSUES), args.issues_table)
 
     logger.info('Saving complete.')
 
@@ -1,28 +1,28 @@
 import argparse
-import json
 import logging
 import sys
-from collections import Counter
-from json import JSONDecodeError
+from functools import partial, reduce
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 sys.path.append('')
 sys.path.append('../../..')
 
+import numpy as np
 import pandas as pd
-from pandarallel import pandarallel
 from hyperstyle.src.python.review.application_config import LanguageVersion
-from hyperstyle.src.python.review.common.file_system import Extension, get_total_code_lines_from_code
+from hyperstyle.src.python.review.common.file_system import get_total_code_lines_from_code
 from hyperstyle.src.python.review.common.language import Language
-from hyperstyle.src.python.review.inspectors.issue import BaseIssue, ISSUE_TYPE_TO_CLASS, IssueType, Measurable
+from hyperstyle.src.python.review.inspectors.issue import ISSUE_TYPE_TO_CLASS, IssueType, Measurable
 from hyperstyle.src.python.review.quality.rules.code_style_scoring import CodeStyleRule
 from hyperstyle.src.python.review.quality.rules.line_len_scoring import LineLengthRule
-from hyperstyle.src.python.review.reviewers.utils.code_statistics import get_code_style_lines
-from analysis.src.python.evaluation.common.pandas_util import get_solutions_df_by_file_path, write_df_to_file
+from analysis.src.python.evaluation.common.pandas_util import get_solutions_df_by_file_path, \
+    get_solutions_df_chunks, read_df_from_file, write_df_to_file
 from analysis.src.python.evaluation.common.csv_util import ColumnName
-from analysis.src.python.evaluation.common.file_util import get_parent_folder
-from analysis.src.python.evaluation.issues_statistics.common.raw_issue_encoder_decoder import RawIssueDecoder
+from analysis.src.python.evaluation.common.file_util import AnalysisExtension, get_parent_folder
+from analysis.src.python.evaluation.issues_statistics.common.raw_issue_encoder_decoder import MEASURE
+from analysis.src.python.evaluation.issues_statistics.common.raw_issue_table import get_raw_issues_table, \
+    ISSUE_TYPE, LINE_NUMBER
 from analysis.src.python.evaluation.issues_statistics.get_raw_issues import RAW_ISSUES
 
 ID = ColumnName.ID.value
@@ -36,6 +36,9 @@ LINE_LEN_RATIO = f'{IssueType.LINE_LEN.value}_ratio'
 TOTAL_LINES = 'total_lines'
 VALUE = 'value'
 
+# Only these columns are used to collect statistics, so other ones (e.g. traceback) are not read
+COLUMNS_TO_READ = [ID, LANG, CODE, RAW_ISSUES]
+
 OUTPUT_DF_NAME = 'stats'
 DEFAULT_OUTPUT_FOLDER_NAME = 'raw_issues_statistics'
 
@@ -57,6 +60,21 @@ def configure_arguments(parser: argparse.ArgumentParser) -> None:
              'If not specified, the datasets will be saved in the folder next to the original one.',
     )
 
+    parser.add_argument(
+        '--stream-chunk-size',
+        type=int,
+        help='Number of rows that are read from the CSV-file with raw issues at once. '
+             'If specified, statistics are collected for each chunk separately and then summed up, '
+             'so the whole dataset is never loaded into memory.',
+    )
+
+    parser.add_argument(
+        '--merge-into',
+        type=lambda value: Path(value).absolute(),
+        help='Path to the folder with statistics collected by a previous run. Statistics of the new dataset '
+             'will be added to them. If --output is not specified, the merged statistics will be saved to this folder.',
+    )
+
     parser.add_argument(
         '-l', '--log-output',
         type=lambda value: Path(value).absolute(),
@@ -80,40 +98,70 @@ def _convert_language_code_to_language(fragment_id: str, language_code: str) ->
     return language.value
 
 
-def _extract_stats_from_issues(row: pd.Series) -> pd.Series:
-    print(f'{row[ID]}: extracting stats.')
+def _convert_languages(solutions_df: pd.DataFrame) -> pd.Series:
+    language_codes = solutions_df[LANG].fillna('').astype(str)
+
+    # Language codes repeat a lot, so each of them is converted only once
+    first_ids = solutions_df[ID].groupby(language_codes.values).first()
+    languages = {
+        language_code: _convert_language_code_to_language(fragment_id, language_code)
+        for language_code, fragment_id in first_ids.items()
+    }
+
+    return language_codes.map(languages)
+
+
+def _get_total_lines(solutions_df: pd.DataFrame) -> np.ndarray:
+    codes = solutions_df[CODE]
+    for fragment_id in solutions_df.loc[codes.isnull(), ID]:
+        logger.warning(f'{fragment_id}: no code.')
+
+    return codes.fillna('').map(get_total_code_lines_from_code).to_numpy(dtype=int)
 
-    if pd.isnull(row[CODE]):
-        logger.warning(f'{row[ID]}: no code.')
-        row[CODE] = ""
 
-    if pd.isnull(row[LANG]):
-        logger.warning(f'{row[ID]}: no lang.')
-        row[LANG] = ""
+def _get_issues_table(solutions_df: pd.DataFrame) -> pd.DataFrame:
+    # Issues are joined with solutions by position, so duplicated ids do not mix the issues of different solutions
+    positions_df = pd.DataFrame({ID: np.arange(len(solutions_df)), RAW_ISSUES: solutions_df[RAW_ISSUES].values})
 
-    try:
-        issues: List[BaseIssue] = json.loads(row[RAW_ISSUES], cls=RawIssueDecoder)
-    except (JSONDecodeError, TypeError):
-        logger.warning(f'{row[ID]}: failed to decode issues.')
-        issues: List[BaseIssue] = []
+    for fragment_id in solutions_df.loc[solutions_df[RAW_ISSUES].isnull(), ID]:
+        logger.warning(f'{fragment_id}: failed to decode issues.')
 
-    counter = Counter([issue.type for issue in issues])
+    return get_raw_issues_table(positions_df, RAW_ISSUES)
 
+
+def _extract_stats_from_issues(solutions_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Collect statistics for each solution and return them together with the table of measurable issues.
+    Issues are decoded only once into a table with one row per issue, so all the counts are computed
+    with grouping operations instead of creating issue objects for each solution.
+    """
+    solutions_number = len(solutions_df)
+    issues = _get_issues_table(solutions_df)
+    positions = issues[ID].to_numpy()
+
+    solutions_stats = pd.DataFrame({LANG: _convert_languages(solutions_df).values})
+
+    measurable_issues = []
     for issue_type, issue_class in ISSUE_TYPE_TO_CLASS.items():
+        is_issue_type = (issues[ISSUE_TYPE] == issue_type.value).to_numpy()
         if issubclass(issue_class, Measurable):
-            row[issue_type.value] = [issue.measure() for issue in issues if isinstance(issue, issue_class)]
+            measurable_issues.append(issues.loc[is_issue_type, [ID, ISSUE_TYPE, MEASURE]])
         else:
-            row[issue_type.value] = counter[issue_type]
-
-    row[CODE_STYLE_LINES] = get_code_style_lines(issues)
-    row[LINE_LEN_NUMBER] = counter[IssueType.LINE_LEN]
-    row[TOTAL_LINES] = get_total_code_lines_from_code(row[CODE])
+            solutions_stats[issue_type.value] = np.bincount(positions[is_issue_type], minlength=solutions_number)
 
-    row[LANG] = _convert_language_code_to_language(row[ID], row[LANG])
+    # Several code style issues on the same line are counted as one line
+    code_style_lines = issues.loc[issues[ISSUE_TYPE] == IssueType.CODE_STYLE.value, [ID, LINE_NUMBER]].drop_duplicates()
+    solutions_stats[CODE_STYLE_LINES] = np.bincount(code_style_lines[ID], minlength=solutions_number)
+    solutions_stats[LINE_LEN_NUMBER] = np.bincount(
+        positions[(issues[ISSUE_TYPE] == IssueType.LINE_LEN.value).to_numpy()], minlength=solutions_number,
+    )
+    solutions_stats[TOTAL_LINES] = _get_total_lines(solutions_df)
 
-    print(f'{row[ID]}: extraction of statistics is complete.')
+    measurable_issues = pd.concat(measurable_issues).dropna(subset=[MEASURE])
+    measurable_issues[LANG] = solutions_stats[LANG].to_numpy()[measurable_issues[ID].to_numpy()]
+    measurable_issues[MEASURE] = measurable_issues[MEASURE].astype(int)
 
-    return row
+    return solutions_stats, measurable_issues
 
 
 def _convert_ratio_to_int(ratio: float):
@@ -123,46 +171,50 @@ def _convert_ratio_to_int(ratio: float):
     return int((round(ratio, 2) * 100))
 
 
-def _group_stats_by_lang(df_with_stats: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+def _count_ratios(issues_numbers: pd.Series, total_lines: pd.Series, get_ratio: Callable[[int, int], float],
+                  name: str) -> pd.Series:
+    # There are few distinct (issues number, total lines) pairs, so the rule function is called once per pair
+    pair_counts = pd.DataFrame({name: issues_numbers.to_numpy(), TOTAL_LINES: total_lines.to_numpy()}).value_counts()
+    ratios = [_convert_ratio_to_int(get_ratio(int(number), int(lines))) for number, lines in pair_counts.index]
+    return pair_counts.groupby(ratios).sum().rename(name)
+
+
+def _group_stats_by_lang(solutions_stats: pd.DataFrame, measurable_issues: pd.DataFrame) -> Dict[str, pd.DataFrame]:
     logger.info('The grouping of statistics by language has started.')
 
     result = {}
 
-    df_grouped_by_lang = df_with_stats.groupby(LANG)
-    for lang in df_grouped_by_lang.groups:
+    measurable_issues_by_lang = dict(tuple(measurable_issues.groupby(LANG)))
+    for lang, lang_group in solutions_stats.groupby(LANG):
         logger.info(f'"{lang}" statistics grouping started.')
 
-        lang_group = df_grouped_by_lang.get_group(lang)
+        lang_issues = measurable_issues_by_lang.get(lang, measurable_issues.iloc[:0])
 
         columns_with_stats = []
 
         for issue_type, issue_class in ISSUE_TYPE_TO_CLASS.items():
-            column = lang_group[issue_type.value]
             if issubclass(issue_class, Measurable):
-                column = column.explode()
-            columns_with_stats.append(column.value_counts())
+                column = lang_issues.loc[lang_issues[ISSUE_TYPE] == issue_type.value, MEASURE]
+            else:
+                column = lang_group[issue_type.value]
+            columns_with_stats.append(column.value_counts().rename(issue_type.value))
 
-        columns_with_stats.append(lang_group[TOTAL_LINES].value_counts())
+        total_lines = lang_group[TOTAL_LINES]
+        columns_with_stats.append(total_lines.value_counts())
 
-        line_len_ratio_column = lang_group.apply(
-            lambda row: LineLengthRule.get_ratio(row[LINE_LEN_NUMBER], row[TOTAL_LINES]),
-            axis=1,
+        columns_with_stats.append(
+            _count_ratios(lang_group[LINE_LEN_NUMBER], total_lines, LineLengthRule.get_ratio, LINE_LEN_RATIO),
         )
-        line_len_ratio_column = line_len_ratio_column.apply(_convert_ratio_to_int)
-        line_len_ratio_column.name = LINE_LEN_RATIO
-        columns_with_stats.append(line_len_ratio_column.value_counts())
-
-        code_style_ratio_column = lang_group.apply(
-            lambda row: CodeStyleRule.get_ratio(
-                row[CODE_STYLE_LINES], row[TOTAL_LINES], Language.from_value(str(lang), default=Language.UNKNOWN),
-            ),
-            axis=1,
-        )
-        code_style_ratio_column = code_style_ratio_column.apply(_convert_ratio_to_int)
-        code_style_ratio_column.name = CODE_STYLE_RATIO
-        columns_with_stats.append(code_style_ratio_column.value_counts())
+
+        language = Language.from_value(str(lang), default=Language.UNKNOWN)
+        columns_with_stats.append(_count_ratios(
+            lang_group[CODE_STYLE_LINES], total_lines, partial(CodeStyleRule.get_ratio, language=language),
+            CODE_STYLE_RATIO,
+        ))
 
         stats = pd.concat(columns_with_stats, axis=1).fillna(0).astype(int)
+        stats.index = stats.index.astype(int)
+        stats.sort_index(inplace=True)
 
         # Put values in a separate column
         stats.index.name = VALUE
@@ -177,11 +229,28 @@ def _group_stats_by_lang(df_with_stats: pd.DataFrame) -> Dict[str, pd.DataFrame]
 
 
 def inspect_raw_issues(solutions_with_raw_issues: pd.DataFrame) -> Dict[str, pd.DataFrame]:
-    pandarallel.initialize()
+    for fragment_id in solutions_with_raw_issues.loc[solutions_with_raw_issues[LANG].isnull(), ID]:
+        logger.warning(f'{fragment_id}: no lang.')
 
-    solutions_with_raw_issues = solutions_with_raw_issues.parallel_apply(_extract_stats_from_issues, axis=1)
+    return _group_stats_by_lang(*_extract_stats_from_issues(solutions_with_raw_issues))
 
-    return _group_stats_by_lang(solutions_with_raw_issues)
+
+def _merge_stats(first: Dict[str, pd.DataFrame], second: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """
+    Sum up statistics that were collected on two different parts of the dataset.
+    """
+    result = dict(first)
+
+    for lang, stats in second.items():
+        if lang not in result:
+            result[lang] = stats
+            continue
+
+        merged_stats = pd.concat([result[lang], stats]).groupby(VALUE).sum().fillna(0).astype(int)
+        merged_stats.reset_index(inplace=True)
+        result[lang] = merged_stats
+
+    return result
 
 
 def _get_output_folder(solutions_file_path: Path, output_folder: Optional[Path]):
@@ -191,16 +260,57 @@ def _get_output_folder(solutions_file_path: Path, output_folder: Optional[Path])
     return get_parent_folder(solutions_file_path) / DEFAULT_OUTPUT_FOLDER_NAME
 
 
+def _get_stats_files(lang_folder: Path) -> List[Path]:
+    return [
+        file for file in lang_folder.glob(f'{OUTPUT_DF_NAME}.*')
+        if AnalysisExtension.get_extension_from_file(file) in AnalysisExtension.get_dataset_extensions()
+    ]
+
+
+def _read_stats(stats_folder: Path) -> Dict[str, pd.DataFrame]:
+    """
+    Read statistics saved by a previous run. Each language folder must contain exactly one file with statistics.
+    """
+    result = {}
+
+    if not stats_folder.is_dir():
+        logger.warning(f'There are no statistics to merge with in {stats_folder}.')
+        return result
+
+    # Statistics of solutions without a language are saved directly to the stats folder
+    lang_folders = {'': stats_folder}
+    lang_folders.update({folder.name: folder for folder in stats_folder.iterdir() if folder.is_dir()})
+
+    for lang, lang_folder in lang_folders.items():
+        stats_files = _get_stats_files(lang_folder)
+        if not stats_files:
+            continue
+
+        if len(stats_files) > 1:
+            raise ValueError(f'Several files with statistics were found in {lang_folder}: {stats_files}.')
+
+        result[lang] = read_df_from_file(stats_files[0])
+
+    return result
+
+
 def _save_stats(stats_by_lang: Dict[str, pd.DataFrame], solutions_file_path: Path, output_path: Optional[Path]) -> None:
     output_folder = _get_output_folder(solutions_file_path, output_path)
-    output_extension = Extension.get_extension_from_file(str(solutions_file_path))
+    output_extension = AnalysisExtension.get_extension_from_file(str(solutions_file_path))
 
     logger.info(f'Saving statistics to a folder: {output_folder}.')
 
     for lang, stats in stats_by_lang.items():
         lang_folder = output_folder / lang
         lang_folder.mkdir(parents=True, exist_ok=True)
-        write_df_to_file(stats, lang_folder / f'{OUTPUT_DF_NAME}{output_extension.value}', output_extension)
+
+        stats_file = lang_folder / f'{OUTPUT_DF_NAME}{output_extension.value}'
+        write_df_to_file(stats, stats_file, output_extension)
+
+        # Merged statistics may be saved in another format, so only one file per language is kept
+        for previous_stats_file in _get_stats_files(lang_folder):
+            if previous_stats_file != stats_file:
+                previous_stats_file.unlink()
 
     logger.info('Saving statistics is complete.')
 
@@ -217,12 +327,22 @@ if __name__ == "__main__":
         filename=args.log_output, filemode="w", level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s',
     )
 
-    solutions_with_raw_issues = get_solutions_df_by_file_path(args.solutions_with_raw_issues)
-
     logger.info("Dataset inspection started.")
 
-    stats_by_lang = inspect_raw_issues(solutions_with_raw_issues)
+    if args.stream_chunk_size is None:
+        solutions_with_raw_issues = get_solutions_df_by_file_path(args.solutions_with_raw_issues, COLUMNS_TO_READ)
+        stats_by_lang = inspect_raw_issues(solutions_with_raw_issues)
+    else:
+        chunks = get_solutions_df_chunks(args.solutions_with_raw_issues, args.stream_chunk_size, COLUMNS_TO_READ)
+        stats_by_lang = reduce(_merge_stats, map(inspect_raw_issues, chunks), {})
 
     logger.info("Dataset inspection finished.")
 
-    _save_stats(stats_by_lang, args.solutions_with_raw_issues, args.output)
+    output = args.output
+    if args.merge_into is not None:
+        logger.info(f'Merging with statistics from {args.merge_into}.')
+        stats_by_lang = _merge_stats(_read_stats(args.merge_into), stats_by_lang)
+        if output is None:
+            output = args.merge_into
+
+    _save_stats(stats_by_lang, args.solutions_with_raw_issues, output)
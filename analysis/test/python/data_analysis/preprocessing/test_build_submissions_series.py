@@ -0,0 +1,33 @@
+from pathlib import Path
+
+import pandas as pd
+from analysis.src.python.data_analysis.preprocessing.build_submissions_series import build_submission_series, \
+    build_submission_series_out_of_core
+
+SUBMISSIONS = pd.DataFrame({
+    'id': list(range(1, 13)),
+    'user_id': [5, 3, 5, 1, 3, 4, 2, 5, 1, 4, 2, 3],
+    'step_id': [10, 20, 10, 10, 20, 30, 10, 20, 10, 30, 20, 10],
+    'code': ['a', 'b', 'aa', 'c', 'b', 'd', 'e', None, 'cc', 'dd', 'f', 'g'],
+    'time': [
+        '2021-01-03', '2021-01-02', '2021-01-01', '2021-01-05', '2021-01-01', '2021-01-02',
+        '2021-01-01', '2021-01-01', '2021-01-04', '2021-01-01', '2021-01-03', '2021-01-01',
+    ],
+})
+
+
+def test_out_of_core_series_are_same_as_in_memory(tmp_path: Path):
+    submissions_path = tmp_path / 'submissions.csv'
+    SUBMISSIONS.to_csv(submissions_path, index=False)
+    in_memory_path, out_of_core_path = tmp_path / 'in_memory.csv', tmp_path / 'out_of_core.csv'
+
+    build_submission_series(str(submissions_path), str(in_memory_path), 30.0)
+    build_submission_series_out_of_core(str(submissions_path), str(out_of_core_path), 30.0,
+                                        partitions=3, spill_dir=str(tmp_path), chunk_size=5)
+
+    in_memory_df = pd.read_csv(in_memory_path)
+    out_of_core_df = pd.read_csv(out_of_core_path)
+    assert out_of_core_df.equals(in_memory_df)
+    assert len(in_memory_df) == 10
+    # Spill files are removed
+    assert not any(path.is_dir() for path in tmp_path.iterdir())
@@ -0,0 +1,30 @@
+import pandas as pd
+from analysis.src.python.data_analysis.statistics.issues_change_statistics import calculate_issues_change_statistics
+
+ISSUES_CLASSES = ['C901', 'E501']
+
+ISSUES_STATISTICS = pd.DataFrame({
+    'id': [1, 2, 3, 4, 5, 6, 7],
+    'group': [1, 0, 1, 0, 2, 1, 0],
+    'attempt': [2, 3, 1, 1, 1, 3, 2],
+    'C901': [1, 0, 3, 2, 4, 1, 1],
+    'E501': [0, 5, 2, 0, 1, 2, 3],
+})
+
+
+def test_issues_change_is_grouped_diff():
+    df_sorted = ISSUES_STATISTICS.sort_values(['group', 'attempt'])
+    expected_change = df_sorted.groupby('group')[ISSUES_CLASSES].diff() \
+        .fillna(df_sorted[ISSUES_CLASSES]).astype(int)
+    expected_change.insert(0, 'id', df_sorted['id'])
+
+    actual_change = calculate_issues_change_statistics(ISSUES_STATISTICS, ISSUES_CLASSES)
+
+    assert actual_change.equals(expected_change.reset_index(drop=True))
+
+
+def test_first_attempt_change_is_issues_count():
+    actual_change = calculate_issues_change_statistics(ISSUES_STATISTICS, ISSUES_CLASSES).set_index('id')
+
+    first_attempts = ISSUES_STATISTICS[ISSUES_STATISTICS['attempt'] == 1].set_index('id')
+    assert actual_change.loc[first_attempts.index].equals(first_attempts[ISSUES_CLASSES])
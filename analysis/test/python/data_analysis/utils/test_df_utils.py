@@ -0,0 +1,16 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from analysis.src.python.data_analysis.utils.df_utils import read_df, write_df
+
+DF = pd.DataFrame({'id': [1, 2], 'code': ['a', 'b']})
+
+
+@pytest.mark.parametrize('file_name', ['df.csv', 'df.csv.gz', 'df.parquet', 'df.feather'])
+def test_write_and_read_df(tmp_path: Path, file_name: str):
+    path = str(tmp_path / file_name)
+    write_df(DF, path)
+
+    assert read_df(path).equals(DF)
+    assert read_df(path, columns=['id']).equals(DF[['id']])
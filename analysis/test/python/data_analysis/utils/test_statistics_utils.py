@@ -0,0 +1,44 @@
+import time
+from pathlib import Path
+
+import pandas as pd
+from analysis.src.python.data_analysis.utils.statistics_utils import get_statistics_by_group
+
+SUBMISSIONS = pd.DataFrame({
+    'id': list(range(1, 9)),
+    'group': [3, 0, 1, 0, 2, 3, 1, 2],
+})
+
+
+def _get_group_size(series: pd.DataFrame) -> pd.Series:
+    # The first group is processed slower, so partitions are finished out of order
+    if series['group'].values[0] == 0:
+        time.sleep(0.5)
+    return pd.Series({'group': series['group'].values[0], 'size': series.shape[0]})
+
+
+def _get_partition_ids(partition: pd.DataFrame) -> pd.DataFrame:
+    return partition.sort_values(['group', 'id'])[['group', 'id']]
+
+
+def test_statistics_are_saved_in_group_order(tmp_path: Path):
+    statistics_path = tmp_path / 'statistics.csv'
+
+    get_statistics_by_group(SUBMISSIONS, str(statistics_path), 1, _get_group_size, workers=2)
+
+    assert statistics_path.read_text().count('group') == 1
+    statistics_df = pd.read_csv(statistics_path)
+    assert statistics_df['group'].tolist() == [0, 1, 2, 3]
+    assert statistics_df['size'].tolist() == [2, 2, 2, 2]
+
+
+def test_statistics_by_partition(tmp_path: Path):
+    statistics_path = tmp_path / 'statistics.csv'
+    statistics_path.write_text('old statistics\n')
+
+    get_statistics_by_group(SUBMISSIONS, str(statistics_path), 3, _get_partition_ids, workers=2, per_group=False)
+
+    statistics_df = pd.read_csv(statistics_path)
+    assert statistics_df.columns.tolist() == ['group', 'id']
+    assert statistics_df['group'].tolist() == [0, 0, 1, 1, 2, 2, 3, 3]
+    assert statistics_df['id'].tolist() == [2, 4, 3, 7, 5, 8, 1, 6]
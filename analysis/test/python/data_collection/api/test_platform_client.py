@@ -0,0 +1,208 @@
+import datetime
+import json
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from analysis.src.python.data_collection.api import platform_client
+from analysis.src.python.data_collection.api.platform_client import FetchError, get_retry_delay, PlatformClient
+from analysis.src.python.data_collection.api.platform_objects import BaseRequestParams, Object, ObjectResponse
+
+OBJ_CLASS = 'item'
+
+
+@dataclass(frozen=True)
+class Item(Object):
+    id: int
+
+
+@dataclass(frozen=True)
+class ItemsResponse(ObjectResponse[Item]):
+    items: List[Item]
+
+    def get_objects(self) -> List[Item]:
+        return self.items
+
+
+class StubPlatformHandler(BaseHTTPRequestHandler):
+    """ Handler returns pages of items like platforms' APIs do. """
+
+    def do_GET(self):  # noqa: N802
+        path = urlparse(self.path)
+        query = parse_qs(path.query)
+
+        with self.server.lock:
+            self.server.requests.append(query)
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+            failure = self.server.failures.pop(0) if self.server.failures else None
+
+        # Slow responses make concurrent requests overlap
+        time.sleep(self.server.delay)
+
+        with self.server.lock:
+            self.server.in_flight -= 1
+
+        if failure is not None:
+            status, headers = failure
+            self.send_response(status)
+            for header, value in headers.items():
+                self.send_header(header, value)
+            self.end_headers()
+            return
+
+        if path.path != f'/api/{OBJ_CLASS}s':
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        items = self.server.items
+        if 'ids' in query:
+            ids = set(map(int, query['ids'][0].split(',')))
+            items = [item for item in items if item in ids]
+
+        page = int(query['page'][0])
+        page_size = int(query['page_size'][0])
+        page_items = items[(page - 1) * page_size:page * page_size]
+
+        response = {
+            'meta': {'page': page, 'has_next': page * page_size < len(items), 'has_previous': page > 1},
+            'items': [{'id': item} for item in page_items],
+        }
+
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(response).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+class StubPlatformClient(PlatformClient):
+    def _get_authentication_code_token(self):
+        return None
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('localhost', 0), StubPlatformHandler)
+    server.items = list(range(1, 26))
+    server.requests = []
+    server.failures = []
+    server.delay = 0.05
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.lock = threading.Lock()
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get_client(server: ThreadingHTTPServer, concurrency: int) -> StubPlatformClient:
+    return StubPlatformClient(f'http://localhost:{server.server_port}', None, None, 0, concurrency)
+
+
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_get_all_pages(server: ThreadingHTTPServer, concurrency: int):
+    client = _get_client(server, concurrency)
+
+    objects = client._get_objects(OBJ_CLASS, ItemsResponse, BaseRequestParams(page_size=3))
+
+    assert [item.id for item in objects] == server.items
+    assert (server.max_in_flight > 1) == (concurrency > 1)
+
+
+def test_get_count_objects(server: ThreadingHTTPServer):
+    client = _get_client(server, concurrency=8)
+
+    objects = client._get_objects(OBJ_CLASS, ItemsResponse, BaseRequestParams(page_size=2), count=3)
+
+    assert [item.id for item in objects] == [1, 2, 3]
+    # Only the pages that can be needed are requested
+    assert len(server.requests) == 2
+
+
+def test_get_object_pages_lazily(server: ThreadingHTTPServer):
+    client = _get_client(server, concurrency=1)
+
+    pages = client._get_object_pages(OBJ_CLASS, ItemsResponse, BaseRequestParams(page_size=10))
+    assert len(server.requests) == 0
+
+    assert [item.id for item in next(pages)] == list(range(1, 11))
+    assert [[item.id for item in page] for page in pages] == [list(range(11, 21)), list(range(21, 26))]
+
+
+def test_get_object_pages_from_start_page(server: ThreadingHTTPServer):
+    client = _get_client(server, concurrency=4)
+
+    pages = client._get_object_pages(OBJ_CLASS, ItemsResponse, BaseRequestParams(page_size=10), count=7, start_page=2)
+
+    assert [[item.id for item in page] for page in pages] == [list(range(11, 18))]
+    assert [request['page'] for request in server.requests] == [['2']]
+
+
+def test_get_objects_by_ids(server: ThreadingHTTPServer):
+    client = _get_client(server, concurrency=4)
+    ids = [25, 3, 7, 11, 20, 1, 2]
+
+    objects = client._get_objects_by_ids(OBJ_CLASS, ids, ItemsResponse, BaseRequestParams(page_size=3))
+
+    assert sorted(item.id for item in objects) == sorted(ids)
+    assert sorted(len(request['ids'][0].split(',')) for request in server.requests) == [1, 3, 3]
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(platform_client, 'BACKOFF_FACTOR', 0.01)
+    monkeypatch.setattr(platform_client, 'MAX_RETRIES', 2)
+
+
+def test_retry_transient_errors(server: ThreadingHTTPServer, fast_retries):
+    server.failures = [(503, {}), (429, {'Retry-After': '0'})]
+    client = _get_client(server, concurrency=1)
+
+    objects = client._get_objects(OBJ_CLASS, ItemsResponse, BaseRequestParams(page_size=10))
+
+    assert [item.id for item in objects] == server.items
+    assert len(server.requests) == 5
+
+
+@pytest.mark.parametrize('status', [500, 403])
+def test_failed_request_is_not_end_of_data(server: ThreadingHTTPServer, fast_retries, status: int):
+    server.failures = [(status, {})] * 3
+    client = _get_client(server, concurrency=1)
+
+    with pytest.raises(FetchError):
+        client._get_objects(OBJ_CLASS, ItemsResponse, BaseRequestParams(page_size=10))
+
+    # Only transient errors are retried
+    assert len(server.requests) == (3 if status == 500 else 1)
+
+
+def test_not_found_is_end_of_data(server: ThreadingHTTPServer):
+    client = _get_client(server, concurrency=1)
+
+    assert client._get_objects('unknown', ItemsResponse, BaseRequestParams()) == []
+
+
+class StubResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+def test_get_retry_delay():
+    retry_date = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=30)
+
+    assert get_retry_delay(None, attempt=2) == platform_client.BACKOFF_FACTOR * 4
+    assert get_retry_delay(StubResponse({'Retry-After': '7'}), attempt=0) == 7
+    assert 25 < get_retry_delay(StubResponse({'Retry-After': format_datetime(retry_date)}), attempt=0) <= 30
+    assert get_retry_delay(StubResponse({'Retry-After': 'soon'}), attempt=1) == platform_client.BACKOFF_FACTOR * 2
@@ -0,0 +1,114 @@
+import datetime
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pandas as pd
+import pytest
+from analysis.src.python.data_collection.api.platform_objects import Object, Platform
+from analysis.src.python.data_collection.run_data_collection import collect_objects
+from analysis.src.python.data_collection.utils.sync_state import get_sync_state_key, get_sync_state_path, \
+    read_sync_state
+
+OBJ = 'submission'
+PAGE_SIZE = 3
+START_TIME = datetime.datetime(2021, 1, 1)
+
+
+@dataclass(frozen=True)
+class Submission(Object):
+    id: int
+    time: datetime.datetime
+
+
+class StubClient:
+    """ Client returns the newest submissions first (or the oldest if `oldest_first` is True)
+    and can fail after several pages. """
+
+    def __init__(self, submissions_number: int, fail_after: Optional[int] = None, oldest_first: bool = False):
+        self.submissions = [Submission(i, START_TIME + datetime.timedelta(hours=i))
+                            for i in range(submissions_number, 0, -1)]
+        if oldest_first:
+            self.submissions.reverse()
+        self.fail_after = fail_after
+        self.requested_pages = []
+
+    def get_objects(self, obj: str, ids: Optional[List[int]] = None, count: Optional[int] = None,
+                    start_page: int = 1) -> Iterator[List[Submission]]:
+        for page in range(start_page, len(self.submissions) // PAGE_SIZE + 2):
+            if self.fail_after is not None and len(self.requested_pages) == self.fail_after:
+                raise ConnectionError('Platform is not available')
+            self.requested_pages.append(page)
+            yield self.submissions[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+
+
+def _collect(client: StubClient, output_path: Path, resume: bool = False, incremental: bool = False):
+    collect_objects(client, Platform.HYPERSKILL, OBJ, None, None, str(output_path), resume, incremental)
+
+
+def _get_collected_ids(output_path: Path) -> List[int]:
+    return pd.read_csv(output_path / f'{OBJ}s.csv')['id'].tolist()
+
+
+def test_resume_interrupted_collection(tmp_path: Path):
+    with pytest.raises(ConnectionError):
+        _collect(StubClient(10, fail_after=2), tmp_path)
+    assert _get_collected_ids(tmp_path) == list(range(10, 4, -1))
+
+    client = StubClient(10)
+    _collect(client, tmp_path, resume=True)
+
+    assert client.requested_pages == [3, 4]
+    assert _get_collected_ids(tmp_path) == list(range(10, 0, -1))
+
+    key = get_sync_state_key(Platform.HYPERSKILL.value, OBJ, None, None)
+    state = read_sync_state(get_sync_state_path(str(tmp_path), key))
+    assert state.completed
+    assert state.objects_number == 10
+    assert state.max_time == (START_TIME + datetime.timedelta(hours=10)).isoformat()
+
+
+def test_resume_completed_collection(tmp_path: Path):
+    _collect(StubClient(5), tmp_path)
+
+    client = StubClient(5)
+    _collect(client, tmp_path, resume=True)
+
+    assert client.requested_pages == []
+    assert _get_collected_ids(tmp_path) == list(range(5, 0, -1))
+
+
+def test_incremental_collection(tmp_path: Path):
+    _collect(StubClient(5), tmp_path)
+
+    client = StubClient(12)
+    _collect(client, tmp_path, incremental=True)
+
+    assert client.requested_pages == [1, 2, 3, 4, 5]
+    assert sorted(_get_collected_ids(tmp_path)) == list(range(1, 13))
+
+    client = StubClient(12)
+    _collect(client, tmp_path, incremental=True)
+
+    assert client.requested_pages == [1, 2, 3, 4, 5]
+    assert len(_get_collected_ids(tmp_path)) == 12
+
+
+def test_incremental_collection_of_oldest_first(tmp_path: Path):
+    _collect(StubClient(5), tmp_path)
+
+    # New submissions are on the last pages, after the already collected ones
+    _collect(StubClient(12, oldest_first=True), tmp_path, incremental=True)
+
+    assert sorted(_get_collected_ids(tmp_path)) == list(range(1, 13))
+
+
+def test_interrupted_incremental_collection(tmp_path: Path):
+    _collect(StubClient(5), tmp_path)
+
+    with pytest.raises(ConnectionError):
+        _collect(StubClient(12, fail_after=1), tmp_path, incremental=True)
+
+    _collect(StubClient(12), tmp_path, incremental=True)
+
+    assert sorted(_get_collected_ids(tmp_path)) == list(range(1, 13))
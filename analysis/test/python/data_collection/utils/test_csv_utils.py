@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+from analysis.src.python.data_collection.api.platform_objects import Object
+from analysis.src.python.data_collection.utils.csv_utils import save_objects_to_csv
+
+
+@dataclass(frozen=True)
+class Item(Object):
+    id: int
+    name: str
+
+
+def _get_pages():
+    yield []
+    yield [Item(1, 'first'), Item(2, 'second, with comma')]
+    yield [Item(3, 'third')]
+
+
+def test_save_object_pages(tmp_path: Path):
+    assert save_objects_to_csv(str(tmp_path), _get_pages(), 'item') == 3
+
+    items_df = pd.read_csv(tmp_path / 'items.csv')
+    assert items_df.columns.tolist() == ['id', 'name']
+    assert items_df['id'].tolist() == [1, 2, 3]
+    assert items_df['name'].tolist() == ['first', 'second, with comma', 'third']
+
+
+def test_save_no_objects(tmp_path: Path):
+    assert save_objects_to_csv(str(tmp_path), iter([[], []]), 'item') == 0
+    assert not (tmp_path / 'items.csv').exists()
@@ -0,0 +1,165 @@
+import os
+import textwrap
+from pathlib import Path
+from typing import List, Tuple
+
+import pandas as pd
+import pytest
+from analysis.src.python.evaluation.batching import batch_processing
+from analysis.src.python.evaluation.batching.batch_config import BatchConfig
+from analysis.src.python.evaluation.batching.batch_processing import BatchStatus, DONE_MARKER, get_batch_command, \
+    index_batches, merge_csv_files, merge_parquet_files, run_batches
+
+# The script fails on the first attempt for inputs with "fail" in the name and always for inputs with "broken"
+SCRIPT = textwrap.dedent("""
+    import shutil
+    import sys
+    from pathlib import Path
+
+    input_path = Path(sys.argv[1])
+    output_path = Path(sys.argv[-1][len('-o='):])
+    attempt_marker = output_path.parent / f'{output_path.name}.attempt'
+
+    if 'broken' in input_path.name or ('fail' in input_path.name and not attempt_marker.exists()):
+        attempt_marker.touch()
+        sys.exit(1)
+
+    shutil.copy(input_path, output_path / 'result.csv')
+""")
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(batch_processing, 'POLL_INTERVAL', 0.05)
+
+
+def _create_batches(tmp_path: Path, names: List[str]) -> Tuple[BatchConfig, List[Tuple[int, str, str, str]]]:
+    script_path = tmp_path / 'script.py'
+    script_path.write_text(SCRIPT)
+
+    batch_paths = []
+    for index, name in enumerate(names):
+        batch_dirs = []
+        for directory in ['input', 'logs', 'output']:
+            batch_dir = tmp_path / directory / f'batch_{index}'
+            batch_dir.mkdir(parents=True)
+            batch_dirs.append(batch_dir)
+
+        input_dir, logs_dir, output_dir = batch_dirs
+        input_file = input_dir / name
+        input_file.write_text('id\n1\n')
+        batch_paths.append((index, str(input_file), str(logs_dir), str(output_dir)))
+
+    config = BatchConfig(project_path=str(tmp_path), script_path=str(script_path), script_args=[], script_flags=[])
+    return config, batch_paths
+
+
+def test_run_batches_concurrently(tmp_path: Path):
+    config, batch_paths = _create_batches(tmp_path, ['a.csv', 'b.csv', 'c.csv'])
+
+    statuses = run_batches(batch_paths, config, jobs=2)
+
+    assert statuses == {0: BatchStatus.DONE, 1: BatchStatus.DONE, 2: BatchStatus.DONE}
+    assert all(sorted(os.listdir(output_path)) == [DONE_MARKER, 'result.csv'] for _, _, _, output_path in batch_paths)
+
+
+def test_retry_failed_batches(tmp_path: Path):
+    config, batch_paths = _create_batches(tmp_path, ['fail.csv', 'broken.csv'])
+
+    statuses = run_batches(batch_paths, config, jobs=2, retries=1)
+
+    assert statuses == {0: BatchStatus.DONE, 1: BatchStatus.FAILED}
+    assert os.listdir(batch_paths[1][3]) == []
+
+
+def test_skip_processed_batches(tmp_path: Path):
+    config, batch_paths = _create_batches(tmp_path, ['broken.csv'])
+    processed_file = Path(batch_paths[0][3]) / 'result.csv'
+    processed_file.write_text('id\n1\n')
+    (Path(batch_paths[0][3]) / DONE_MARKER).touch()
+
+    statuses = run_batches(batch_paths, config, retries=0)
+
+    assert statuses == {0: BatchStatus.DONE}
+    assert not (tmp_path / 'logs' / 'batch_0' / 'log.txt').exists()
+
+
+def test_rerun_batches_with_partial_output(tmp_path: Path):
+    config, batch_paths = _create_batches(tmp_path, ['broken.csv'])
+    partial_file = Path(batch_paths[0][3]) / 'partial.csv'
+    partial_file.write_text('id\n')
+
+    statuses = run_batches(batch_paths, config, retries=0)
+
+    assert statuses == {0: BatchStatus.FAILED}
+    assert os.listdir(batch_paths[0][3]) == []
+
+
+def test_merge_csv_files(tmp_path: Path):
+    first_file, second_file, output_file = tmp_path / 'first.csv', tmp_path / 'second.csv', tmp_path / 'output.csv'
+    first_file.write_bytes(b'id,code\n1,"a\nb"\n')
+    second_file.write_bytes(b'id,code\r\n2,c')
+
+    merge_csv_files([str(first_file), str(second_file)], str(output_file))
+
+    assert output_file.read_bytes() == b'id,code\n1,"a\nb"\n2,c\n'
+
+
+def test_merge_csv_files_with_different_headers(tmp_path: Path):
+    first_file, second_file = tmp_path / 'first.csv', tmp_path / 'second.csv'
+    first_file.write_text('id,code\n1,a\n')
+    second_file.write_text('id,lang\n2,python3\n')
+
+    with pytest.raises(ValueError):
+        merge_csv_files([str(first_file), str(second_file)], str(tmp_path / 'output.csv'))
+
+
+def test_merge_parquet_files(tmp_path: Path):
+    dfs = [pd.DataFrame({'id': [1, 2], 'code': ['a', 'b']}), pd.DataFrame({'id': [3], 'code': ['c']})]
+    input_files = []
+    for index, df in enumerate(dfs):
+        input_file = tmp_path / f'batch_{index}.parquet'
+        df.to_parquet(input_file, index=False)
+        input_files.append(str(input_file))
+
+    merge_parquet_files(input_files, str(tmp_path / 'output.parquet'))
+
+    actual_df = pd.read_parquet(tmp_path / 'output.parquet')
+    assert actual_df.equals(pd.concat(dfs, ignore_index=True))
+
+
+def test_merge_parquet_files_with_null_column(tmp_path: Path):
+    dfs = [pd.DataFrame({'id': [1], 'traceback': [None]}), pd.DataFrame({'id': [2], 'traceback': ['error']})]
+    input_files = []
+    for index, df in enumerate(dfs):
+        input_file = tmp_path / f'batch_{index}.parquet'
+        df.to_parquet(input_file, index=False)
+        input_files.append(str(input_file))
+
+    merge_parquet_files(input_files, str(tmp_path / 'output.parquet'))
+
+    actual_df = pd.read_parquet(tmp_path / 'output.parquet')
+    assert actual_df['id'].tolist() == [1, 2]
+    assert actual_df['traceback'].tolist() == [None, 'error']
+
+
+def test_merge_parquet_files_with_different_columns(tmp_path: Path):
+    first_file, second_file = tmp_path / 'first.parquet', tmp_path / 'second.parquet'
+    pd.DataFrame({'id': [1], 'code': ['a']}).to_parquet(first_file, index=False)
+    pd.DataFrame({'id': [2], 'lang': ['python3']}).to_parquet(second_file, index=False)
+
+    with pytest.raises(ValueError):
+        merge_parquet_files([str(first_file), str(second_file)], str(tmp_path / 'output.parquet'))
+
+
+def test_index_batches(tmp_path: Path):
+    dataset_path = tmp_path / 'solutions.csv'
+    dataset_path.write_text('id,code\n1,"a\nb"\n2,c\n3,d\n')
+
+    batch_paths, byte_ranges = index_batches(str(dataset_path), str(tmp_path / 'batches'), batch_size=2)
+
+    assert [input_file_path for _, input_file_path, _, _ in batch_paths] == [str(dataset_path)] * 2
+    assert byte_ranges == {0: (8, 20), 1: (20, 24)}
+    assert get_batch_command(BatchConfig('', 'script.py', [], []), str(dataset_path), 'out', byte_ranges[1]) == [
+        'python3', 'script.py', str(dataset_path), '--byte-range=20:24', '-o=out',
+    ]
@@ -0,0 +1,21 @@
+from pathlib import Path
+
+import pytest
+from analysis.src.python.evaluation.common.pandas_util import (
+    equal_df, get_solutions_df_by_file_path, get_solutions_df_chunks, write_df_chunks_to_csv,
+)
+from analysis.test.python.evaluation import PANDAS_UTIL_DIR_PATH
+from analysis.src.python.evaluation.common.args_util import get_in_and_out_list
+
+RESOURCES_PATH = PANDAS_UTIL_DIR_PATH / 'filter_by_language'
+
+IN_FILES = [in_file for in_file, _ in get_in_and_out_list(RESOURCES_PATH)]
+
+
+@pytest.mark.parametrize('in_file', IN_FILES)
+@pytest.mark.parametrize('chunk_size', [1, 2, 100])
+def test_read_and_write_by_chunks(in_file: Path, chunk_size: int, tmp_path: Path):
+    out_file = tmp_path / 'out.csv'
+    write_df_chunks_to_csv(get_solutions_df_chunks(in_file, chunk_size), out_file)
+
+    assert equal_df(get_solutions_df_by_file_path(in_file), get_solutions_df_by_file_path(out_file))
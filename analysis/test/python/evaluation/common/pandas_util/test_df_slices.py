@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from analysis.src.python.evaluation.common import csv_util
+from analysis.src.python.evaluation.common.csv_util import get_csv_row_offsets
+from analysis.src.python.evaluation.common.pandas_util import equal_df, get_solutions_df_slice
+
+DF = pd.DataFrame({
+    'id': [1, 2, 3, 4, 5],
+    'code': ['print(1)', 'if a:\n    print("b")\n', 'x = ""', 'a\r\nb', 'print("\n")'],
+    'lang': ['python3', 'python3', 'python3', 'java11', 'python3'],
+})
+
+
+@pytest.mark.parametrize('rows_per_slice', [1, 2, 5, 10])
+@pytest.mark.parametrize('scan_block_size', [3, 1024])
+def test_read_by_slices(rows_per_slice: int, scan_block_size: int, tmp_path: Path, monkeypatch):
+    # Small blocks check that line breaks and quotes are handled correctly on the block boundaries
+    monkeypatch.setattr(csv_util, 'SCAN_BLOCK_SIZE', scan_block_size)
+    csv_file = tmp_path / 'solutions.csv'
+    DF.to_csv(csv_file, index=False)
+
+    offsets = get_csv_row_offsets(csv_file, rows_per_slice)
+    slices = [get_solutions_df_slice(csv_file, byte_range) for byte_range in zip(offsets, offsets[1:])]
+
+    assert all(len(df_slice) == rows_per_slice for df_slice in slices[:-1])
+    assert equal_df(DF, pd.concat(slices))
+
+
+def test_last_row_without_line_break(tmp_path: Path):
+    csv_file = tmp_path / 'solutions.csv'
+    csv_file.write_bytes(b'id,code\n1,a\n2,b')
+
+    offsets = get_csv_row_offsets(csv_file, 1)
+
+    assert offsets == [8, 12, 15]
+    assert get_solutions_df_slice(csv_file, (offsets[1], offsets[2]))['code'].tolist() == ['b']
@@ -0,0 +1,23 @@
+from pathlib import Path
+
+import pytest
+from analysis.src.python.evaluation.common.csv_util import ColumnName
+from analysis.src.python.evaluation.common.file_util import AnalysisExtension
+from analysis.src.python.evaluation.common.pandas_util import (
+    equal_df, get_solutions_df_by_file_path, read_df_from_file, write_df_to_file,
+)
+from analysis.test.python.evaluation import PANDAS_UTIL_DIR_PATH
+
+IN_FILE = PANDAS_UTIL_DIR_PATH / 'filter_by_language' / 'in_1.csv'
+
+COLUMNS = [ColumnName.ID.value, ColumnName.LANG.value]
+
+
+@pytest.mark.parametrize('extension', AnalysisExtension.get_dataset_extensions())
+def test_write_and_read(extension: AnalysisExtension, tmp_path: Path):
+    df = get_solutions_df_by_file_path(IN_FILE)
+    out_file = tmp_path / f'out{extension.value}'
+    write_df_to_file(df, out_file, extension)
+
+    assert equal_df(df, read_df_from_file(out_file))
+    assert equal_df(df[COLUMNS], read_df_from_file(out_file, COLUMNS))
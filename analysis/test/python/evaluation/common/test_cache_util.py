@@ -0,0 +1,39 @@
+from pathlib import Path
+
+from analysis.src.python.evaluation.common.cache_util import get_cache_key, ResultsCache
+from analysis.src.python.evaluation.evaluation_config import EvaluationConfig
+from analysis.src.python.evaluation.evaluation_run_tool import get_solutions_df, inspect_solutions_df
+from analysis.src.python.evaluation.common.pandas_util import equal_df
+from analysis.test.python.evaluation import XLSX_DATA_FOLDER
+from analysis.test.python.evaluation.testing_config import get_testing_arguments
+
+
+def test_cache_key():
+    assert get_cache_key('code', 'python3', None) == get_cache_key('code', 'python3', None)
+    assert get_cache_key('code', 'python3', None) != get_cache_key('code', 'python3', '')
+    assert get_cache_key('code', 'python3') != get_cache_key('code', 'java11')
+    assert get_cache_key('ab', 'c') != get_cache_key('a', 'bc')
+
+
+def test_results_cache(tmp_path: Path):
+    cache = ResultsCache(tmp_path)
+    cache.put_many({'key_1': 'result_1', 'key_2': 'result_2'})
+    cache.close()
+
+    cache = ResultsCache(tmp_path)
+    assert cache.get_many(['key_1', 'key_2', 'key_3']) == {'key_1': 'result_1', 'key_2': 'result_2'}
+    cache.close()
+
+
+def test_inspect_solutions_with_cache(tmp_path: Path):
+    testing_arguments = get_testing_arguments(to_add_traceback=True, to_add_tool_path=True)
+    testing_arguments.solutions_file_path = XLSX_DATA_FOLDER / 'test_sorted_order.xlsx'
+    config = EvaluationConfig(testing_arguments)
+
+    expected_df = inspect_solutions_df(config, get_solutions_df(config.extension, config.solutions_file_path))
+
+    config.cache_dir = tmp_path
+    # The first run fills the cache and the second one takes all results from it
+    for _ in range(2):
+        actual_df = inspect_solutions_df(config, get_solutions_df(config.extension, config.solutions_file_path))
+        assert equal_df(expected_df, actual_df)
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from analysis.src.python.evaluation.common.checkpoint_util import get_checkpointed_ids, inspect_with_checkpoints
+from analysis.src.python.evaluation.common.csv_util import ColumnName
+
+ID = ColumnName.ID.value
+CODE = ColumnName.CODE.value
+TRACEBACK = ColumnName.TRACEBACK.value
+
+
+class InspectionInterrupted(Exception):
+    pass
+
+
+def _inspect(df: pd.DataFrame) -> pd.DataFrame:
+    df[TRACEBACK] = df[CODE].str.upper()
+    return df
+
+
+def _inspect_and_interrupt(df: pd.DataFrame) -> pd.DataFrame:
+    if 3 in df[ID].values:
+        raise InspectionInterrupted
+    return _inspect(df)
+
+
+def test_resume_after_interruption(tmp_path: Path):
+    df = pd.DataFrame({ID: [1, 2, 3, 4, 5], CODE: ['a', 'b', 'c', 'd', 'e']})
+    checkpoints_dir = tmp_path / 'checkpoints'
+
+    with pytest.raises(InspectionInterrupted):
+        inspect_with_checkpoints(df, _inspect_and_interrupt, checkpoints_dir, checkpoint_size=2)
+    assert get_checkpointed_ids(checkpoints_dir) == {1, 2}
+
+    inspected_ids = []
+
+    def inspect(chunk: pd.DataFrame) -> pd.DataFrame:
+        inspected_ids.extend(chunk[ID])
+        return _inspect(chunk)
+
+    actual_df = inspect_with_checkpoints(df, inspect, checkpoints_dir, checkpoint_size=2, resume=True)
+
+    assert inspected_ids == [3, 4, 5]
+    assert actual_df.equals(_inspect(df.copy()))
+
+
+def test_restart_without_resume(tmp_path: Path):
+    df = pd.DataFrame({ID: [1, 2, 3], CODE: ['a', 'b', 'c']})
+    checkpoints_dir = tmp_path / 'checkpoints'
+
+    inspect_with_checkpoints(df, _inspect, checkpoints_dir, checkpoint_size=2)
+    actual_df = inspect_with_checkpoints(df, _inspect, checkpoints_dir, checkpoint_size=2)
+
+    assert actual_df.equals(_inspect(df.copy()))
@@ -0,0 +1,19 @@
+import os
+from pathlib import Path
+
+from analysis.src.python.evaluation.common.file_util import create_file, create_run_scratch_dir, \
+    get_worker_scratch_dir, remove_directory
+
+
+def test_scratch_dirs(tmp_path: Path):
+    run_scratch_dir = create_run_scratch_dir(tmp_path)
+    assert run_scratch_dir.parent == tmp_path
+
+    worker_scratch_dir = get_worker_scratch_dir(run_scratch_dir)
+    assert worker_scratch_dir == get_worker_scratch_dir(run_scratch_dir)
+    assert worker_scratch_dir.parent == run_scratch_dir
+    assert str(os.getpid()) in worker_scratch_dir.name
+
+    next(create_file(worker_scratch_dir / 'fragment.py', 'print(1)'))
+    remove_directory(run_scratch_dir)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,58 @@
+import sys
+import time
+
+from analysis.src.python.evaluation.common.parallel_util import ProcessStatus, run_in_parallel, \
+    run_in_parallel_ordered, run_in_subprocess_with_working_dir
+
+
+def _square(value: int) -> int:
+    return value * value
+
+
+def _sleep_and_return(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def test_run_in_parallel():
+    tasks = ((i, (i,)) for i in range(20))
+    assert dict(run_in_parallel(_square, tasks, workers=3)) == {i: i * i for i in range(20)}
+
+
+def test_results_are_streamed_as_completed():
+    tasks = [('slow', (1.0,)), ('fast_1', (0.0,)), ('fast_2', (0.0,))]
+    task_ids = [task_id for task_id, _ in run_in_parallel(_sleep_and_return, tasks, workers=2)]
+    assert task_ids[-1] == 'slow'
+
+
+def test_ordered_results_are_streamed_in_task_order():
+    tasks = [('slow', (1.0,)), ('fast_1', (0.0,)), ('fast_2', (0.0,))]
+    results = list(run_in_parallel_ordered(_sleep_and_return, tasks, workers=2))
+    assert results == [('slow', 1.0), ('fast_1', 0.0), ('fast_2', 0.0)]
+
+
+def test_task_timeout():
+    tasks = [('slow', (10.0,)), ('fast', (0.0,))]
+    start = time.time()
+    results = dict(run_in_parallel(_sleep_and_return, tasks, workers=1, timeout=0.5))
+    assert results == {'slow': None, 'fast': 0.0}
+    assert time.time() - start < 5
+
+
+def test_subprocess_ok():
+    command = [sys.executable, '-c', 'print("output")']
+    actual_output = run_in_subprocess_with_working_dir(command, '.', timeout=10, memory_limit=1024)
+    assert actual_output == ('output\n', ProcessStatus.OK)
+
+
+def test_subprocess_timeout_kills_child_processes():
+    # The child process keeps stdout open, so the call would hang if only the parent process was killed
+    command = [sys.executable, '-c', 'import subprocess, time; subprocess.Popen(["sleep", "30"]); time.sleep(30)']
+    start = time.time()
+    assert run_in_subprocess_with_working_dir(command, '.', timeout=0.5) == ('', ProcessStatus.TIMED_OUT)
+    assert time.time() - start < 10
+
+
+def test_subprocess_out_of_memory():
+    command = [sys.executable, '-c', 'data = bytearray(2 * 1024 ** 3)']
+    assert run_in_subprocess_with_working_dir(command, '.', memory_limit=512) == ('', ProcessStatus.OOM)
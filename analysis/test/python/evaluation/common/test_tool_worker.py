@@ -0,0 +1,85 @@
+import textwrap
+from pathlib import Path
+
+import pytest
+from hyperstyle.src.python.review.application_config import LanguageVersion
+from hyperstyle.src.python.review.common.subprocess_runner import run_in_subprocess
+from analysis.src.python.evaluation.common.parallel_util import has_out_of_memory_message, is_out_of_memory
+from analysis.src.python.evaluation.common.tool_worker import ToolWorker, ToolWorkerError
+from analysis.src.python.evaluation.evaluation_config import EvaluationConfig
+from analysis.test.python.common import FILE_SYSTEM_DATA_FOLDER
+from analysis.test.python.evaluation.testing_config import get_testing_arguments
+
+INPUT_DATA = [
+    ('in_1.java', LanguageVersion.JAVA_11),
+    ('in_2.py', LanguageVersion.PYTHON_3),
+]
+
+
+@pytest.mark.parametrize(('test_file', 'language'), INPUT_DATA)
+def test_same_output_as_subprocess(test_file: str, language: LanguageVersion):
+    input_file = FILE_SYSTEM_DATA_FOLDER / test_file
+    test_args = get_testing_arguments(to_add_traceback=True, to_add_tool_path=True)
+    config = EvaluationConfig(test_args)
+
+    expected_output = run_in_subprocess(config.build_command(input_file, language.value, None))
+
+    worker = ToolWorker(config.tool_path, config.get_tool_root())
+    try:
+        tool_arguments = config.build_tool_arguments(input_file, language.value, None)
+        # The second request checks that the resident process is reused correctly
+        actual_outputs = [worker.inspect(tool_arguments)[0] for _ in range(2)]
+    finally:
+        worker.close()
+
+    assert actual_outputs == [expected_output] * 2
+
+
+def _create_tool(tmp_path: Path, main_body: str) -> Path:
+    tool_path = tmp_path / 'tool.py'
+    tool_path.write_text('def main():\n' + textwrap.indent(textwrap.dedent(main_body), '    '))
+    return tool_path
+
+
+def test_worker_out_of_memory(tmp_path: Path):
+    worker = ToolWorker(_create_tool(tmp_path, 'data = bytearray(2 * 1024 ** 3)'), tmp_path, memory_limit=512)
+    try:
+        with pytest.raises(ToolWorkerError) as error:
+            worker.inspect([])
+    finally:
+        worker.close()
+
+    assert is_out_of_memory(error.value.return_code, error.value.stderr)
+
+
+def test_worker_out_of_memory_caught_by_tool(tmp_path: Path):
+    # The tool catches MemoryError and only prints the traceback as hyperstyle does, so the worker stays alive
+    tool_path = _create_tool(tmp_path, """
+        import traceback
+        try:
+            data = bytearray(2 * 1024 ** 3)
+        except Exception:
+            traceback.print_exc()
+            return 2
+    """)
+    worker = ToolWorker(tool_path, tmp_path, memory_limit=512)
+    try:
+        output, errors = worker.inspect([])
+        assert worker.is_alive()
+    finally:
+        worker.close()
+
+    assert output == ''
+    assert has_out_of_memory_message(errors.encode())
+
+
+def test_worker_crash_is_not_out_of_memory(tmp_path: Path):
+    worker = ToolWorker(_create_tool(tmp_path, 'raise ValueError()'), tmp_path, memory_limit=512)
+    try:
+        with pytest.raises(ToolWorkerError) as error:
+            worker.inspect([])
+    finally:
+        worker.close()
+
+    assert error.value.return_code == 1
+    assert not is_out_of_memory(error.value.return_code, error.value.stderr)
@@ -325,18 +325,19 @@ TEST_CORRECT_OUTPUT_DATA = [
 ]
 
 
+@pytest.mark.parametrize('chunk_size', [1, 3])
 @pytest.mark.parametrize(('test_file', 'target_file'), TEST_CORRECT_OUTPUT_DATA)
-def test_correct_output(test_file: str, target_file: str):
+def test_correct_output(test_file: str, target_file: str, chunk_size: int):
     solutions_file_path = Path(GET_RAW_ISSUES_TEST_FILES_FOLDER / test_file)
     solutions = get_solutions_df_by_file_path(solutions_file_path)
 
     test_dataframe = inspect_solutions(
         solutions,
-        solutions_file_path,
         allow_duplicates=False,
         allow_info_issues=False,
         allow_zero_measure_issues=False,
         to_save_path=False,
+        chunk_size=chunk_size,
     )
 
     target_dataframe = pd.read_csv(GET_RAW_ISSUES_TARGET_FILES_FOLDER / target_file)
@@ -4,12 +4,17 @@ from typing import Optional
 import pandas as pd
 import pytest
 from hyperstyle.src.python.review.common.language import Language
-from analysis.src.python.evaluation.common.pandas_util import equal_df, get_solutions_df_by_file_path
+from analysis.src.python.evaluation.common.pandas_util import equal_df, get_solutions_df_by_file_path, \
+    get_solutions_df_chunks
 from analysis.src.python.evaluation.issues_statistics.get_raw_issues_statistics import (
     _convert_language_code_to_language,
     _get_output_folder,
+    _merge_stats,
+    _read_stats,
+    _save_stats,
     DEFAULT_OUTPUT_FOLDER_NAME,
     inspect_raw_issues,
+    VALUE,
 )
 from analysis.test.python.evaluation.issues_statistics import (
     GET_RAW_ISSUES_STATISTICS_TARGET_FILES_FOLDER,
@@ -109,3 +114,32 @@ def test_inspect_solutions(test_file: str, target_file: str, lang: str):
     freq_stats = pd.read_csv(GET_RAW_ISSUES_STATISTICS_TARGET_FILES_FOLDER / target_file)
 
     assert equal_df(stats[lang], freq_stats)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2])
+def test_merge_stats_of_chunks(chunk_size: int):
+    test_file = GET_RAW_ISSUES_STATISTICS_TEST_FILES_FOLDER / 'test_df_multi_lang.csv'
+    expected_stats = inspect_raw_issues(get_solutions_df_by_file_path(test_file))
+
+    actual_stats = {}
+    for chunk in get_solutions_df_chunks(test_file, chunk_size):
+        actual_stats = _merge_stats(actual_stats, inspect_raw_issues(chunk))
+
+    assert actual_stats.keys() == expected_stats.keys()
+    for lang, expected in expected_stats.items():
+        actual = actual_stats[lang][expected.columns].sort_values(VALUE)
+        assert equal_df(expected.sort_values(VALUE), actual)
+
+
+def test_merge_with_saved_stats(tmp_path: Path):
+    test_file = GET_RAW_ISSUES_STATISTICS_TEST_FILES_FOLDER / 'test_df_multi_lang.csv'
+    test_df = get_solutions_df_by_file_path(test_file)
+    expected_stats = inspect_raw_issues(test_df)
+
+    _save_stats(inspect_raw_issues(test_df.iloc[:2]), test_file, tmp_path)
+    actual_stats = _merge_stats(_read_stats(tmp_path), inspect_raw_issues(test_df.iloc[2:]))
+
+    assert actual_stats.keys() == expected_stats.keys()
+    for lang, expected in expected_stats.items():
+        actual = actual_stats[lang][expected.columns].sort_values(VALUE)
+        assert equal_df(expected.sort_values(VALUE), actual)
@@ -0,0 +1,89 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from hyperstyle.src.python.review.inspectors.inspector_type import InspectorType
+from hyperstyle.src.python.review.inspectors.issue import (
+    CodeIssue,
+    IssueDifficulty,
+    IssueType,
+    LineLenIssue,
+)
+from analysis.src.python.evaluation.common.csv_util import ColumnName
+from analysis.src.python.evaluation.issues_statistics.common.raw_issue_encoder_decoder import RawIssueEncoder
+from analysis.src.python.evaluation.issues_statistics.common.raw_issue_table import (
+    DEFAULT_DIFFICULTY, DIFFICULTY, get_raw_issues_table, ISSUE_TYPE, LINE_NUMBER, MEASURE, ORIGIN_CLASS,
+    RAW_ISSUE_TABLE_COLUMNS, read_raw_issues_table, write_raw_issues_table,
+)
+
+ID = ColumnName.ID.value
+RAW_ISSUES = 'raw_issues'
+
+CODE_ISSUE = CodeIssue(
+    origin_class='SomeCodeIssueClass',
+    type=IssueType.CODE_STYLE,
+    description='Some description',
+    file_path=Path('some_file.py'),
+    line_no=10,
+    column_no=4,
+    inspector_type=InspectorType.FLAKE8,
+    difficulty=IssueDifficulty.EASY,
+)
+
+LINE_LEN_ISSUE = LineLenIssue(
+    origin_class='SomeLineLenIssueClass',
+    type=IssueType.LINE_LEN,
+    description='Some description',
+    file_path=Path('some_file.py'),
+    line_no=20,
+    column_no=1,
+    inspector_type=InspectorType.PYLINT,
+    line_len=130,
+    difficulty=IssueDifficulty.EASY,
+)
+
+
+def _get_solutions_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        ID: [1, 2, 3, 4],
+        RAW_ISSUES: [
+            json.dumps([CODE_ISSUE, LINE_LEN_ISSUE], cls=RawIssueEncoder),
+            json.dumps([], cls=RawIssueEncoder),
+            np.nan,
+            json.dumps([LINE_LEN_ISSUE], cls=RawIssueEncoder),
+        ],
+    })
+
+
+def test_get_raw_issues_table():
+    table = get_raw_issues_table(_get_solutions_df(), RAW_ISSUES)
+
+    assert list(table.columns) == RAW_ISSUE_TABLE_COLUMNS
+    assert table[ID].tolist() == [1, 1, 4]
+    assert table[ORIGIN_CLASS].tolist() == ['SomeCodeIssueClass', 'SomeLineLenIssueClass', 'SomeLineLenIssueClass']
+    assert table[ISSUE_TYPE].tolist() == ['CODE_STYLE', 'LINE_LEN', 'LINE_LEN']
+    assert table[LINE_NUMBER].tolist() == [10, 20, 20]
+    assert table[MEASURE].tolist() == [pd.NA, 130, 130]
+    assert table[ORIGIN_CLASS].dtype == 'category'
+
+
+def test_issues_without_difficulty():
+    issue = json.loads(json.dumps(CODE_ISSUE, cls=RawIssueEncoder))
+    del issue[DIFFICULTY]
+    solutions_df = pd.DataFrame({ID: [1], RAW_ISSUES: [json.dumps([issue])]})
+
+    table = get_raw_issues_table(solutions_df, RAW_ISSUES)
+
+    assert table[DIFFICULTY].tolist() == [DEFAULT_DIFFICULTY.value]
+
+
+@pytest.mark.parametrize('file_name', ['issues.csv', 'issues.parquet', 'issues.feather'])
+def test_raw_issues_table_roundtrip(tmp_path: Path, file_name: str):
+    table = get_raw_issues_table(_get_solutions_df(), RAW_ISSUES)
+    write_raw_issues_table(table, tmp_path / file_name)
+
+    actual_table = read_raw_issues_table(tmp_path / file_name)
+
+    pd.testing.assert_frame_equal(actual_table, table, check_categorical=False)
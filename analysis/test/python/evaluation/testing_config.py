@@ -22,5 +22,15 @@ def get_testing_arguments(to_add_traceback=None, to_add_tool_path=None, to_add_h
 
     testing_arguments.solutions_file_path = None
     testing_arguments.to_drop_nan = False
+    testing_arguments.resident_workers = False
+    testing_arguments.cache_dir = None
+    testing_arguments.scratch_dir = None
+    testing_arguments.workers = None
+    testing_arguments.task_timeout = None
+    testing_arguments.memory_limit = None
+    testing_arguments.checkpoint_size = None
+    testing_arguments.resume = False
+    testing_arguments.stream_chunk_size = None
+    testing_arguments.byte_range = None
 
     return testing_arguments